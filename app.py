@@ -1,65 +1,35 @@
 import streamlit as st
+import os
 from datetime import datetime, timedelta, time as dt_time
-import pytz
 import time as py_time
-from scraper import PokerfansScraper
+from http_session import connection_stats
+from metrics import STAGES, get_shared_metrics, start_shared_metrics_server
+from rate_limiter import get_shared_limiter
+from detail_cache import get_shared_detail_cache
+from enrichment import get_shared_enrichment_stats
+from http_cache import get_shared_validator_store
+from parsed_cache import get_shared_parsed_cache
+from result_store import get_shared_result_store
+from history import get_shared_history_store
+from prefetch import PREFETCH_MODE, prefetch_dates, start_shared_scheduler
+from models import JST, Tournament, value_ratio
+from batch import TournamentBatch
+from tournament_index import FEE_BUCKETS, GUARANTEE_BUCKETS, TournamentIndex, index_for_snapshot
 import urllib.parse
 import re
-import concurrent.futures
 
-# 日本のタイムゾーン
-JST = pytz.timezone('Asia/Tokyo')
+# 直前（この秒数以内）に取得された結果があれば、ボタンを押しても取得し直さない
+MIN_REFETCH_SECONDS = 60
 
-# キャッシュデータを保持する関数
-@st.cache_data(ttl=86400)  # 1日（86400秒）間キャッシュを保持
-
-# 追加する関数：並列処理でページを取得
-def fetch_pages_parallel(date_str, page_start, page_end, max_details):
-    """指定範囲のページを並列で取得"""
-    results = {}
-    pages_to_fetch = range(page_start, min(page_end, st.session_state.fetch_total_pages))
-    
-    # 並列数を制限（3スレッド）
-    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-        # ページごとに処理を送信
-        future_to_page = {
-            executor.submit(fetch_tournament_data, date_str, page, max_details): page
-            for page in pages_to_fetch
-        }
-        
-        # 結果を受け取り
-        for future in concurrent.futures.as_completed(future_to_page):
-            page = future_to_page[future]
-            try:
-                tournaments, _, _ = future.result()
-                results[f"page_{page}"] = tournaments
-                # 進捗表示を更新（ここではセッション変数を直接更新できない）
-            except Exception as e:
-                st.error(f"ページ {page + 1} の取得に失敗: {str(e)}")
-    
-    return results
-def fetch_tournament_data(date_str, page, max_details):
-    """
-    トーナメント情報を取得してキャッシュする
-    Args:
-        date_str: 日付文字列 (YYYY/MM/DD)
-        page: ページ番号
-        max_details: 詳細ページの最大取得数
-    Returns:
-        (tournaments, pagination_info, processing_time)
-    """
-    start_time = py_time.time()
-    
-    scraper = PokerfansScraper(target_date=date_str)
-    tournaments, pagination_info = scraper.get_tournament_list(
-        page=page,
-        max_details_per_page=max_details
-    )
-    
-    end_time = py_time.time()
-    processing_time = end_time - start_time
-    
-    return tournaments, pagination_info, processing_time
+# 表示方法（ラベル → モード）
+DISPLAY_MODES = {"カード": 'card', "表": 'table'}
+# カード表示の1ページの件数
+PAGE_SIZES = [10, 20, 50, 100]
+DEFAULT_PAGE_SIZE = int(os.environ.get("POKERODDS_PAGE_SIZE", "20"))
+if DEFAULT_PAGE_SIZE not in PAGE_SIZES:
+    PAGE_SIZES = sorted(PAGE_SIZES + [DEFAULT_PAGE_SIZE])
+# 描画時間を平均する回数
+RENDER_TIME_HISTORY = 20
 
 def format_money(amount: int) -> str:
     """金額を読みやすい形式に変換（カンマ区切りで表示）"""
@@ -70,17 +40,17 @@ def format_odds(entry_fee: int, current_entries: int, guarantee: int) -> str:
     回収率を計算して文字列で返す
     保証賞金÷エントリー総額で計算（100%超えでバリュー有り）
     """
-    # エントリー総額がゼロの場合はエラー回避
-    total_entry_amount = entry_fee * current_entries
-    
+    return format_ratio(value_ratio(guarantee, entry_fee, current_entries), guarantee)
+
+def format_ratio(odds, guarantee: int) -> str:
+    """
+    計算済みの回収率（%、エントリー総額がゼロならNone）を文字列で返す
+    """
     if guarantee <= 0:
         return "保証なし"
-    elif total_entry_amount <= 0:
+    elif odds is None:
         return "エントリー未確認"
     
-    # 保証賞金÷エントリー総額（%表示）
-    odds = (guarantee / total_entry_amount) * 100
-    
     # バリューの判定をアイコンで表示
     if odds >= 150:
         return f"💰💰 {odds:.1f}%"  # 非常に良いバリュー
@@ -113,110 +83,34 @@ def get_pagination_info(soup) -> dict:
     
     return {'current_page': current_page, 'total_pages': total_pages}
 
-def parse_time(time_str):
-    """時間文字列をパース"""
-    if not time_str:
-        return None
-    
-    try:
-        hours, minutes = map(int, time_str.split(':'))
-        return hours, minutes
-    except (ValueError, AttributeError):
-        return None
-
-def is_available(start_time_str, end_time_str):
+def display_tournaments(tournaments, available=None, ratios=None):
     """
-    トーナメントがまだ参加可能かを確認
-    
-    ルール：
-    1. 深夜開始（0-6時）のトーナメント：
-       - 現在が早朝（0-6時）なら、当日のイベントとして判定
-       - 現在が日中/夜（7-23時）なら、翌日のイベントなので無視
-    
-    2. 日中/夜開始（7-23時）のトーナメント：
-       - 現在時刻が開始時刻より前なら参加可能
-       - 現在時刻が開始時刻より後なら、締切時刻と比較
-       - 締切が翌日深夜（0-6時）の場合は特別処理
-    
+    トーナメント一覧を表示する関数
     Args:
-        start_time_str: 開始時間 (HH:MM)
-        end_time_str: 締切時間 (HH:MM)
-    Returns:
-        bool: 参加可能ならTrue
+        tournaments: 表示するトーナメント
+        available: 各行の参加可否（一括計算済みの値。省略時は行ごとに判定）
+        ratios: 各行の回収率（一括計算済みの値。省略時は行ごとに計算）
     """
-    if not start_time_str:
-        return False  # 開始時間がない場合は除外
-    
-    # 現在の日本時間
-    now = datetime.now(JST)
-    current_hour = now.hour
-    current_minute = now.minute
-    
-    # 開始時間と締切時間をパース
-    start_time = parse_time(start_time_str)
-    if not start_time:
-        return False
-    
-    start_hour, start_minute = start_time
-    
-    # ケース1: 深夜開始（0-6時）のトーナメント
-    if 0 <= start_hour < 7:
-        # 現在も深夜（0-6時）なら、開始時間と比較
-        if 0 <= current_hour < 7:
-            # 現在時刻 < 開始時刻なら参加可能
-            return (current_hour < start_hour) or (current_hour == start_hour and current_minute < start_minute)
-        else:
-            # 現在が7時以降なら、このトーナメントは今日の早朝に終了済み
-            return False
-    
-    # ケース2: 日中/夜開始（7-23時）のトーナメント
-    else:
-        # 現在時刻と開始時刻を比較
-        if (current_hour < start_hour) or (current_hour == start_hour and current_minute < start_minute):
-            # 開始前なら参加可能
-            return True
-        else:
-            # 開始後なら締切時間と比較
-            end_time = parse_time(end_time_str)
-            if not end_time:
-                return False  # 締切時間がない場合は除外
-            
-            end_hour, end_minute = end_time
-            
-            # 締切が深夜（0-6時）なら翌日と解釈
-            if 0 <= end_hour < 7:
-                # 現在も深夜（0-6時）なら当日の締切と比較
-                if 0 <= current_hour < 7:
-                    return (current_hour < end_hour) or (current_hour == end_hour and current_minute < end_minute)
-                else:
-                    # 現在が7時以降なら、締切は翌日なので参加可能
-                    return True
-            else:
-                # 締切も日中/夜なら単純比較
-                return (current_hour < end_hour) or (current_hour == end_hour and current_minute < end_minute)
-
-def is_jopt_tournament(title):
-    """タイトルにJOPTが含まれるかチェック"""
-    return bool(re.search(r'JOPT|jopt', title, re.IGNORECASE))
-
-def display_tournaments(tournaments):
-    """トーナメント一覧を表示する関数"""
-    for t in tournaments:
+    for i, t in enumerate(tournaments):
         st.markdown("---")
         
         # 参加可否を表示
-        status_text = "🟢 参加可能" if t.get('is_available', False) else "🔴 参加不可"
+        is_open = available[i] if available is not None else t.get('is_available', False)
+        status_text = "🟢 参加可能" if is_open else "🔴 参加不可"
         
         # タイトルと参加状態
         st.markdown(f"### {t['title']}")
         st.markdown(status_text)
         
-        # 回収率を計算
-        odds_text = format_odds(
-            t.get('entry_fee', 0), 
-            t.get('current_entries', 0), 
-            t.get('guarantee', 0)
-        )
+        # 回収率を表示用の文字列に
+        if ratios is not None:
+            odds_text = format_ratio(ratios[i], t.get('guarantee', 0))
+        else:
+            odds_text = format_odds(
+                t.get('entry_fee', 0), 
+                t.get('current_entries', 0), 
+                t.get('guarantee', 0)
+            )
         
         # 開始時間と締切時間を表示
         time_display = f"{t.get('start_time', '不明')}"
@@ -255,9 +149,6 @@ def main():
     if 'current_page' not in st.session_state:
         st.session_state.current_page = 0
     
-    if 'all_tournaments' not in st.session_state:
-        st.session_state.all_tournaments = {}
-    
     # ページ変更検出のためのフラグ
     if 'prev_page' not in st.session_state:
         st.session_state.prev_page = st.session_state.current_page
@@ -268,161 +159,196 @@ def main():
         min_value=0,
         max_value=10,
         value=0,
-        help="詳細ページへのアクセス数を制限してリクエスト制限を回避"
+        help="タイトルから保証額が取れなかった行のうち、参加可能・開始が早い・参加費が高い順に詳細ページを取得します"
     )
     
+    # 取得結果はプロセス全体で共有する（同じ日付を同時に取得しようとした場合は1回の取得にまとめる）
+    store = get_shared_result_store()
+    start_shared_metrics_server()
+    snapshot = store.get(date_str)
+
+    # 先読みの対象日はバックグラウンドで取得した結果を表示するだけにする
+    if PREFETCH_MODE == 'inprocess':
+        start_shared_scheduler()
+    prefetched = PREFETCH_MODE != 'off' and date_str in prefetch_dates()
+
     # キャッシュ情報の表示
-    last_updated = st.session_state.get('last_updated')
-    if last_updated:
-        elapsed = datetime.now() - last_updated
-        st.info(f"最終更新: {last_updated.strftime('%H:%M:%S')} ({int(elapsed.total_seconds())}秒前)")
-    
-    # 初回データ取得を行わない
-    if 'initialized' not in st.session_state:
-        st.session_state.initialized = True
-        # 初回メッセージを表示
-        st.info("「すべてのページを取得」ボタンを押してデータを取得してください")
+    if snapshot is not None:
+        fetched_at = datetime.fromtimestamp(snapshot.fetched_at)
+        st.info(f"最終更新: {fetched_at.strftime('%H:%M:%S')} ({int(snapshot.age)}秒前)")
     
     # ページが変更された場合も処理が必要
     page_changed = st.session_state.prev_page != st.session_state.current_page
     if page_changed:
         st.session_state.prev_page = st.session_state.current_page
     
-    # データ取得（キャッシュ対応）
-    tournaments = None
-    pagination_info = None
-    
-    # 全ページデータの集計を初期化
-    all_collected = []
-    
-    # セッションステートにデータが存在するか確認
-    if 'sorted_tournaments' not in st.session_state:
-        st.session_state.sorted_tournaments = None
-    
+    # 同じ日付のデータを取得済みなら、変更のあった行だけを更新するボタンも表示
+    refresh_clicked = not prefetched and snapshot is not None and st.button("差分更新（変更のあった行だけを更新）")
+
     # 「すべてのページを取得（キャッシュを更新）」ボタン
-    if st.button("すべてのページを取得（キャッシュを更新）"):
-        # キャッシュをクリア
-        st.cache_data.clear()
-        
-        # 取得状態を保存するためのセッション変数を設定
-        st.session_state.is_fetching = True
-        st.session_state.fetch_progress = 0
-        st.session_state.fetch_total_pages = 0
-        st.session_state.fetch_current_page = 0
-        st.session_state.fetch_date = date_str
-        st.session_state.fetch_max_details = max_details
-        
-        # リダイレクトして取得処理を開始
-        st.rerun()
+    if not prefetched and st.button("すべてのページを取得（キャッシュを更新）"):
+        progress_bar = st.progress(0.0)
+        status = st.empty()
+        preview = st.empty()
+        fetched_pages = []
+        arrived = []
+
+        def on_page(page, total_pages, page_tournaments):
+            fetched_pages.append(page)
+            # 複数の都道府県を取得する場合、総ページ数は各地域の1ページ目を取得するまで確定しない
+            progress_bar.progress(min(1.0, len(fetched_pages) / total_pages))
+            status.info(f"ページ {len(fetched_pages)}/{total_pages} 取得完了（{len(page_tournaments)} 件）")
+            # 全ページがそろう前に、届いたページの行から表示する
+            arrived.extend(page_tournaments)
+            batch = TournamentBatch(arrived)
+            with preview.container():
+                display_table(arrived, batch.availability(), batch.ratios())
+
+        if store.in_flight(date_str):
+            status.info("他のユーザーが取得中のため、その結果を待っています")
+        with st.spinner("データを取得中..."):
+            # 直前に取得された結果があればそれを使う
+            snapshot = store.get_or_fetch(date_str, max_details, max_age=MIN_REFETCH_SECONDS, on_page=on_page)
+
+        progress_bar.progress(1.0)
+        preview.empty()
+
+        # 取得完了メッセージ
+        st.success(f"すべてのページの取得完了！合計 {len(snapshot.tournaments)} 件のトーナメントデータを収集しました。（{snapshot.seconds:.1f}秒）")
+        stats = connection_stats()
+        limiter_stats = get_shared_limiter().stats()
+        st.caption(
+            f"HTTP接続: リクエスト {stats['requests']} 件 / "
+            f"新規接続 {stats['new_connections']} / 再利用 {stats['reused_connections']}  |  "
+            f"待機 {limiter_stats['wait_seconds']:.1f}秒 / 通信 {limiter_stats['fetch_seconds']:.1f}秒"
+        )
+        stage_names = {'sleep': "待機", 'connect': "接続", 'ttfb': "TTFB", 'download': "受信",
+                       'parse': "解析", 'rows': "行抽出", 'guarantee': "保証額"}
+        stage_totals = {}
+        for stages in get_shared_metrics().summary().values():
+            for stage, values in stages.items():
+                stage_totals[stage] = stage_totals.get(stage, 0.0) + values['seconds']
+        st.caption("段階別（累計）: " + " / ".join(
+            f"{stage_names[stage]} {stage_totals[stage]:.2f}秒" for stage in STAGES if stage in stage_totals))
+        validator_stats = get_shared_validator_store().stats()
+        st.caption(
+            f"再取得: 未変更(304) {validator_stats['not_modified']} / 本文一致 {validator_stats['unchanged']} / "
+            f"更新 {validator_stats['changed']}  |  節約 {validator_stats['bytes_saved'] / 1024:.0f}KB・"
+            f"解析 {validator_stats['parse_seconds_saved']:.2f}秒"
+        )
+        parsed_stats = get_shared_parsed_cache().stats()
+        st.caption(
+            f"解析結果のキャッシュ: ヒット率 {parsed_stats['hit_rate']:.0%}（ヒット {parsed_stats['hits']} / "
+            f"ミス {parsed_stats['misses']}）  |  保存 {parsed_stats['entries']} 件・"
+            f"{parsed_stats['bytes'] / 1024:.0f}KB / 削除 {parsed_stats['evictions']}"
+        )
+        if max_details > 0:
+            cache_stats = get_shared_detail_cache().stats()
+            st.caption(
+                f"詳細キャッシュ: ヒット {cache_stats['hits']} / ミス {cache_stats['misses']} / "
+                f"削除 {cache_stats['evictions']}（保存 {cache_stats['entries']} 件）"
+            )
+            enrichment = get_shared_enrichment_stats().stats()
+            st.caption(
+                f"保証額の補完: 対象 {enrichment['candidates']} / 取得 {enrichment['fetched']} / "
+                f"キャッシュ {enrichment['cached']} / 判明 {enrichment['found']}  |  "
+                f"カバー率 {enrichment['coverage_before']:.0%} → {enrichment['coverage_after']:.0%}  |  "
+                f"取得時間 p50 {enrichment['p50_ms']:.0f}ms / p95 {enrichment['p95_ms']:.0f}ms"
+            )
+        store_stats = store.stats()
+        st.caption(f"共有キャッシュ: 再利用 {store_stats['hits']} / 相乗り {store_stats['coalesced']} / 取得 {store_stats['crawls']}")
+
+        # データを処理してセッションに保存
+        process_and_display_tournaments(snapshot.tournaments, index_for_snapshot(snapshot))
+
+    elif refresh_clicked:
+        with st.spinner("変更を確認中..."):
+            snapshot, report = store.refresh(date_str, max_details)
+
+        if report is not None:
+            st.success(
+                f"差分更新完了: 追加 {report['added']} / 削除 {report['removed']} / "
+                f"変更 {report['changed']} / 変更なし {report['unchanged']}（{report['seconds']:.1f}秒）"
+            )
+            if report['failed_pages']:
+                st.warning(f"{report['failed_pages']} ページの取得に失敗したため、削除は反映していません")
+
+        # 参加可否・並び順を計算し直して表示
+        process_and_display_tournaments(snapshot.tournaments, index_for_snapshot(snapshot))
 
-    # 取得処理の継続（スマホでのセッション切れに対応）
-    if 'is_fetching' in st.session_state and st.session_state.is_fetching:
-        with st.spinner(f"データを取得中... 進捗: {st.session_state.fetch_progress}%"):
-            # 進捗バーの表示（常に表示）
-            progress_bar = st.progress(st.session_state.fetch_progress / 100)
-            
-            # 初回の場合、最初のページを取得
-            if st.session_state.fetch_total_pages == 0:
-                st.info("最初のページを取得中...")
-                
-                # 最初の1ページを取得して総ページ数を確認
-                first_page_tournaments, first_page_info, _ = fetch_tournament_data(
-                    st.session_state.fetch_date, 
-                    0, 
-                    st.session_state.fetch_max_details
-                )
-                total_pages = first_page_info.get('total_pages', 1)
-                
-                # 最初のページを保存
-                st.session_state.all_tournaments = {
-                    "page_0": first_page_tournaments
-                }
-                
-                # 状態を更新
-                st.session_state.fetch_total_pages = total_pages
-                st.session_state.fetch_current_page = 0  # バッチ処理用に0に初期化
-                st.session_state.fetch_progress = (1 / total_pages) * 100 if total_pages > 0 else 100
-                st.session_state.batch_progress = 0
-                st.session_state.batch_size = 3  # 一度に処理するページ数
-                
-                # 進捗情報を表示
-                st.info(f"ページ 1/{total_pages} 取得完了（{len(first_page_tournaments)} 件）")
-                progress_bar.progress(st.session_state.fetch_progress / 100)
-                
-                # 次のバッチへ進む前に一時停止
-                py_time.sleep(1)
-                st.rerun()
-            
-            # バッチ処理（複数ページを並列取得）
-            elif st.session_state.fetch_current_page < st.session_state.fetch_total_pages - 1:
-                total_pages = st.session_state.fetch_total_pages
-                current_batch_start = st.session_state.fetch_current_page + 1  # 次のページから
-                batch_size = st.session_state.batch_size
-                current_batch_end = min(current_batch_start + batch_size, total_pages)
-                
-                # バッチ処理の進捗表示
-                batch_progress_bar = st.progress(st.session_state.batch_progress)
-                st.info(f"ページ {current_batch_start + 1}～{current_batch_end}/{total_pages} を並列取得中...")
-                
-                # 並列取得
-                batch_results = fetch_pages_parallel(
-                    st.session_state.fetch_date,
-                    current_batch_start,
-                    current_batch_end,
-                    st.session_state.fetch_max_details
-                )
-                
-                # 結果を保存
-                st.session_state.all_tournaments.update(batch_results)
-                
-                # 状態を更新
-                st.session_state.fetch_current_page = current_batch_end - 1
-                st.session_state.fetch_progress = (current_batch_end / total_pages) * 100
-                
-                # 進捗情報を表示
-                batch_tournaments_count = sum(len(tournaments) for tournaments in batch_results.values())
-                st.info(f"ページ {current_batch_start + 1}～{current_batch_end}/{total_pages} 取得完了（{batch_tournaments_count} 件）")
-                progress_bar.progress(st.session_state.fetch_progress / 100)
-                
-                # バッチの進捗をリセット
-                st.session_state.batch_progress = 0
-                batch_progress_bar.progress(0)
-                
-                # 次のバッチに進む前に一時停止（サーバー負荷軽減）
-                py_time.sleep(2)
-                st.rerun()
-            
-            # すべてのページの取得が完了
-            else:
-                # 全データを集計
-                all_collected = []
-                for page_data in st.session_state.all_tournaments.values():
-                    all_collected.extend(page_data)
-                
-                # 取得完了メッセージ
-                st.success(f"すべてのページの取得完了！合計 {len(all_collected)} 件のトーナメントデータを収集しました。")
-                
-                # 取得状態をリセット
-                st.session_state.is_fetching = False
-                st.session_state.fetch_progress = 100
-                progress_bar.progress(1.0)
-                
-                # データを処理してセッションに保存
-                process_and_display_tournaments(all_collected)
-    
     # 保存されたデータがある場合は表示
-    elif st.session_state.sorted_tournaments is not None:
-        display_sorted_tournaments(st.session_state.sorted_tournaments)
+    elif snapshot is not None:
+        process_and_display_tournaments(snapshot.tournaments, index_for_snapshot(snapshot))
+    
+    elif prefetched:
+        st.info("バックグラウンドで取得中です。しばらくしてからページを再読み込みしてください。")
     
     else:
         st.info("「すべてのページを取得」ボタンを押してデータを取得してください。")
 
-def process_and_display_tournaments(tournaments):
-    """トーナメントデータを処理して表示・保存する"""
-    # 参加可否判定とJOPT分類
-    for t in tournaments:
-        t['is_available'] = is_available(t.get('start_time'), t.get('end_time'))
-        t['is_jopt'] = is_jopt_tournament(t.get('title', ''))
+    display_entry_history(date_str)
+
+def display_entry_history(date_str, days=30):
+    """
+    記録済みのエントリー数の推移（選択した日付の合計の推移と、直近 days 日の日別・会場別の集計）
+    """
+    if not st.checkbox("エントリー数の推移を表示"):
+        return
+    history = get_shared_history_store()
+    curve = history.entry_curve(date_str)
+    if not curve:
+        st.info("この日付のエントリー数の記録はまだありません。取得・差分更新のたびに記録されます。")
+    else:
+        st.subheader(f"{date_str} のエントリー数の推移")
+        st.line_chart({
+            "時刻": [datetime.fromtimestamp(at, JST).strftime('%m/%d %H:%M') for at, _ in curve],
+            "エントリー数": [total for _, total in curve],
+        }, x="時刻", y="エントリー数")
+
+    end = datetime.strptime(date_str, '%Y/%m/%d')
+    start = (end - timedelta(days=days)).strftime('%Y/%m/%d')
+    totals = history.daily_totals(start, date_str)
+    if totals:
+        st.subheader(f"直近{days}日の日別エントリー数")
+        st.bar_chart({
+            "日付": [row['date'] for row in totals],
+            "エントリー数": [row['entries'] for row in totals],
+        }, x="日付", y="エントリー数")
+        st.dataframe(
+            [{"会場": row['venue'], "トーナメント数": row['tournaments'], "エントリー数": row['entries'],
+              "埋まり具合": f"{row['fill_rate'] * 100:.0f}%" if row['fill_rate'] is not None else "-"}
+             for row in history.venue_totals(start, date_str)[:20]],
+            hide_index=True, use_container_width=True
+        )
+
+def format_guarantee_option(amount):
+    """保証額の絞り込みの選択肢の表示"""
+    if amount <= 0:
+        return "指定なし"
+    if amount == 1:
+        return "保証あり"
+    return f"{format_money(amount)}円以上"
+
+def format_fee_option(amount):
+    """参加費の絞り込みの選択肢の表示"""
+    return "指定なし" if amount is None else f"{format_money(amount)}円以下"
+
+def process_and_display_tournaments(tournaments, index=None):
+    """
+    トーナメントデータを処理して表示する
+    Args:
+        tournaments: トーナメントの一覧
+        index: tournaments の並び順・絞り込みのインデックス（スナップショットごとに作成済みのもの。省略時はここで作成）
+    """
+    started = py_time.perf_counter()
+    if index is None:
+        index = TournamentIndex([Tournament.from_dict(t) for t in tournaments])
+    
+    # 表示方法（カードはページ単位で表示し、表は1つの st.dataframe にまとめる）
+    col1, col2 = st.columns(2)
+    mode = col1.radio("表示", list(DISPLAY_MODES), horizontal=True)
+    page_size = col2.selectbox("1ページの件数", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE),
+                               disabled=DISPLAY_MODES[mode] == 'table')
     
     # ソートオプション
     sort_option = st.radio(
@@ -430,51 +356,100 @@ def process_and_display_tournaments(tournaments):
         ["時間順", "回収率順"],
         horizontal=True
     )
-    
-    # ソート処理
-    if sort_option == "時間順":
-        sorted_tournaments = sorted(tournaments, key=lambda x: x.get('start_time', '99:99'))
-    else:  # 回収率順
-        # バリュー計算
-        for t in tournaments:
-            if t['guarantee'] > 0:
-                total_entry_amount = t['current_entries'] * t['entry_fee']
-                if total_entry_amount > 0:
-                    value_ratio = t['guarantee'] / total_entry_amount
-                    t['value_ratio'] = value_ratio * 100
-                else:
-                    t['value_ratio'] = None
-            else:
-                t['value_ratio'] = None
+    sort = 'time' if sort_option == "時間順" else 'value'
+    
+    # 絞り込み（会場は件数の多い順）
+    col1, col2, col3, col4 = st.columns(4)
+    min_guarantee = col1.selectbox("保証額", GUARANTEE_BUCKETS, format_func=format_guarantee_option)
+    max_fee = col2.selectbox("参加費", (None,) + FEE_BUCKETS, format_func=format_fee_option)
+    venues = sorted(range(len(index.venues)), key=lambda v: -index.venue_counts[v])
+    venue = col3.selectbox("会場", [None] + [index.venues[v] for v in venues],
+                           format_func=lambda v: "すべて" if v is None else v)
+    available_only = col4.checkbox("参加可能のみ")
+    
+    # 表示（並び替え・絞り込みは作成済みのインデックスから取り出すだけ）
+    display_sorted_tournaments(index, sort, DISPLAY_MODES[mode], page_size, min_guarantee=min_guarantee,
+                               max_fee=max_fee, venue=venue, available_only=available_only)
+    
+    # 描画時間（直近の平均も表示）
+    elapsed = (py_time.perf_counter() - started) * 1000
+    render_times = st.session_state.setdefault('render_times', [])
+    render_times.append(elapsed)
+    del render_times[:-RENDER_TIME_HISTORY]
+    st.caption(f"描画 {elapsed:.0f}ms（直近{len(render_times)}回の平均 {sum(render_times) / len(render_times):.0f}ms）")
+
+def display_table(tournaments, available, ratios):
+    """トーナメント一覧を1つの表として表示する"""
+    rows = [{
+        '参加': "🟢" if is_open else "🔴",
+        'タイトル': t['title'],
+        '会場': t.get('venue', ''),
+        '開始': t.get('start_time') or '',
+        '締切': t.get('end_time') or '',
+        '参加費': t.get('entry_fee', 0),
+        'エントリー': f"{t.get('current_entries', 0)} / {t.get('max_entries', 0)}",
+        '保証': t.get('guarantee', 0),
+        'バリュー': format_ratio(ratio, t.get('guarantee', 0)),
+        '詳細': t.get('detail_url', ''),
+    } for t, is_open, ratio in zip(tournaments, available, ratios)]
+    st.dataframe(
+        rows,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            '参加費': st.column_config.NumberColumn(format="%d円"),
+            '保証': st.column_config.NumberColumn(format="%d円"),
+            '詳細': st.column_config.LinkColumn(display_text="詳細"),
+        },
+    )
+
+def display_sorted_tournaments(index, sort='time', mode='card', page_size=DEFAULT_PAGE_SIZE, **filters):
+    """
+    インデックスから並び順・条件に合うトーナメントを取り出して表示する
+    Args:
+        index: TournamentIndex
+        sort: 'time'（時間順）/ 'value'（回収率順）
+        mode: 'card'（カードをページ単位で表示）/ 'table'（表で全件表示）
+        page_size: カード表示の1ページの件数
+        filters: TournamentIndex.select の絞り込み条件
+    """
+    # 参加可否は1つの現在時刻で全行まとめて判定した結果を使う
+    available = index.availability()
+    tournaments = index.tournaments
+    # 並び順・条件が変わったら1ページ目に戻す
+    signature = f"{sort}:{page_size}:{sorted(filters.items(), key=str)}"
+    
+    def show(name, label, jopt):
+        total = index.count(sort, jopt, **filters)
+        st.success(f"{label}: 合計{total}件")
+        if mode == 'table':
+            rows = index.select(sort, jopt, **filters)
+            display_table([tournaments[i] for i in rows], [available[i] for i in rows], [index.ratio(i) for i in rows])
+            return
         
-        sorted_tournaments = sorted(
-            tournaments,
-            key=lambda x: x.get('value_ratio', 0) if x.get('value_ratio') is not None else 0,
-            reverse=True
+        # 表示するページの行だけを取り出して描画する
+        pages = max(1, -(-total // page_size))
+        page = 1
+        if pages > 1:
+            page = st.number_input(f"ページ（全{pages}ページ）", min_value=1, max_value=pages, value=1,
+                                   key=f"page:{name}:{signature}")
+        rows = index.select(sort, jopt, offset=(page - 1) * page_size, limit=page_size, **filters)
+        display_tournaments(
+            [tournaments[i] for i in rows],
+            [available[i] for i in rows],
+            [index.ratio(i) for i in rows],
         )
     
-    # セッションに保存
-    st.session_state.sorted_tournaments = sorted_tournaments
-    
-    # 表示
-    display_sorted_tournaments(sorted_tournaments)
-
-def display_sorted_tournaments(sorted_tournaments):
-    """ソート済みトーナメントを表示する"""
     # タブ作成
     tab1, tab2 = st.tabs(["通常トーナメント", "JOPTトーナメント"])
     
     # 通常トーナメント
     with tab1:
-        normal_tournaments = [t for t in sorted_tournaments if not t.get('is_jopt', False)]
-        st.success(f"通常トーナメント: 合計{len(normal_tournaments)}件")
-        display_tournaments(normal_tournaments)
+        show('normal', "通常トーナメント", False)
     
     # JOPTトーナメント
     with tab2:
-        jopt_tournaments = [t for t in sorted_tournaments if t.get('is_jopt', False)]
-        st.success(f"JOPTトーナメント: 合計{len(jopt_tournaments)}件")
-        display_tournaments(jopt_tournaments)
+        show('jopt', "JOPTトーナメント", True)
 
 if __name__ == "__main__":
     st.set_page_config(
@@ -0,0 +1,401 @@
+"""
+asyncio による日付単位のクロールエンジン
+
+ページ0を取得して総ページ数を確認したあと、残りの一覧ページと必要な詳細ページを
+1つの同時実行数の制限のもとで並列に取得し、1回のパスで日付分のトーナメントを返す。
+HTTP 通信は PokerfansScraper の接続プール付きセッションをスレッド経由で利用し、
+送信間隔はスクレイパーのレートリミッタを asyncio 側で待つ（待機中にスレッドを塞がない）。
+
+parse_workers を指定すると、取得と解析を分ける。取得（スレッド）は本文を受け取るだけで
+上限付きのキューに入れ、解析はプロセスプール（parse_pool.py）で行う。キューが埋まっている間は
+取得側が同時実行枠を持ったまま待つので、解析が追いつかないときは取得も止まる（背圧）。
+
+speculative を指定すると、ページ0の応答を待たずに、予測した総ページ数（page_counts.py）までの
+ページをページ0と同時に取得する。実際の総ページ数を超えたページは取り消すか結果を捨て、
+総ページ数が予測より多かった分はページ0の応答の後に取得する。
+"""
+import asyncio
+import itertools
+import logging
+import os
+import time
+from concurrent.futures import Executor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+from enrichment import DetailEnricher, EnrichmentStats
+from page_counts import PageCountStore, get_shared_page_counts, query_key
+from parse_pool import DEFAULT_PARSE_WORKERS, DEFAULT_QUEUE_SIZE, discard_shared_pool, get_shared_parse_pool, \
+    parse_detail_html, parse_list_html
+from scraper import PokerfansScraper, RawPage
+
+# 同時に実行するリクエスト数の上限（一覧・詳細の合計）
+DEFAULT_CONCURRENCY = 3
+# 取得する都道府県（カンマ区切り。空の場合はすべての地域）
+DEFAULT_LOCATIONS = tuple(
+    location.strip() for location in os.environ.get("POKERODDS_LOCATIONS", "東京都").split(",") if location.strip()
+) or ('',)
+# ページ0と同時に予測したページ数までを取得するか（1=取得する）
+DEFAULT_SPECULATIVE = os.environ.get("POKERODDS_SPECULATIVE", "0") == "1"
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCrawler:
+    """
+    1日分の一覧ページ・詳細ページをまとめて取得するクローラ
+    Args:
+        scraper: 取得・解析に使うスクレイパー（対象日付はこのスクレイパーの設定に従う）
+        concurrency: 同時リクエスト数の上限
+        max_details_per_page: 保証額が取れなかった行のうち、1ページあたり詳細ページを取得する最大数（0=取得しない）。
+            取得する行は enrichment.select_candidates の優先順（参加可能・開始が早い・参加費が高い）で選ぶ
+        on_page: 一覧ページを1枚解析するたびに呼ばれるコールバック (page, total_pages, tournaments)
+        known: 前回取得した行（detail_url → 行）。既知の行は保証額を引き継ぎ、詳細ページを取得しない
+        parse_workers: 解析に使うプロセス数（0=取得したスレッドで解析する）
+        queue_size: 解析待ちの本文の上限（parse_workers を指定した場合）
+        pool: 解析に使うプロセスプール（省略時は共有のプール）
+        enrichment_stats: 詳細ページによる保証額の補完の集計先（省略時は共有の集計）
+        semaphore: 同時実行枠（複数のクローラで共有する場合。省略時は concurrency から作成）
+        speculative: ページ0と同時に、予測した総ページ数までのページを取得するか
+        page_counts: 総ページ数の記録（speculative の場合に使う。省略時は共有の記録）
+    """
+
+    def __init__(self, scraper: PokerfansScraper, concurrency: int = DEFAULT_CONCURRENCY,
+                 max_details_per_page: int = 0,
+                 on_page: Optional[Callable[[int, int, List[Dict]], None]] = None,
+                 known: Optional[Dict[str, Dict]] = None,
+                 parse_workers: int = DEFAULT_PARSE_WORKERS, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 pool: Optional[Executor] = None, enrichment_stats: Optional[EnrichmentStats] = None,
+                 semaphore: Optional[asyncio.Semaphore] = None, speculative: bool = DEFAULT_SPECULATIVE,
+                 page_counts: Optional[PageCountStore] = None):
+        self.scraper = scraper
+        self.concurrency = max(1, concurrency)
+        self.max_details_per_page = max_details_per_page
+        self.on_page = on_page
+        self.known = known or {}
+        self.parse_workers = max(0, parse_workers)
+        self.queue_size = max(1, queue_size)
+        self.pool = pool
+        self.enricher = DetailEnricher(self._load_detail, cached=scraper.cached_detail, stats=enrichment_stats)
+        self.speculative = speculative
+        self.page_counts = page_counts
+        # 取得に失敗したページ番号
+        self.failed_pages: List[int] = []
+        # ページ0から分かった総ページ数（それまではNone）
+        self.total_pages: Optional[int] = None
+        # 投機的に取得して、総ページ数を超えていたため捨てたページ数
+        self.wasted_pages = 0
+        self._shared_semaphore = semaphore
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._queue: Optional[asyncio.Queue] = None
+
+    async def _parse(self, kind: str, raw: RawPage) -> Tuple[Dict, float]:
+        """
+        取得した本文を解析キューに入れて、プロセスプールでの解析結果を待つ
+        Returns:
+            (解析結果, 解析にかかった秒数)
+        """
+        future = asyncio.get_running_loop().create_future()
+        # キューが埋まっている間はここで待つ（呼び出し側は同時実行枠を持ったまま）
+        await self._queue.put((kind, raw, future))
+        return await future
+
+    async def _parse_worker(self, pool: Executor):
+        """キューから本文を取り出してプロセスプールで解析する"""
+        loop = asyncio.get_running_loop()
+        scraper = self.scraper
+        while True:
+            kind, raw, future = await self._queue.get()
+            try:
+                started = time.perf_counter()
+                if kind == 'list':
+                    parsed, stages = await loop.run_in_executor(pool, parse_list_html, raw.text, scraper.base_url,
+                                                                scraper.parser_name, scraper.location)
+                else:
+                    parsed, stages = await loop.run_in_executor(pool, parse_detail_html, raw.text, scraper.base_url,
+                                                                scraper.parser_name)
+                seconds = time.perf_counter() - started
+                for stage, stage_seconds in stages.items():
+                    scraper.metrics.observe(stage, stage_seconds, kind=kind)
+                if not future.done():
+                    future.set_result((parsed, seconds))
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                if isinstance(e, BrokenProcessPool) and self.pool is None:
+                    # ワーカーが異常終了した共有のプールは作り直して、残りのページの解析を続ける
+                    discard_shared_pool(pool)
+                    pool = get_shared_parse_pool(self.parse_workers)
+            finally:
+                self._queue.task_done()
+
+    def _page_failed(self, page: int, message: str, *args):
+        """失敗したページを記録（総ページ数を超えた投機的な取得は記録しない）"""
+        if self.total_pages is None or page < self.total_pages:
+            logger.warning(message, *args)
+            self.failed_pages.append(page)
+
+    async def _fetch_list(self, page: int) -> Optional[Tuple[List[Dict], Dict]]:
+        """一覧ページを取得して解析（失敗時はNone）"""
+        async with self._semaphore:
+            self.scraper.metrics.observe('sleep', await self.scraper.rate_limiter.acquire_async(), kind='list')
+            try:
+                if self._queue is None:
+                    return await asyncio.to_thread(self.scraper.fetch_tournament_list, page, False, self.known)
+                raw = await asyncio.to_thread(self.scraper.fetch_list_raw, page, False)
+                parsed, seconds = (None, 0.0) if raw.parsed is not None else await self._parse('list', raw)
+            except requests.RequestException as e:
+                self._page_failed(page, "一覧ページの取得に失敗: page=%s - %s", page, e)
+                return None
+            except Exception as e:
+                # 解析プロセスの異常終了・解析中の例外も、そのページだけの失敗として扱う
+                self._page_failed(page, "一覧ページの解析に失敗: page=%s - %r", page, e)
+                return None
+        return await asyncio.to_thread(self.scraper.complete_list, raw, parsed, seconds, self.known)
+
+    async def _fetch_detail_parsed(self, url: str) -> Dict:
+        """
+        詳細ページを取得してプロセスプールで解析
+        Raises:
+            requests.RequestException: 取得に失敗した場合（解析の失敗はその例外）
+        """
+        raw = await asyncio.to_thread(self.scraper.fetch_detail_raw, url, False)
+        parsed, seconds = (None, 0.0) if raw.parsed is not None else await self._parse('detail', raw)
+        return await asyncio.to_thread(self.scraper.complete_detail, url, raw, parsed, seconds)
+
+    async def _load_detail(self, url: str) -> Dict:
+        """詳細ページを同時実行枠・レート制限のもとで取得して解析（失敗時は例外。DetailEnricher が記録する）"""
+        async with self._semaphore:
+            waited = await self.scraper.rate_limiter.acquire_async()
+            self.scraper.metrics.observe('sleep', waited, kind='detail')
+            if self._queue is None:
+                return await asyncio.to_thread(self.scraper.load_tournament_detail, url, False)
+            return await self._fetch_detail_parsed(url)
+
+    async def _process_page(self, page: int, total_pages: int, parsed: Tuple[List[Dict], Dict]) -> List[Dict]:
+        tournaments, _ = parsed
+        await self.enricher.enrich(tournaments, self.max_details_per_page, skip=self.known)
+        if self.on_page:
+            self.on_page(page, total_pages, tournaments)
+        return tournaments
+
+    async def _crawl_page(self, page: int, total_pages: int) -> List[Dict]:
+        parsed = await self._fetch_list(page)
+        if parsed is None:
+            return []
+        return await self._process_page(page, total_pages, parsed)
+
+    async def iter_pages(self) -> AsyncIterator[Tuple[int, int, List[Dict]]]:
+        """
+        取得・解析が終わったページから順に (page, total_pages, tournaments) を返す（ページ番号順とは限らない）
+        取得に失敗したページは返さない（failed_pages に記録される）
+        """
+        self._semaphore = self._shared_semaphore or asyncio.Semaphore(self.concurrency)
+        workers: List[asyncio.Task] = []
+        if self.parse_workers:
+            self._queue = asyncio.Queue(self.queue_size)
+            pool = self.pool or get_shared_parse_pool(self.parse_workers)
+            workers = [asyncio.ensure_future(self._parse_worker(pool)) for _ in range(self.parse_workers)]
+        try:
+            async for item in self._iter_pages():
+                yield item
+        finally:
+            for worker in workers:
+                worker.cancel()
+            self._queue = None
+
+    def _page_count_key(self) -> Tuple[PageCountStore, str, str]:
+        """総ページ数の記録・検索条件のキー・日付"""
+        store = self.page_counts or get_shared_page_counts()
+        return store, query_key(self.scraper.base_url, self.scraper.params), self.scraper.params['startDate']
+
+    def _predicted_pages(self) -> int:
+        """ページ0と同時に取得するページ数（speculative でなければ1）"""
+        if not self.speculative:
+            return 1
+        store, query, date_str = self._page_count_key()
+        return store.predict(query, date_str)
+
+    def _record_total_pages(self, total_pages: int):
+        """次回の予測のために総ページ数を記録（speculative の場合のみ）"""
+        if self.speculative:
+            store, query, date_str = self._page_count_key()
+            store.record(query, date_str, total_pages)
+
+    async def _crawl_fetched(self, page: int, total_pages: int, fetching: asyncio.Future) -> List[Dict]:
+        """投機的に取得を始めていたページの結果を待って処理する"""
+        parsed = await fetching
+        if parsed is None:
+            return []
+        return await self._process_page(page, total_pages, parsed)
+
+    async def _iter_pages(self) -> AsyncIterator[Tuple[int, int, List[Dict]]]:
+        # 予測したページ数までをページ0と同時に取得する（ページ0を先に同時実行枠に並べる）
+        first_fetch = asyncio.ensure_future(self._fetch_list(0))
+        speculative = {page: asyncio.ensure_future(self._fetch_list(page))
+                       for page in range(1, self._predicted_pages())}
+        try:
+            first = await first_fetch
+        except BaseException:
+            for task in speculative.values():
+                task.cancel()
+            raise
+        if first is None:
+            for task in speculative.values():
+                task.cancel()
+            return
+        total_pages = self.total_pages = max(1, first[1].get('total_pages', 1))
+        self._record_total_pages(total_pages)
+
+        # 実際の総ページ数を超えたページは取り消す（取得済みなら結果を捨てる）
+        for page in [page for page in speculative if page >= total_pages]:
+            speculative.pop(page).cancel()
+            self.wasted_pages += 1
+        self.failed_pages = [page for page in self.failed_pages if page < total_pages]
+
+        async def numbered(page, coroutine):
+            return page, await coroutine
+
+        # ページ0の詳細取得と残りのページを同じ同時実行枠でまとめて流す
+        tasks = [asyncio.ensure_future(numbered(0, self._process_page(0, total_pages, first)))]
+        for page in range(1, total_pages):
+            if page in speculative:
+                coroutine = self._crawl_fetched(page, total_pages, speculative[page])
+            else:
+                coroutine = self._crawl_page(page, total_pages)
+            tasks.append(asyncio.ensure_future(numbered(page, coroutine)))
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                page, tournaments = await next_done
+                if page in self.failed_pages:
+                    continue
+                yield page, total_pages, tournaments
+        finally:
+            # 途中で読むのをやめた場合は残りの取得を止める
+            for task in tasks + list(speculative.values()):
+                task.cancel()
+
+    async def crawl(self) -> List[Dict]:
+        """
+        全ページを取得してページ順に結合したトーナメント一覧を返す
+        """
+        pages = {}
+        async for page, _, page_tournaments in self.iter_pages():
+            pages[page] = page_tournaments
+
+        tournaments = []
+        for page in sorted(pages):
+            tournaments.extend(pages[page])
+        return tournaments
+
+
+def search_queries(locations: Sequence[str], prizes: Sequence[str] = ('',),
+                   club_ids: Sequence[str] = ('',)) -> List[Dict[str, str]]:
+    """都道府県 × 賞品 × 店舗の検索条件の組み合わせ（重複は除く。空の一覧は指定なしとみなす）"""
+    queries = []
+    for location, prize, club_id in itertools.product(locations or ('',), prizes or ('',), club_ids or ('',)):
+        query = {'location': location, 'prize': prize, 'club_id': club_id}
+        if query not in queries:
+            queries.append(query)
+    return queries
+
+
+def merge_by_url(results: Sequence[List[Dict]]) -> List[Dict]:
+    """
+    複数の検索条件の結果を detail_url で重複を除いて結合する（先に現れた行を残す）
+    残した行の保証額が0で、重複した行に保証額があれば引き継ぐ
+    """
+    merged: Dict[str, Dict] = {}
+    for tournaments in results:
+        for t in tournaments:
+            url = t['detail_url']
+            kept = merged.get(url)
+            if kept is None:
+                merged[url] = t
+            elif not kept.get('guarantee', 0) and t.get('guarantee', 0):
+                kept['guarantee'] = t['guarantee']
+    return list(merged.values())
+
+
+def query_crawlers(scraper: PokerfansScraper, queries: Sequence[Dict[str, str]],
+                   concurrency: int = DEFAULT_CONCURRENCY, max_details_per_page: int = 0,
+                   on_page: Optional[Callable[[int, int, List[Dict]], None]] = None,
+                   known: Optional[Dict[str, Dict]] = None) -> List[AsyncCrawler]:
+    """
+    検索条件ごとのクローラ（接続プール・レート制限・キャッシュは scraper のものを共有し、
+    同時実行数は全体で concurrency に抑える）
+    Args:
+        scraper: 元にするスクレイパー（対象日付はこのスクレイパーの設定に従う）
+        queries: search_queries の戻り値
+        on_page: 一覧ページを1枚解析するたびに呼ばれるコールバック。検索条件が複数の場合は
+                 (取得済みのページ数 - 1, 判明している総ページ数, 初めて現れた行) を渡す
+        known: 前回取得した行（detail_url → 行）
+    """
+    if len(queries) == 1:
+        return [AsyncCrawler(scraper.for_query(**queries[0]), concurrency=concurrency,
+                             max_details_per_page=max_details_per_page, on_page=on_page, known=known)]
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    totals: Dict[int, int] = {}
+    seen = set()
+    done = 0
+
+    def page_callback(number: int):
+        def callback(page, total_pages, tournaments):
+            nonlocal done
+            totals[number] = total_pages
+            done += 1
+            fresh = [t for t in tournaments if t['detail_url'] not in seen]
+            seen.update(t['detail_url'] for t in fresh)
+            on_page(done - 1, sum(totals.get(i, 1) for i in range(len(queries))), fresh)
+        return callback
+
+    return [
+        AsyncCrawler(scraper.for_query(**query), concurrency=concurrency, max_details_per_page=max_details_per_page,
+                     on_page=page_callback(number) if on_page else None, known=known, semaphore=semaphore)
+        for number, query in enumerate(queries)
+    ]
+
+
+async def crawl_merged(crawlers: Sequence[AsyncCrawler]) -> List[Dict]:
+    """クローラを並列に実行して、detail_url で重複を除いた1つの一覧を返す"""
+    return merge_by_url(await asyncio.gather(*(crawler.crawl() for crawler in crawlers)))
+
+
+def date_queries(scraper: Optional[PokerfansScraper], locations: Optional[Sequence[str]] = None,
+                 prizes: Optional[Sequence[str]] = None,
+                 club_ids: Optional[Sequence[str]] = None) -> List[Dict[str, str]]:
+    """
+    crawl_date などの検索条件（省略した条件は scraper の設定、scraper もなければ
+    都道府県は DEFAULT_LOCATIONS・賞品と店舗は指定なし）
+    """
+    if locations is None:
+        locations = (scraper.location,) if scraper else DEFAULT_LOCATIONS
+    prizes = prizes or ((scraper.params['prize'],) if scraper else ('',))
+    club_ids = club_ids or ((scraper.params['clubId'],) if scraper else ('',))
+    return search_queries(locations, prizes, club_ids)
+
+
+def crawl_date(date_str: str = None, concurrency: int = DEFAULT_CONCURRENCY, max_details_per_page: int = 0,
+               on_page: Optional[Callable[[int, int, List[Dict]], None]] = None,
+               scraper: Optional[PokerfansScraper] = None, locations: Optional[Sequence[str]] = None,
+               prizes: Optional[Sequence[str]] = None, club_ids: Optional[Sequence[str]] = None) -> List[Dict]:
+    """
+    指定日付のトーナメントを1回のパスで取得（同期呼び出し用）
+    Args:
+        date_str: 'YYYY/MM/DD'形式の日付文字列。Noneの場合は今日
+        concurrency: 同時リクエスト数の上限
+        max_details_per_page: 1ページあたりの詳細取得数（0=取得しない）
+        on_page: 一覧ページごとの進捗コールバック
+        scraper: 使用するスクレイパー（省略時は date_str から作成）
+        locations: 取得する都道府県（省略時は scraper の設定、scraper もなければ DEFAULT_LOCATIONS）
+        prizes: 賞品の絞り込み（省略時は scraper の設定）
+        club_ids: 店舗の絞り込み（省略時は scraper の設定）
+    """
+    queries = date_queries(scraper, locations, prizes, club_ids)
+    scraper = scraper or PokerfansScraper(target_date=date_str)
+    crawlers = query_crawlers(scraper, queries, concurrency=concurrency,
+                              max_details_per_page=max_details_per_page, on_page=on_page)
+    return asyncio.run(crawl_merged(crawlers))
@@ -0,0 +1,169 @@
+"""
+取得結果全体に対する参加可否・JOPT判定・回収率の一括計算
+
+行ごとに is_available（毎回 datetime.now を呼ぶ）や正規表現・割り算を繰り返す代わりに、
+スナップショットごとに時刻・参加費・エントリー数・保証額を列（配列）にしておき、
+参加可否は1つの「現在時刻」で全行をまとめて判定する。
+
+NumPy があれば NumPy の配列演算を使い、なければ標準の array モジュールと
+内包表記で同じ結果を計算する（環境変数 POKERODDS_NUMPY=0 で NumPy を使わない）。
+"""
+import math
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from models import JST, Tournament, is_jopt_tournament
+
+# 深夜扱いする時刻（HHMM）の上限（0:00〜6:59 は深夜）
+NIGHT_END = 700
+# 時刻がない行の値
+MISSING_TIME = -1
+# スナップショットごとの列を保持する数
+MAX_CACHED_BATCHES = 16
+
+_numpy_module = None
+_numpy_checked = False
+
+_batch_cache: "OrderedDict[tuple, TournamentBatch]" = OrderedDict()
+_batch_lock = threading.Lock()
+
+
+def _numpy():
+    """NumPy（インストールされていない・無効化されている場合はNone）"""
+    global _numpy_module, _numpy_checked
+    if not _numpy_checked:
+        if os.environ.get("POKERODDS_NUMPY", "1") != "0":
+            try:
+                import numpy
+                _numpy_module = numpy
+            except ImportError:
+                _numpy_module = None
+        _numpy_checked = True
+    return _numpy_module
+
+
+def time_key(time_str: Optional[str]) -> int:
+    """'HH:MM' を HHMM の整数に変換（(時, 分) の大小関係をそのまま保つ）。解析できなければ MISSING_TIME"""
+    if not time_str:
+        return MISSING_TIME
+    try:
+        hours, minutes = map(int, time_str.split(':'))
+    except (ValueError, AttributeError):
+        return MISSING_TIME
+    return hours * 100 + minutes
+
+
+def _available(start: int, end: int, current: int) -> bool:
+    """models.is_available と同じ判定を HHMM の整数で行う"""
+    if start < 0:
+        return False
+    if start < NIGHT_END:
+        return current < NIGHT_END and current < start
+    if current < start:
+        return True
+    if end < 0:
+        return False
+    if end < NIGHT_END:
+        return current >= NIGHT_END or current < end
+    return current < end
+
+
+def _row_values(t) -> tuple:
+    """列にする値（タイトル・開始・締切・参加費・エントリー数・保証額）"""
+    if isinstance(t, Tournament):
+        return t.title, t.start_time, t.end_time, t.entry_fee or 0, t.current_entries or 0, t.guarantee or 0
+    return (t.get('title', ''), t.get('start_time'), t.get('end_time'), t.get('entry_fee', 0) or 0,
+            t.get('current_entries', 0) or 0, t.get('guarantee', 0) or 0)
+
+
+class TournamentBatch:
+    """
+    トーナメントの一覧を列（配列）として持つ
+    Args:
+        tournaments: トーナメントの一覧（Tournament または同じキーを持つ dict）
+        use_numpy: NumPy を使うか（省略時はインストールされていれば使う）
+    """
+
+    def __init__(self, tournaments: Sequence, use_numpy: bool = None):
+        np = _numpy() if use_numpy is None or use_numpy else None
+        self.np = np
+        self.size = len(tournaments)
+
+        columns = list(zip(*map(_row_values, tournaments))) or [()] * 6
+        titles, start_times, end_times, entry_fee, current_entries, guarantee = columns
+        # 同じ時刻文字列が多いので、異なる値ごとに1回だけ変換する
+        keys = {value: time_key(value) for value in set(start_times) | set(end_times)}
+        start_keys = [keys[value] for value in start_times]
+        end_keys = [keys[value] for value in end_times]
+        is_jopt = [is_jopt_tournament(title) for title in titles]
+
+        if np is not None:
+            self.start_keys = np.array(start_keys, dtype=np.int32)
+            self.end_keys = np.array(end_keys, dtype=np.int32)
+            self.guarantee = np.array(guarantee, dtype=np.int64)
+            self.total_entry = np.array(entry_fee, dtype=np.int64) * np.array(current_entries, dtype=np.int64)
+            self.is_jopt = np.array(is_jopt, dtype=bool)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = self.guarantee / self.total_entry * 100
+            self.value_ratio = np.where((self.guarantee > 0) & (self.total_entry > 0), ratio, np.nan)
+        else:
+            self.start_keys = array('i', start_keys)
+            self.end_keys = array('i', end_keys)
+            self.guarantee = array('q', guarantee)
+            self.total_entry = array('q', [fee * entries for fee, entries in zip(entry_fee, current_entries)])
+            self.is_jopt = is_jopt
+            self.value_ratio = array('d', [
+                g / total * 100 if g > 0 and total > 0 else math.nan
+                for g, total in zip(self.guarantee, self.total_entry)
+            ])
+
+    def __len__(self) -> int:
+        return self.size
+
+    def availability(self, now: datetime = None) -> Sequence[bool]:
+        """全行の参加可否（now を基準に一括判定。省略時は現在の日本時間）"""
+        if now is None:
+            now = datetime.now(JST)
+        current = now.hour * 100 + now.minute
+        np = self.np
+        if np is None:
+            return [_available(s, e, current) for s, e in zip(self.start_keys, self.end_keys)]
+
+        start, end = self.start_keys, self.end_keys
+        before_start = current < start
+        night_now = current < NIGHT_END
+        # 日中開始: 開始前、または締切前（締切が深夜なら翌日の締切として扱う）
+        end_ok = np.where(end < NIGHT_END, (not night_now) | (current < end), current < end) & (end >= 0)
+        daytime = before_start | end_ok
+        # 深夜開始: 現在も深夜で開始前の場合のみ
+        night = before_start & night_now
+        return np.where(start < NIGHT_END, night, daytime) & (start >= 0)
+
+    def ratio(self, index: int) -> Optional[float]:
+        """index 行目の回収率（%）。保証なし・エントリー総額0ならNone"""
+        value = float(self.value_ratio[index])
+        return None if math.isnan(value) else value
+
+    def ratios(self) -> List[Optional[float]]:
+        """全行の回収率（%）"""
+        return [None if math.isnan(value) else value for value in self.value_ratio.tolist()]
+
+
+def batch_for_snapshot(snapshot) -> TournamentBatch:
+    """スナップショットごとに1回だけ列を作成して再利用する"""
+    key = (snapshot.date, snapshot.fetched_at, len(snapshot.tournaments))
+    with _batch_lock:
+        batch = _batch_cache.get(key)
+        if batch is not None:
+            _batch_cache.move_to_end(key)
+            return batch
+    batch = TournamentBatch(snapshot.tournaments)
+    with _batch_lock:
+        _batch_cache[key] = batch
+        while len(_batch_cache) > MAX_CACHED_BATCHES:
+            _batch_cache.popitem(last=False)
+    return batch
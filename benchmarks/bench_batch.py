@@ -0,0 +1,73 @@
+"""
+参加可否・JOPT判定・回収率の計算時間を計測
+
+    python benchmarks/bench_batch.py [--rows 10000] [--repeat 20]
+
+変更前と同じ「行ごとに is_available（毎回 datetime.now）・正規表現・割り算」を行う方法と、
+スナップショットごとに列を作って一括計算する方法（NumPy / 標準の array）を比較する。
+列の作成はスナップショットごとに1回なので、表示のたびにかかるのは一括判定の時間だけになる。
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch import TournamentBatch, _numpy  # noqa: E402
+from models import Tournament, is_available, is_jopt_tournament, value_ratio  # noqa: E402
+from stub_server import make_event  # noqa: E402
+
+
+def make_rows(count):
+    rows = []
+    for n in range(count):
+        event = make_event(n // 50, n % 50)
+        hour = (7 + n) % 24
+        rows.append(Tournament(title=('JOPT ' if n % 9 == 0 else '') + event['title'], venue=event['venue'],
+                               start_time=f'{hour:02d}:{(n * 7) % 60:02d}', end_time=f'{(hour + 2) % 24:02d}:30',
+                               entry_fee=(n % 5 + 1) * 1000, current_entries=n % 30, max_entries=40,
+                               detail_url=str(n), guarantee=(n % 4) * 50000))
+    return rows
+
+
+def per_row(rows):
+    """変更前の process_and_display_tournaments と format_odds の計算"""
+    for t in rows:
+        is_available(t['start_time'], t['end_time'])
+        is_jopt_tournament(t['title'])
+        value_ratio(t['guarantee'], t['entry_fee'], t['current_entries'])
+        value_ratio(t['guarantee'], t['entry_fee'], t['current_entries'])
+
+
+def best(func, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    print(f"{args.rows} rows")
+    print(f"{'method':<28}{'build ms':>10}{'per render ms':>16}")
+    print(f"{'per-row (before)':<28}{'-':>10}{best(lambda: per_row(rows), args.repeat):>16.2f}")
+
+    modes = [('numpy', True)] if _numpy() is not None else []
+    modes.append(('array (no numpy)', False))
+    for name, use_numpy in modes:
+        build_ms = best(lambda: TournamentBatch(rows, use_numpy=use_numpy), max(1, args.repeat // 4))
+        batch = TournamentBatch(rows, use_numpy=use_numpy)
+        render_ms = best(lambda: (batch.availability(), batch.ratios()), args.repeat)
+        print(f"{'batch ' + name:<28}{build_ms:>10.2f}{render_ms:>16.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+保証額抽出のマイクロベンチマーク（従来のメソッド vs コンパイル済みエンジン）
+
+    python benchmarks/bench_guarantee.py [--size 20000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from guarantee import extract_detail_guarantee, extract_title_guarantee  # noqa: E402
+
+
+def legacy_extract_guarantee(text):
+    """変更前の PokerfansScraper._extract_guarantee"""
+    if not text:
+        return 0
+    text = text.translate(str.maketrans('０１２３４５６７８９', '0123456789'))
+    patterns = [
+        (r'(?:総額)?(\d+)万(?:円|coin|コイン)?(?:相当|保証)?', lambda x: int(x) * 10000),
+        (r'(?:Web|ウェブ)?(?:最低保証)?[^\d]*(\d+[,\d]*)(?:円|coin|コイン)(?:保証)?',
+         lambda x: int(x.replace(',', ''))),
+    ]
+    for pattern, converter in patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            try:
+                return converter(match.group(1))
+            except (ValueError, IndexError):
+                continue
+    return 0
+
+
+def legacy_extract_guarantee_from_detail(text):
+    """変更前の PokerfansScraper._extract_guarantee_from_detail"""
+    if not text:
+        return 0
+    text = text.translate(str.maketrans('０１２３４５６７８９', '0123456789'))
+    patterns = [
+        (r'(\d+)万円保証', lambda x: int(x) * 10000),
+        (r'(\d+)万保証', lambda x: int(x) * 10000),
+        (r'(\d+[,\d]*)円保証', lambda x: int(x.replace(',', ''))),
+        (r'(\d+)万(?:coin|コイン)保証', lambda x: int(x) * 10000),
+        (r'(\d+[,\d]*)(?:coin|コイン)保証', lambda x: int(x.replace(',', ''))),
+        (r'総額(\d+)万保証', lambda x: int(x) * 10000),
+        (r'最低保証[^\d]*(\d+)万', lambda x: int(x) * 10000),
+        (r'最低保証[^\d]*(\d+[,\d]*)(?:coin|コイン)', lambda x: int(x.replace(',', ''))),
+    ]
+    for pattern, converter in patterns:
+        match = re.search(pattern, text, re.MULTILINE | re.IGNORECASE)
+        if match:
+            try:
+                return converter(match.group(1))
+            except (ValueError, IndexError):
+                continue
+    return 0
+
+
+TITLE_SAMPLES = [
+    '【毎日開催】デイリートーナメント 10万保証', 'ウィークリー１０万円保証', 'Web予約 50,000coin',
+    'JOPT サテライト', 'ナイトターボ 参加費3,000円', 'ディープスタック', '総額84万相当 スペシャル',
+]
+DETAIL_SAMPLES = [
+    '参加費: 3,000円\nリエントリー: 2,000円\n' * 8 + '本トーナメントは30万円保証です。',
+    'ブラインド構成\n' + 'Lv{} 100/200 (20分)\n' * 30 + '最低保証：8万',
+    'スタック 30,000点\nレイトレジスト Lv8まで\n' * 10,
+]
+
+
+def corpus(samples, size, seed):
+    rng = random.Random(seed)
+    return [rng.choice(samples) + f' #{i}' for i in range(size)]
+
+
+def bench(func, texts, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in texts:
+            func(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    cases = [
+        ('title', corpus(TITLE_SAMPLES, args.size, 0), legacy_extract_guarantee, extract_title_guarantee),
+        ('detail', corpus(DETAIL_SAMPLES, args.size // 10, 1),
+         legacy_extract_guarantee_from_detail, extract_detail_guarantee),
+    ]
+    print(f"{'kind':<8}{'texts':>8}{'legacy us':>12}{'engine us':>12}{'speedup':>9}  identical")
+    for kind, texts, legacy, engine in cases:
+        identical = all(legacy(t) == engine(t) for t in texts)
+        legacy_time = bench(legacy, texts, args.repeat)
+        engine_time = bench(engine, texts, args.repeat)
+        print(f"{kind:<8}{len(texts):>8}{legacy_time / len(texts) * 1e6:>12.2f}"
+              f"{engine_time / len(texts) * 1e6:>12.2f}{legacy_time / engine_time:>8.1f}x  {identical}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+エントリー数の推移の保存・集計にかかる時間を計測
+
+    python benchmarks/bench_history.py [--days 30] [--tournaments 250] [--polls 96]
+
+1日あたり tournaments 件のトーナメントを polls 回（15分ごと）取得したとして1か月分のサンプルを記録し、
+画面で使う集計（日付の推移・直近の日別・会場別）の時間を測る。
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history import HistoryStore  # noqa: E402
+
+
+def best(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--tournaments', type=int, default=250)
+    parser.add_argument('--polls', type=int, default=96, help="1日あたりの取得回数")
+    args = parser.parse_args()
+
+    store = HistoryStore(os.path.join(tempfile.mkdtemp(prefix="pokerodds-history-"), "history.sqlite3"))
+    rng = random.Random(0)
+    first = datetime(2025, 3, 1)
+    dates = [(first + timedelta(days=d)).strftime('%Y/%m/%d') for d in range(args.days)]
+
+    started = time.perf_counter()
+    added = polled = 0
+    for day, date_str in enumerate(dates):
+        entries = [0] * args.tournaments
+        for poll in range(args.polls):
+            # 取得のたびに一部のトーナメントだけエントリー数が増える
+            for i in rng.sample(range(args.tournaments), args.tournaments // 10):
+                entries[i] = min(40, entries[i] + 1)
+            rows = [{'detail_url': f'https://pokerfans.jp/tournaments/{day * 10000 + i}', 'title': f'T{i}',
+                     'venue': f'会場{i % 25}', 'start_time': '19:00', 'entry_fee': 3000,
+                     'current_entries': entries[i], 'max_entries': 40, 'guarantee': 0}
+                     for i in range(args.tournaments)]
+            added += store.record(date_str, rows, sampled_at=first.timestamp() + day * 86400 + poll * 900)['added']
+            polled += len(rows)
+    record_seconds = time.perf_counter() - started
+
+    print(f"記録: {polled} 行中 {added} 件を保存（{polled - added} 件は変化なし） "
+          f"{record_seconds / (args.days * args.polls) * 1000:.2f}ms/回")
+    last = dates[-1]
+    print(f"entry_curve（1日分）:        {best(lambda: store.entry_curve(last)):.2f}ms")
+    print(f"entry_curve（1会場）:        {best(lambda: store.entry_curve(last, venue='会場3')):.2f}ms")
+    print(f"daily_totals（{args.days}日分）:     {best(lambda: store.daily_totals(dates[0], last)):.2f}ms")
+    print(f"venue_totals（{args.days}日分）:     {best(lambda: store.venue_totals(dates[0], last)):.2f}ms")
+    print(f"growth（1件）:               "
+          f"{best(lambda: store.growth('https://pokerfans.jp/tournaments/7')):.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+エントリポイントごとの import 時間を python -X importtime で計測
+
+    python benchmarks/bench_import.py [--repeat 5] [--top 8] [--json]
+
+ヘッドレスの入口（main.py・prefetch.py・スクレイパー）と Streamlit アプリ（app.py）を
+それぞれ新しいプロセスで import し、累計時間の最良値と、重い順のトップレベルのモジュールを表示する。
+app.py は import 時には画面を描画しない（__main__ でのみ main() を呼ぶ）。
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 計測する入口（ヘッドレス → アプリの順）
+ENTRY_POINTS = ['scraper', 'async_crawler', 'main', 'prefetch', 'app']
+# 入口ごとに読み込まれていないことを確認する重い依存
+HEAVY_MODULES = ['streamlit', 'pandas', 'numpy', 'selectolax', 'lxml', 'bs4']
+
+
+def import_time(module: str) -> Tuple[int, List[Tuple[str, int]], List[str]]:
+    """
+    module を新しいプロセスで import して (累計マイクロ秒, [(直接 import したモジュール, 累計)], 読み込まれた重い依存) を返す
+    """
+    check = f"import sys; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}; {check}"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    # importtime は子モジュールを先に、親を後に出力する（インデントが深さ）
+    children: List[Tuple[str, int]] = []
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        if depth == 1:
+            children.append((name.strip(), int(cumulative)))
+        elif depth == 0:
+            if name.strip() == module:
+                total = int(cumulative)
+                break
+            children = []
+    heavy = [name for name in result.stdout.strip().split(",") if name]
+    return total, sorted(children, key=lambda item: -item[1]), heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=8, help="表示する重いモジュールの数")
+    parser.add_argument('--json', action='store_true', help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    results = {}
+    for module in ENTRY_POINTS:
+        runs = [import_time(module) for _ in range(args.repeat)]
+        total, top_level, heavy = min(runs, key=lambda run: run[0])
+        results[module] = {'ms': round(total / 1000, 1), 'heavy': heavy,
+                           'top': [[name, round(us / 1000, 1)] for name, us in top_level[:args.top]]}
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    print(f"{'entry point':<16}{'import ms':>10}  heavy modules")
+    for module, result in results.items():
+        print(f"{module:<16}{result['ms']:>10.1f}  {', '.join(result['heavy']) or '-'}")
+    for module, result in results.items():
+        print(f"\n{module}: " + ", ".join(f"{name} {ms:.1f}ms" for name, ms in result['top']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+1セッションあたりの一覧データのメモリ使用量を計測
+
+    python benchmarks/bench_memory.py [--sizes 1000 10000]
+
+スタブサーバと同じHTMLを解析した行から、変更前の持ち方（参加可否・JOPT判定・回収率を
+書き込んだ dict の一覧＋並べ替えた一覧）と Tournament の一覧＋並べ替えた一覧を作り、
+tracemalloc で増えたメモリを比較する。文字列は1行ごとに新しく作る（解析直後と同じ状態）。
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Tournament, is_available, is_jopt_tournament, value_ratio  # noqa: E402
+from scraper import PokerfansScraper  # noqa: E402
+from stub_server import StubPokerfans  # noqa: E402
+
+
+def fresh(value):
+    """解析直後と同じく、行ごとに別の文字列オブジェクトにする"""
+    return value.encode().decode() if isinstance(value, str) else value
+
+
+def as_dicts(rows):
+    """変更前の app.py と同じ dict の一覧"""
+    tournaments = []
+    for row in rows:
+        t = {key: fresh(value) for key, value in row.items()}
+        t['is_available'] = is_available(t['start_time'], t['end_time'])
+        t['is_jopt'] = is_jopt_tournament(t['title'])
+        t['value_ratio'] = value_ratio(t['guarantee'], t['entry_fee'], t['current_entries'])
+        tournaments.append(t)
+    return tournaments
+
+
+def as_tournaments(rows):
+    return [Tournament(**{key: fresh(value) for key, value in row.items()}) for row in rows]
+
+
+def session_footprint(build, rows):
+    """一覧とその並べ替え済みの一覧を作ったときに増えたバイト数"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tournaments = build(rows)
+    sorted_tournaments = sorted(tournaments, key=lambda x: x.get('start_time') or '99:99')
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del tournaments, sorted_tournaments
+    return used
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    args = parser.parse_args()
+
+    per_page = 50
+    pages = -(-max(args.sizes) // per_page)
+    stub = StubPokerfans(total_pages=pages, events_per_page=per_page)
+    scraper = PokerfansScraper()
+    rows = []
+    for page in range(pages):
+        tournaments, _ = scraper.parse_tournament_list(stub.list_html(page))
+        rows.extend(t.to_dict() for t in tournaments)
+
+    print(f"{'rows':>8}{'dict KB':>12}{'Tournament KB':>16}{'dict B/row':>13}{'slots B/row':>13}{'ratio':>8}")
+    for size in args.sizes:
+        sample = rows[:size]
+        dict_bytes = session_footprint(as_dicts, sample)
+        slots_bytes = session_footprint(as_tournaments, sample)
+        print(f"{len(sample):>8}{dict_bytes / 1024:>12.0f}{slots_bytes / 1024:>16.0f}"
+              f"{dict_bytes / len(sample):>13.0f}{slots_bytes / len(sample):>13.0f}"
+              f"{slots_bytes / dict_bytes:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
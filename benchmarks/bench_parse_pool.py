@@ -0,0 +1,62 @@
+"""
+プロセスプールでの解析のスケーリング（記録済みのHTMLを使用。既定は合成のページ）
+
+    python benchmarks/bench_parse_pool.py [--fixtures benchmarks/fixtures/synthetic] [--copies 40]
+                                          [--workers 1 2 4]
+
+記録済みの一覧・詳細ページを copies 回ずつ並べ、プロセス数を変えて全ページを解析する時間を計測する。
+取得は含まない（解析だけが CPU 処理としてプロセス数に比例して速くなるかを見る）。
+CPU 数より多いプロセス数では速くならない。
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_suite import DEFAULT_FIXTURES, load_fixtures  # noqa: E402
+from parse_pool import create_pool, parse_detail_html, parse_list_html  # noqa: E402
+
+BASE_URL = "https://pokerfans.jp/"
+
+
+def bench_workers(list_pages: List[str], detail_pages: List[str], workers: int) -> Dict:
+    """workers プロセスで全ページを解析する時間（プロセスの起動時間は含めない）"""
+    with create_pool(workers) as pool:
+        # 各プロセスの起動と解析バックエンドの読み込みを済ませる
+        list(pool.map(parse_list_html, list_pages[:workers], [BASE_URL] * workers))
+        started = time.perf_counter()
+        lists = pool.map(parse_list_html, list_pages, [BASE_URL] * len(list_pages), chunksize=4)
+        details = pool.map(parse_detail_html, detail_pages, [BASE_URL] * len(detail_pages), chunksize=16)
+        rows = sum(len(parsed['tournaments']) for parsed, _ in lists)
+        list(details)
+        seconds = time.perf_counter() - started
+    pages = len(list_pages) + len(detail_pages)
+    return {'workers': workers, 'pages': pages, 'rows': rows, 'seconds': round(seconds, 3),
+            'pages_per_second': round(pages / seconds, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES, help="記録済みのHTMLのディレクトリ")
+    parser.add_argument('--copies', type=int, default=40, help="記録済みのページを並べる回数")
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}), help="計測するプロセス数")
+    args = parser.parse_args()
+
+    list_pages, detail_pages = load_fixtures(args.fixtures)
+    list_pages, detail_pages = list_pages * args.copies, detail_pages * args.copies
+    print(f"CPU数: {os.cpu_count()}  一覧: {len(list_pages)}ページ  詳細: {len(detail_pages)}ページ")
+
+    baseline = None
+    for workers in args.workers:
+        result = bench_workers(list_pages, detail_pages, workers)
+        baseline = baseline or result['seconds']
+        print(f"workers={workers:>2}: {result['seconds']:.3f}秒  {result['pages_per_second']:>8.1f} ページ/秒  "
+              f"速度比 {baseline / result['seconds']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
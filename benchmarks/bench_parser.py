@@ -0,0 +1,61 @@
+"""
+解析バックエンドごとの1ページあたりの解析時間を計測
+
+    python benchmarks/bench_parser.py [--pages 20] [--repeat 5]
+
+一覧ページ（50件/ページ）と詳細ページをスタブサーバと同じHTMLで生成し、
+変更前と同じ「html.parser で文書全体を解析」と各バックエンドを比較する。
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import SoupBackend, available_backends, get_backend  # noqa: E402
+from scraper import PokerfansScraper  # noqa: E402
+from stub_server import StubPokerfans  # noqa: E402
+
+
+def measure(scraper, list_pages, detail_pages, repeat):
+    """一覧・詳細それぞれの1ページあたりの最良時間（ミリ秒）"""
+    best_list = best_detail = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for html in list_pages:
+            scraper.parse_tournament_list(html)
+        best_list = min(best_list, (time.perf_counter() - started) / len(list_pages))
+
+        started = time.perf_counter()
+        for html in detail_pages:
+            scraper.parse_tournament_detail(html)
+        best_detail = min(best_detail, (time.perf_counter() - started) / len(detail_pages))
+    return best_list * 1000, best_detail * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    stub = StubPokerfans(total_pages=args.pages, events_per_page=50)
+    list_pages = [stub.list_html(page) for page in range(args.pages)]
+    detail_pages = [stub.detail_html(page * 100 + 1) for page in range(args.pages)]
+
+    backends = [SoupBackend('html.parser', strain=False)] + [get_backend(name) for name in available_backends()]
+    expected = None
+
+    print(f"{'backend':<22}{'list ms/page':>14}{'detail ms/page':>16}  identical")
+    for backend in backends:
+        scraper = PokerfansScraper(parser='html.parser')
+        scraper.parser = backend
+        output = [scraper.parse_tournament_list(html) for html in list_pages]
+        expected = expected if expected is not None else output
+        list_ms, detail_ms = measure(scraper, list_pages, detail_pages, args.repeat)
+        print(f"{backend.name:<22}{list_ms:>14.2f}{detail_ms:>16.3f}  {output == expected}")
+
+
+if __name__ == '__main__':
+    main()
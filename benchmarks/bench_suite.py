@@ -0,0 +1,282 @@
+"""
+記録済みのHTMLを使ったオフラインのベンチマーク一式（結果はJSONで出力）
+
+    python benchmarks/bench_suite.py [--fixtures benchmarks/fixtures/synthetic] [--output result.json]
+                                     [--baseline previous.json] [--tolerance 0.25] [--quick]
+
+本番サイトにはアクセスせず、record_fixtures.py で記録した一覧・詳細ページを使って
+次の項目を計測する。既定の benchmarks/fixtures/synthetic はスタブサーバが生成した合成のページで、
+本番のページより小さく構造も単純なので、解析時間などの値は本番の値の目安にはならない
+（変更前後の比較にだけ使う）。本番のページで計測するには record_fixtures.py --source live で
+benchmarks/fixtures/pokerfans に記録して --fixtures に指定する。
+
+- parse: 一覧・詳細ページの1ページあたりの解析時間（と、解析結果のキャッシュから読み出す時間）
+- guarantee: タイトル・詳細本文からの保証額抽出のスループット
+- crawl: スタブサーバ（FixturePokerfans）から全ページを取得する時間（同時実行数 × レート）
+- memory: 全ページの取得と一覧用の列・インデックス作成までのピークメモリ
+
+--baseline に以前の結果を渡すと、許容幅（--tolerance）を超えて悪化した項目を表示して終了コード1で終わる。
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_crawler import AsyncCrawler  # noqa: E402
+from batch import TournamentBatch, _numpy  # noqa: E402
+from detail_cache import DetailCache  # noqa: E402
+from guarantee import extract_detail_guarantee, extract_title_guarantee  # noqa: E402
+from http_cache import ValidatorStore, body_hash  # noqa: E402
+from http_session import create_session  # noqa: E402
+from metrics import Metrics  # noqa: E402
+from parsed_cache import ParsedPageCache  # noqa: E402
+from rate_limiter import RateLimiter  # noqa: E402
+from scraper import PokerfansScraper  # noqa: E402
+from stub_server import FixturePokerfans  # noqa: E402
+from tournament_index import TournamentIndex  # noqa: E402
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "synthetic")
+# 取得時間を計測する (同時実行数, 1秒あたりのリクエスト数)
+CRAWL_MATRIX = [(c, r) for c in (1, 3, 8) for r in (5.0, 20.0, 1000.0)]
+QUICK_CRAWL_MATRIX = [(1, 1000.0), (3, 1000.0)]
+# スタブサーバの応答遅延（秒）
+DEFAULT_LATENCY = 0.02
+
+
+def load_fixtures(directory: str) -> Tuple[List[str], List[str]]:
+    """記録済みの一覧ページ・詳細ページのHTML"""
+    stub = FixturePokerfans(directory)
+    list_pages = [stub.list_html(page) for page in stub.list_pages]
+    detail_pages = [stub.detail_html(event_id) for event_id in stub.detail_ids]
+    return list_pages, detail_pages
+
+
+def best_of(func, repeat: int) -> float:
+    """repeat 回実行したうちの最短時間（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench_parse(list_pages: List[str], detail_pages: List[str], repeat: int) -> Dict:
+    """一覧・詳細ページの1ページあたりの解析時間"""
+    scraper = PokerfansScraper(detail_cache=DetailCache(":memory:"), validators=ValidatorStore(":memory:"))
+    rows = sum(len(scraper.parse_tournament_list(html)[0]) for html in list_pages)
+    list_seconds = best_of(lambda: [scraper.parse_tournament_list(html) for html in list_pages], repeat)
+    detail_seconds = best_of(lambda: [scraper.parse_tournament_detail(html) for html in detail_pages], repeat)
+
+    # 同じ本文を解析済みの場合（本文のハッシュと解析結果のキャッシュの読み出し）
+    cache = ParsedPageCache(":memory:")
+    for html in list_pages:
+        tournaments, pagination = scraper.parse_tournament_list(html)
+        cache.put("list", body_hash(html.encode('utf-8')), {'tournaments': tournaments, 'pagination': pagination})
+    cached_seconds = best_of(
+        lambda: [cache.get("list", body_hash(html.encode('utf-8'))) for html in list_pages], repeat)
+    return {
+        'backend': scraper.parser.name,
+        'list_pages': len(list_pages),
+        'rows_per_page': round(rows / max(1, len(list_pages)), 1),
+        'list_ms_per_page': round(list_seconds / max(1, len(list_pages)) * 1000, 3),
+        'detail_ms_per_page': round(detail_seconds / max(1, len(detail_pages)) * 1000, 3),
+        'cached_list_ms_per_page': round(cached_seconds / max(1, len(list_pages)) * 1000, 3),
+    }
+
+
+def bench_guarantee(list_pages: List[str], detail_pages: List[str], size: int, repeat: int) -> Dict:
+    """記録済みのタイトル・詳細本文からの保証額抽出のスループット（件/秒）"""
+    scraper = PokerfansScraper(detail_cache=DetailCache(":memory:"), validators=ValidatorStore(":memory:"))
+    p = scraper.parser
+    titles = [t['title'] for html in list_pages for t in scraper.parse_tournament_list(html)[0]]
+    details = []
+    for html in detail_pages:
+        pre = p.select_one(p.parse(html), 'pre.pre-white')
+        details.append(p.text(pre) if pre else '')
+
+    result = {}
+    for kind, texts, extract, count in (('title', titles, extract_title_guarantee, size),
+                                        ('detail', details, extract_detail_guarantee, max(1, size // 10))):
+        if not texts:
+            continue
+        # 同じ文字列の繰り返しにならないよう番号を付けて件数をそろえる
+        corpus = [f"{texts[i % len(texts)]} #{i}" for i in range(count)]
+        seconds = best_of(lambda: [extract(text) for text in corpus], repeat)
+        result[f'{kind}_texts'] = count
+        result[f'{kind}_per_second'] = round(count / seconds)
+    return result
+
+
+def crawl_fixtures(directory: str, concurrency: int, rate: float, latency: float,
+                   max_details: int) -> Tuple[List, Dict]:
+    """スタブサーバから全ページを取得して (tournaments, 計測結果) を返す（キャッシュは毎回空にする）"""
+    cache_path = os.path.join(tempfile.mkdtemp(prefix="pokerodds-bench-"), "cache.sqlite3")
+    with FixturePokerfans(directory, latency=latency) as stub:
+        scraper = PokerfansScraper(target_date="2025/03/27", session=create_session(), base_url=stub.base_url,
+                                   rate_limiter=RateLimiter(rate=rate, burst=3, jitter=0),
+                                   detail_cache=DetailCache(cache_path), validators=ValidatorStore(cache_path),
+                                   metrics=Metrics())
+        crawler = AsyncCrawler(scraper, concurrency=concurrency, max_details_per_page=max_details)
+        started = time.perf_counter()
+        tournaments = asyncio.run(crawler.crawl())
+        seconds = time.perf_counter() - started
+    return tournaments, {
+        'concurrency': concurrency,
+        'rate': rate,
+        'latency': latency,
+        'seconds': round(seconds, 3),
+        'requests': len(stub.requests),
+        'rows': len(tournaments),
+        'failed_pages': len(crawler.failed_pages),
+        'stages': scraper.metrics.summary(),
+    }
+
+
+def bench_memory(directory: str, max_details: int) -> Dict:
+    """全ページの取得と列・インデックスの作成までのピークメモリ"""
+    tracemalloc.start()
+    try:
+        tournaments, _ = crawl_fixtures(directory, 8, 1000.0, 0.0, max_details)
+        TournamentIndex(tournaments, TournamentBatch(tournaments))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    result = {'rows': len(tournaments), 'peak_bytes': peak}
+    try:
+        import resource
+        # Linux は KB、macOS はバイト単位
+        result['maxrss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        pass
+    return result
+
+
+def metadata(directory: str) -> Dict:
+    """計測環境と使用した記録"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ''
+    manifest = {}
+    manifest_path = os.path.join(directory, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': commit or None,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': _numpy() is not None,
+        'fixtures': dict({key: manifest.get(key) for key in ('date', 'source', 'recorded_at')},
+                         synthetic=manifest.get('source') != 'live'),
+    }
+
+
+def run_suite(directory: str = DEFAULT_FIXTURES, repeat: int = 5, texts: int = 20000,
+              crawl_matrix: List[Tuple[int, float]] = None, latency: float = DEFAULT_LATENCY,
+              max_details: int = 5) -> Dict:
+    """すべての項目を計測して結果を返す"""
+    list_pages, detail_pages = load_fixtures(directory)
+    results = {
+        'meta': metadata(directory),
+        'parse': bench_parse(list_pages, detail_pages, repeat),
+        'guarantee': bench_guarantee(list_pages, detail_pages, texts, repeat),
+        'crawl': [crawl_fixtures(directory, concurrency, rate, latency, max_details)[1]
+                  for concurrency, rate in (crawl_matrix or CRAWL_MATRIX)],
+        'memory': bench_memory(directory, max_details),
+    }
+    return results
+
+
+def flatten(results: Dict) -> Dict[str, float]:
+    """比較する数値の項目（'parse.list_ms_per_page' / 'crawl.c3-r20.seconds' など）"""
+    flat = {}
+    for section in ('parse', 'guarantee', 'memory'):
+        for key, value in results.get(section, {}).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                flat[f'{section}.{key}'] = value
+    for run in results.get('crawl', []):
+        flat[f"crawl.c{run['concurrency']}-r{run['rate']:g}.seconds"] = run['seconds']
+    return flat
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float = 0.25) -> List[str]:
+    """
+    baseline より tolerance（割合）を超えて悪化した項目
+    時間・メモリは増加、スループット（_per_second）は減少を悪化とみなす
+    """
+    current, previous = flatten(results), flatten(baseline)
+    regressions = []
+    for key in ('parse.list_ms_per_page', 'parse.detail_ms_per_page', 'parse.cached_list_ms_per_page',
+                'guarantee.title_per_second',
+                'guarantee.detail_per_second', 'memory.peak_bytes'):
+        if key in current and key in previous:
+            regressions += _check(key, current[key], previous[key], tolerance)
+    for key in current:
+        if key.startswith('crawl.') and key in previous:
+            regressions += _check(key, current[key], previous[key], tolerance)
+    return regressions
+
+
+def _check(key: str, value: float, before: float, tolerance: float) -> List[str]:
+    if not before:
+        return []
+    higher_is_better = key.endswith('_per_second')
+    change = (value - before) / before
+    worse = -change if higher_is_better else change
+    if worse > tolerance:
+        return [f"{key}: {before} -> {value} ({change:+.0%})"]
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES,
+                        help="記録済みのHTMLのディレクトリ（既定は合成のページ）")
+    parser.add_argument('--output', help="結果のJSONの保存先（省略時は標準出力）")
+    parser.add_argument('--baseline', help="比較する以前の結果のJSON")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="悪化とみなす変化の割合")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--texts', type=int, default=20000, help="保証額抽出に使うタイトルの件数")
+    parser.add_argument('--latency', type=float, default=DEFAULT_LATENCY, help="スタブサーバの応答遅延（秒）")
+    parser.add_argument('--quick', action='store_true', help="取得時間を少ない組み合わせだけ計測する")
+    args = parser.parse_args()
+
+    # 計測中のスクレイパーの出力でJSONが崩れないよう標準エラーに回す
+    with contextlib.redirect_stdout(sys.stderr):
+        results = run_suite(args.fixtures, repeat=args.repeat, texts=args.texts, latency=args.latency,
+                            crawl_matrix=QUICK_CRAWL_MATRIX if args.quick else CRAWL_MATRIX)
+
+    if results['meta']['fixtures']['synthetic']:
+        print("注意: 合成のページでの計測です（変更前後の比較にだけ使えます）", file=sys.stderr)
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"悪化: {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
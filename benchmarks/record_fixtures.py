@@ -0,0 +1,90 @@
+"""
+ベンチマーク用に一覧ページ・詳細ページのHTMLを記録する
+
+    python benchmarks/record_fixtures.py [--date 2025/03/27] [--pages 5] [--details 5] [--source live|stub]
+                                         [--output DIR]
+
+一覧ページを list-NNN.html、保証額がタイトルから取れなかった行の詳細ページを
+1ページあたり --details 件まで detail-<ID>.html として保存し、記録の条件を manifest.json に書く。
+--source stub の場合は pokerfans.jp の代わりにスタブサーバが生成した合成のページを記録する
+（ネットワークなしで作り直せるが、本番のページとは大きさ・構造が違う）。
+保存先の既定は、本番のページなら benchmarks/fixtures/pokerfans、合成のページなら benchmarks/fixtures/synthetic。
+記録したHTMLは stub_server.FixturePokerfans で配信し、bench_suite.py から使う。
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detail_cache import DetailCache  # noqa: E402
+from http_cache import ValidatorStore  # noqa: E402
+from rate_limiter import RateLimiter  # noqa: E402
+from scraper import PokerfansScraper  # noqa: E402
+from stub_server import StubPokerfans  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+# 記録元 → 既定の保存先
+DEFAULT_OUTPUTS = {'live': os.path.join(FIXTURES_DIR, "pokerfans"), 'stub': os.path.join(FIXTURES_DIR, "synthetic")}
+
+
+def record(scraper: PokerfansScraper, directory: str, pages: int, details: int) -> dict:
+    """一覧ページを pages 枚まで、詳細ページを1ページあたり details 件まで保存して記録内容を返す"""
+    os.makedirs(directory, exist_ok=True)
+    list_pages, detail_ids = [], []
+    total_pages = 1
+    for page in range(pages):
+        if page >= total_pages:
+            break
+        html = scraper.fetch_list_html(page)
+        tournaments, pagination = scraper.parse_tournament_list(html)
+        total_pages = pagination.get('total_pages', 1)
+        with open(os.path.join(directory, f"list-{page:03d}.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+        list_pages.append(page)
+
+        for tournament in [t for t in tournaments if not t['guarantee']][:details]:
+            url = tournament['detail_url']
+            event_id = url.rstrip('/').rsplit('/', 1)[1]
+            with open(os.path.join(directory, f"detail-{event_id}.html"), "w", encoding="utf-8") as f:
+                f.write(scraper._request(url).text)
+            detail_ids.append(event_id)
+    return {'list_pages': list_pages, 'total_pages': total_pages, 'details': detail_ids}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--date', default="2025/03/27", help="記録する日付（'YYYY/MM/DD'）")
+    parser.add_argument('--pages', type=int, default=5, help="記録する一覧ページ数の上限")
+    parser.add_argument('--details', type=int, default=5, help="1ページあたり記録する詳細ページ数")
+    parser.add_argument('--source', choices=('live', 'stub'), default='live', help="記録元")
+    parser.add_argument('--output', help="保存先ディレクトリ（省略時は記録元ごとの既定）")
+    args = parser.parse_args()
+    args.output = args.output or DEFAULT_OUTPUTS[args.source]
+
+    # 記録時はキャッシュを使わない（毎回取得した本文をそのまま保存する）
+    cache_dir = tempfile.mkdtemp(prefix="pokerodds-record-")
+    cache_path = os.path.join(cache_dir, "cache.sqlite3")
+    stub = StubPokerfans(total_pages=args.pages, events_per_page=50).start() if args.source == 'stub' else None
+    try:
+        scraper = PokerfansScraper(target_date=args.date, detail_cache=DetailCache(cache_path),
+                                   validators=ValidatorStore(cache_path),
+                                   base_url=stub.base_url if stub else "https://pokerfans.jp/",
+                                   rate_limiter=RateLimiter(rate=1000, burst=100, jitter=0) if stub else None)
+        recorded = record(scraper, args.output, args.pages, args.details)
+    finally:
+        if stub:
+            stub.stop()
+
+    manifest = {'date': args.date, 'source': args.source, 'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'parser': scraper.parser.name, **recorded}
+    with open(os.path.join(args.output, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    print(f"一覧 {len(recorded['list_pages'])} ページ・詳細 {len(recorded['details'])} 件を {args.output} に保存しました")
+
+
+if __name__ == '__main__':
+    main()
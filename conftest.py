@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# テストでホームディレクトリのキャッシュを汚さないよう、共有ストアの保存先を一時ディレクトリにする
+os.environ.setdefault("POKERODDS_CACHE_DIR", tempfile.mkdtemp(prefix="pokerodds-test-"))
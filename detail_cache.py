@@ -0,0 +1,113 @@
+"""
+詳細ページの取得結果を保存する永続キャッシュ
+
+詳細URLをキーに SQLite へ保存するため、Streamlit サーバを再起動しても、
+別のワーカープロセスからでも同じ結果を再利用できる。
+有効期限（TTL）を過ぎたものは読み出し時に削除し、件数が上限を超えたら
+最終アクセスが古いものから削除する（LRU）。
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from storage import SQLiteStore
+
+DEFAULT_TTL = int(os.environ.get("POKERODDS_DETAIL_TTL", "86400"))
+DEFAULT_MAX_ENTRIES = int(os.environ.get("POKERODDS_DETAIL_MAX_ENTRIES", "5000"))
+
+_shared_cache: Optional["DetailCache"] = None
+_shared_lock = threading.Lock()
+
+
+class DetailCache(SQLiteStore):
+    """
+    詳細URL → 取得結果（dict）のキャッシュ
+    Args:
+        path: データベースファイルのパス。Noneの場合は既定のパス
+        ttl: 有効期限（秒）
+        max_entries: 保持する最大件数
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS detail_cache (
+            url TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            stored_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS detail_cache_accessed ON detail_cache (accessed_at);
+    """
+
+    def __init__(self, path: str = None, ttl: int = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._stats_lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+        super().__init__(path)
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def get(self, url: str) -> Optional[Dict]:
+        """キャッシュ済みの結果を返す（なければ・期限切れならNone）"""
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT value, stored_at FROM detail_cache WHERE url = ?", (url,)
+        ).fetchone()
+        now = time.time()
+        if row is None:
+            self._count('misses')
+            return None
+        value, stored_at = row
+        if now - stored_at > self.ttl:
+            connection.execute("DELETE FROM detail_cache WHERE url = ?", (url,))
+            self._count('expired')
+            self._count('misses')
+            return None
+        connection.execute("UPDATE detail_cache SET accessed_at = ? WHERE url = ?", (now, url))
+        self._count('hits')
+        return json.loads(value)
+
+    def set(self, url: str, value: Dict):
+        """結果を保存し、上限を超えた分を古い順に削除"""
+        connection = self._connection()
+        now = time.time()
+        connection.execute(
+            "INSERT OR REPLACE INTO detail_cache (url, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (url, json.dumps(value, ensure_ascii=False), now, now)
+        )
+        overflow = self.__len__() - self.max_entries
+        if overflow > 0:
+            cursor = connection.execute(
+                "DELETE FROM detail_cache WHERE url IN "
+                "(SELECT url FROM detail_cache ORDER BY accessed_at LIMIT ?)", (overflow,)
+            )
+            self._count('evictions', cursor.rowcount)
+
+    def clear(self):
+        """すべて削除"""
+        self._connection().execute("DELETE FROM detail_cache")
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM detail_cache").fetchone()[0]
+
+    def stats(self) -> Dict:
+        """ヒット・ミス・削除数と現在の件数"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['entries'] = len(self)
+        return stats
+
+
+def get_shared_detail_cache() -> DetailCache:
+    """プロセス全体で共有する詳細キャッシュを返す（初回呼び出し時に作成）"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = DetailCache()
+        return _shared_cache
@@ -0,0 +1,185 @@
+"""
+タイトルから保証額が取れなかった行を詳細ページで補う（保証額のエンリッチ）
+
+一覧の解析とは別の段階として、保証額が0の行から詳細ページを取得する行を選ぶ。
+取得数の上限（budget）があるため、役に立つ順に選ぶ。
+
+1. 今から参加できる行
+2. 開始時刻が早い行（深夜0-6時の開始は翌日として後ろに並べる）
+3. 参加費が高い行
+
+選んだ行の詳細ページは同時実行数・レート制限のもとで並列に取得し、
+取得できた行から順に保証額を反映する（on_result で通知）。
+取得数・キャッシュの利用数・保証額が判明した数・保証額のある行の割合（カバー率）と
+1件あたりの取得時間を EnrichmentStats に集計する。
+"""
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Sequence
+
+from batch import MISSING_TIME, NIGHT_END, time_key
+from models import JST, is_available
+
+# 直近の取得時間を保持する件数（中央値・95パーセンタイルの計算用）
+LATENCY_HISTORY = 500
+
+logger = logging.getLogger(__name__)
+
+_shared_stats: Optional["EnrichmentStats"] = None
+_shared_lock = threading.Lock()
+
+
+def priority_key(tournament, now: datetime = None) -> tuple:
+    """詳細ページを取得する順序のキー（小さいほど先に取得する）"""
+    start = time_key(tournament.get('start_time'))
+    if start == MISSING_TIME:
+        start = 10 ** 6
+    elif start < NIGHT_END:
+        start += 2400
+    available = is_available(tournament.get('start_time'), tournament.get('end_time'), now)
+    return (not available, start, -(tournament.get('entry_fee', 0) or 0))
+
+
+def select_candidates(tournaments: Iterable, budget: int, skip: Optional[Dict] = None,
+                      now: datetime = None) -> List:
+    """
+    詳細ページを取得する行を選ぶ
+    Args:
+        tournaments: 一覧の行
+        budget: 取得する最大数（0以下なら選ばない）
+        skip: 取得しない行の detail_url（前回取得した行など）
+        now: 参加可否の判定の基準時刻
+    """
+    if budget <= 0:
+        return []
+    now = now or datetime.now(JST)
+    seen = set(skip or ())
+    missing = []
+    for t in tournaments:
+        url = t.get('detail_url')
+        if t.get('guarantee', 0) or not url or url in seen:
+            continue
+        seen.add(url)
+        missing.append(t)
+    missing.sort(key=lambda t: priority_key(t, now))
+    return missing[:budget]
+
+
+def coverage(tournaments: Sequence) -> float:
+    """保証額のある行の割合"""
+    if not tournaments:
+        return 0.0
+    return sum(1 for t in tournaments if t.get('guarantee', 0)) / len(tournaments)
+
+
+class EnrichmentStats:
+    """詳細ページによる保証額の補完の集計（複数のクロールで共有できる）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counts = {'rows': 0, 'covered_before': 0, 'covered_after': 0, 'candidates': 0,
+                            'fetched': 0, 'cached': 0, 'found': 0, 'failed': 0}
+            self._latencies: List[float] = []
+
+    def record_batch(self, rows: int, covered_before: int, candidates: int):
+        with self._lock:
+            self._counts['rows'] += rows
+            self._counts['covered_before'] += covered_before
+            self._counts['covered_after'] += covered_before
+            self._counts['candidates'] += candidates
+
+    def record_result(self, seconds: float, cached: bool, found: bool, failed: bool = False):
+        with self._lock:
+            self._counts['cached' if cached else 'fetched'] += 1
+            if found:
+                self._counts['found'] += 1
+                self._counts['covered_after'] += 1
+            if failed:
+                self._counts['failed'] += 1
+            if not cached:
+                self._latencies.append(seconds)
+                del self._latencies[:-LATENCY_HISTORY]
+
+    def stats(self) -> Dict:
+        """件数・カバー率（補完前後）・取得時間（ミリ秒）"""
+        with self._lock:
+            counts = dict(self._counts)
+            latencies = sorted(self._latencies)
+        rows = counts.pop('rows')
+        before, after = counts.pop('covered_before'), counts.pop('covered_after')
+        counts['coverage_before'] = round(before / rows, 3) if rows else 0.0
+        counts['coverage_after'] = round(after / rows, 3) if rows else 0.0
+        for name, q in (('p50_ms', 0.5), ('p95_ms', 0.95)):
+            counts[name] = round(latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000, 1) \
+                if latencies else 0.0
+        counts['max_ms'] = round(latencies[-1] * 1000, 1) if latencies else 0.0
+        return counts
+
+
+class DetailEnricher:
+    """
+    保証額が0の行の詳細ページを優先順に取得して反映する
+    Args:
+        load: detail_url から詳細情報（{'guarantee': ...}）を取得するコルーチン関数。
+              同時実行数・レート制限は load の側で守る。取得に失敗した場合は例外を送出する
+        cached: detail_url からキャッシュ済みの詳細情報を返す関数（なければNone）
+        stats: 集計先（省略時は共有の集計）
+    """
+
+    def __init__(self, load: Callable[[str], Awaitable[Dict]], cached: Callable[[str], Optional[Dict]] = None,
+                 stats: EnrichmentStats = None):
+        self.load = load
+        self.cached = cached
+        self.stats = stats if stats is not None else get_shared_enrichment_stats()
+
+    async def _enrich_one(self, tournament, on_result: Optional[Callable[[Dict, Dict], None]]):
+        url = tournament['detail_url']
+        started = time.perf_counter()
+        detail = self.cached(url) if self.cached else None
+        cached = detail is not None
+        if detail is None:
+            try:
+                detail = await self.load(url)
+            except Exception as e:
+                logger.warning("詳細ページの取得に失敗: %s - %s", url, e)
+                detail = None
+        guarantee = (detail or {}).get('guarantee', 0)
+        if guarantee:
+            tournament['guarantee'] = guarantee
+        self.stats.record_result(time.perf_counter() - started, cached, bool(guarantee), failed=detail is None)
+        if on_result:
+            on_result(tournament, detail or {'guarantee': 0})
+
+    async def enrich(self, tournaments: Sequence, budget: int, skip: Optional[Dict] = None,
+                     on_result: Optional[Callable[[Dict, Dict], None]] = None) -> int:
+        """
+        保証額が0の行から budget 件を選んで詳細ページを並列に取得し、取得できた順に反映する
+        Args:
+            tournaments: 一覧の行（保証額はこの行に直接反映する）
+            budget: 取得する最大数
+            skip: 取得しない行の detail_url
+            on_result: 1件取得するたびに呼ばれるコールバック (行, 詳細情報)
+        Returns:
+            保証額が判明した行数
+        """
+        candidates = select_candidates(tournaments, budget, skip)
+        covered = sum(1 for t in tournaments if t.get('guarantee', 0))
+        self.stats.record_batch(len(tournaments), covered, len(candidates))
+        await asyncio.gather(*(self._enrich_one(t, on_result) for t in candidates))
+        return sum(1 for t in candidates if t.get('guarantee', 0))
+
+
+def get_shared_enrichment_stats() -> EnrichmentStats:
+    """プロセス全体で共有する集計を返す（初回呼び出し時に作成）"""
+    global _shared_stats
+    with _shared_lock:
+        if _shared_stats is None:
+            _shared_stats = EnrichmentStats()
+        return _shared_stats
@@ -0,0 +1,186 @@
+"""
+日付の範囲をまとめて取得してファイルに書き出す
+
+日付ごとに1つのファイル（'2025-03-27.jsonl' など）を出力ディレクトリに作る。
+一覧ページを並列に取得し、解析できたページから順にファイルへ追記するので、
+日付の範囲が長くても保持するのは取得中のページの行だけになる。
+書き込み中は '.part' の付いた名前で書き、日付の全ページを取得できたら名前を変える。
+途中で中断した場合も、完成しているファイルの日付は次回の実行で飛ばす（再開）。
+
+形式は JSON Lines（'jsonl'）・CSV（'csv'）・Parquet（'parquet'、pyarrow がある場合のみ）。
+"""
+import asyncio
+import csv
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from async_crawler import DEFAULT_CONCURRENCY, AsyncCrawler
+from models import FIELDS, Tournament
+from scraper import PokerfansScraper
+
+# 出力する列（日付・取得した項目・JOPT判定・回収率）
+COLUMNS = ('date',) + FIELDS + ('is_jopt', 'value_ratio')
+FORMATS = ('jsonl', 'csv', 'parquet')
+
+
+def date_range(start: str, end: str) -> List[str]:
+    """start から end まで（両端を含む）の 'YYYY/MM/DD'"""
+    first = datetime.strptime(start, '%Y/%m/%d').date()
+    last = datetime.strptime(end, '%Y/%m/%d').date()
+    return [(first + timedelta(days=offset)).strftime('%Y/%m/%d') for offset in range((last - first).days + 1)]
+
+
+def export_row(date_str: str, tournament) -> Dict:
+    """ファイルに書く1行（COLUMNS の順）"""
+    t = Tournament.from_dict(tournament)
+    row = {'date': date_str}
+    row.update((key, t[key]) for key in FIELDS)
+    row['is_jopt'] = t['is_jopt']
+    ratio = t['value_ratio']
+    row['value_ratio'] = round(ratio, 2) if ratio is not None else None
+    return row
+
+
+class JsonlWriter:
+    """JSON Lines（1行1件）"""
+
+    extension = 'jsonl'
+
+    def __init__(self, path: str):
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, rows: List[Dict]):
+        for row in rows:
+            self._file.write(json.dumps(row, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class CsvWriter:
+    """CSV（1行目は列名）"""
+
+    extension = 'csv'
+
+    def __init__(self, path: str):
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=COLUMNS)
+        self._writer.writeheader()
+
+    def write(self, rows: List[Dict]):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """Parquet（ページごとに1つの row group を追記する。pyarrow が必要）"""
+
+    extension = 'parquet'
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("Parquet で出力するには pyarrow をインストールしてください")
+        self._pa = pyarrow
+        self._schema = pyarrow.schema([
+            ('date', pyarrow.string()), ('title', pyarrow.string()), ('venue', pyarrow.string()),
+            ('start_time', pyarrow.string()), ('end_time', pyarrow.string()), ('entry_fee', pyarrow.int64()),
+            ('current_entries', pyarrow.int64()), ('max_entries', pyarrow.int64()),
+            ('detail_url', pyarrow.string()), ('guarantee', pyarrow.int64()), ('is_jopt', pyarrow.bool_()),
+            ('value_ratio', pyarrow.float64()),
+        ])
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema, compression='zstd')
+
+    def write(self, rows: List[Dict]):
+        if rows:
+            self._writer.write_table(self._pa.Table.from_pylist(rows, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+WRITERS = {'jsonl': JsonlWriter, 'csv': CsvWriter, 'parquet': ParquetWriter}
+
+
+def output_path(directory: str, date_str: str, fmt: str) -> str:
+    """日付ごとの出力ファイルのパス"""
+    return os.path.join(directory, f"{date_str.replace('/', '-')}.{fmt}")
+
+
+def is_exported(directory: str, date_str: str, fmt: str) -> bool:
+    """日付のファイルが完成しているか（'.part' のままのものは未完成）"""
+    return os.path.exists(output_path(directory, date_str, fmt))
+
+
+async def export_date(scraper: PokerfansScraper, date_str: str, directory: str, fmt: str = 'jsonl',
+                      concurrency: int = DEFAULT_CONCURRENCY, max_details_per_page: int = 0) -> Dict:
+    """
+    1日分を取得してファイルに書き出す（ページごとに追記）
+    取得できなかったページがあればファイルを完成させない（次回の実行で取り直す）
+    Returns:
+        {'date', 'rows', 'pages', 'failed_pages', 'path', 'seconds'}
+    """
+    started = time.perf_counter()
+    path = output_path(directory, date_str, fmt)
+    partial = path + '.part'
+    crawler = AsyncCrawler(scraper.for_date(date_str), concurrency=concurrency,
+                           max_details_per_page=max_details_per_page)
+    writer = WRITERS[fmt](partial)
+    rows = pages = 0
+    try:
+        async for _, _, tournaments in crawler.iter_pages():
+            writer.write([export_row(date_str, t) for t in tournaments])
+            rows += len(tournaments)
+            pages += 1
+    finally:
+        writer.close()
+
+    if crawler.failed_pages:
+        os.remove(partial)
+        path = None
+    else:
+        os.replace(partial, path)
+    return {'date': date_str, 'rows': rows, 'pages': pages, 'failed_pages': sorted(crawler.failed_pages),
+            'path': path, 'seconds': round(time.perf_counter() - started, 3)}
+
+
+def export_range(dates: List[str], directory: str, fmt: str = 'jsonl', concurrency: int = DEFAULT_CONCURRENCY,
+                 max_details_per_page: int = 0, resume: bool = True, scraper: Optional[PokerfansScraper] = None,
+                 on_date: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+    """
+    日付を順に取得してファイルに書き出す
+    Args:
+        dates: 'YYYY/MM/DD' の一覧
+        directory: 出力ディレクトリ
+        fmt: 'jsonl' / 'csv' / 'parquet'
+        concurrency: 1日分のページを取得する同時リクエスト数の上限
+        max_details_per_page: 1ページあたりの詳細取得数（0=取得しない）
+        resume: Trueの場合、ファイルが完成している日付は取得しない
+        scraper: 使用するスクレイパー（接続・レート制限・キャッシュを日付間で共有する）
+        on_date: 日付ごとの結果を受け取るコールバック
+    Returns:
+        日付ごとの結果（飛ばした日付は 'skipped': True）
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"unknown format: {fmt}")
+    os.makedirs(directory, exist_ok=True)
+    scraper = scraper or PokerfansScraper()
+    results = []
+    for date_str in dates:
+        if resume and is_exported(directory, date_str, fmt):
+            result = {'date': date_str, 'skipped': True, 'path': output_path(directory, date_str, fmt)}
+        else:
+            result = asyncio.run(export_date(scraper, date_str, directory, fmt, concurrency, max_details_per_page))
+        results.append(result)
+        if on_date:
+            on_date(result)
+    return results
@@ -0,0 +1,161 @@
+"""
+保証額の抽出エンジン
+
+タイトル用・詳細ページ用のパターン群を、優先順に並べた1本の選択肢 (A0|A1|...) として
+コンパイルしておく。値のグループは名前付き (g0, g1, ...) にして、どのパターンが
+一致したかを lastgroup で判別する。
+
+選択肢は各位置で先頭から試されるため、最も左の一致がパターン k なら、k より優先度の
+高いパターンはその位置までに一致しない。そこで k=0 ならそのまま確定し、k>0 なら
+「A0..A(k-1) だけの選択肢」でその次の位置から探し直す。探し直すたびに候補が減るので
+検索回数はパターン数以下（通常は1回）で、パターンを順番に re.search していた従来の結果と一致する。
+
+さらに各パターンには一致に必須の文字列（「万」「保証」など）を持たせ、テキストに含まれない
+パターンは選択肢から外す。使われたパターンの組み合わせごとにコンパイル済みの正規表現を保持する。
+"""
+import re
+from functools import lru_cache
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# 全角数字 → 半角数字の変換表（呼び出しごとに作らない）
+FULLWIDTH_DIGITS = str.maketrans('０１２３４５６７８９', '0123456789')
+
+# 各パターンの最初の（値を取り出す）キャプチャグループ
+_FIRST_GROUP = re.compile(r'(?<!\\)\((?!\?)')
+
+
+def _man(value: str) -> int:
+    """「万」単位の数値を円に変換"""
+    return int(value) * 10000
+
+
+def _yen(value: str) -> int:
+    """カンマ区切りの数値を円に変換"""
+    return int(value.replace(',', ''))
+
+
+# (正規表現, 変換関数, 必須文字列) のリスト。必須文字列は小文字化したテキストに対して
+# 「どれか1つを含む」ことを確認する（coin は IGNORECASE の特殊な大文字小文字対応を考慮して
+# i を含まない部分で判定する）
+Pattern = Tuple[str, Callable[[str], int], Sequence[str]]
+
+# タイトル用のパターン（優先順）
+TITLE_PATTERNS: List[Pattern] = [
+    # "万"を含むパターン（例：84万相当、40万コイン、7万円保証）
+    (r'(?:総額)?(\d+)万(?:円|coin|コイン)?(?:相当|保証)?', _man, ('万',)),
+
+    # 数値+通貨単位のパターン（例：50,000coin、100,000コイン）
+    (r'(?:Web|ウェブ)?(?:最低保証)?[^\d]*(\d+[,\d]*)(?:円|coin|コイン)(?:保証)?', _yen, ('円', 'co', 'コイン')),
+]
+
+# 詳細ページ用の厳密なパターン（"保証"という単語が必ず含まれるもののみ、優先順）
+DETAIL_PATTERNS: List[Pattern] = [
+    # ●●万円保証
+    (r'(\d+)万円保証', _man, ('万円保証',)),
+    # ●●万保証
+    (r'(\d+)万保証', _man, ('万保証',)),
+    # ●●,●●●円保証
+    (r'(\d+[,\d]*)円保証', _yen, ('円保証',)),
+    # ●●万コイン保証
+    (r'(\d+)万(?:coin|コイン)保証', _man, ('n保証', 'コイン保証')),
+    # ●●,●●●コイン保証
+    (r'(\d+[,\d]*)(?:coin|コイン)保証', _yen, ('n保証', 'コイン保証')),
+    # 総額●●万保証
+    (r'総額(\d+)万保証', _man, ('万保証',)),
+    # 最低保証●●万
+    (r'最低保証[^\d]*(\d+)万', _man, ('最低保証',)),
+    # 最低保証●●,●●●コイン
+    (r'最低保証[^\d]*(\d+[,\d]*)(?:coin|コイン)', _yen, ('最低保証',)),
+]
+
+
+class GuaranteeExtractor:
+    """
+    優先順つきのパターン群から保証額を1回の走査で抽出する
+    Args:
+        patterns: (正規表現, 変換関数, 必須文字列) のリスト。正規表現のグループ1が値
+        flags: 正規表現フラグ
+    """
+
+    def __init__(self, patterns: List[Pattern], flags: int = re.IGNORECASE):
+        self._flags = flags
+        self._patterns = [re.compile(pattern, flags) for pattern, _, _ in patterns]
+        self._converters = [converter for _, converter, _ in patterns]
+        self._needles = [needles for _, _, needles in patterns]
+        self._alternatives = [
+            '(?:' + _FIRST_GROUP.sub(f'(?P<g{i}>', pattern, count=1) + ')'
+            for i, (pattern, _, _) in enumerate(patterns)
+        ]
+        self._alternation = lru_cache(maxsize=None)(self._compile_alternation)
+
+    def _compile_alternation(self, candidates: Tuple[int, ...]):
+        """指定したパターン番号だけを優先順に並べた選択肢をコンパイル"""
+        return re.compile('|'.join(self._alternatives[i] for i in candidates), self._flags)
+
+    def _candidates(self, text: str) -> Tuple[int, ...]:
+        """必須文字列を含む（一致する可能性のある）パターン番号"""
+        lowered = text.lower()
+        return tuple(
+            i for i, needles in enumerate(self._needles)
+            if any(needle in lowered for needle in needles)
+        )
+
+    def _convert(self, index: int, value: str) -> int:
+        try:
+            return self._converters[index](value)
+        except (ValueError, IndexError):
+            return 0
+
+    def find(self, text: str) -> Optional[Tuple[int, str]]:
+        """
+        最も優先度の高いパターンの最初の一致を返す
+        Returns:
+            (パターン番号, 値の文字列)。一致しない場合はNone
+        """
+        if not text:
+            return None
+        text = text.translate(FULLWIDTH_DIGITS)
+        candidates = self._candidates(text)
+
+        best = None
+        pos = 0
+        while candidates:
+            match = self._alternation(candidates).search(text, pos)
+            if not match:
+                break
+            index = int(match.lastgroup[1:])
+            best = (index, match.group(match.lastgroup))
+            # より優先度の高いパターンだけを、この一致の次の位置から探す
+            candidates = tuple(i for i in candidates if i < index)
+            pos = match.start() + 1
+        return best
+
+    def extract(self, text: str) -> int:
+        """保証額（円単位）を返す。見つからない場合は0"""
+        found = self.find(text)
+        return self._convert(*found) if found else 0
+
+    def extract_sequential(self, text: str) -> int:
+        """パターンを1つずつ検索する従来の方法（検証用）"""
+        if not text:
+            return 0
+        text = text.translate(FULLWIDTH_DIGITS)
+        for index, pattern in enumerate(self._patterns):
+            match = pattern.search(text)
+            if match:
+                return self._convert(index, match.group(1))
+        return 0
+
+
+TITLE_EXTRACTOR = GuaranteeExtractor(TITLE_PATTERNS)
+DETAIL_EXTRACTOR = GuaranteeExtractor(DETAIL_PATTERNS, re.MULTILINE | re.IGNORECASE)
+
+
+def extract_title_guarantee(text: str) -> int:
+    """タイトルから保証額を抽出（円単位、見つからない場合は0）"""
+    return TITLE_EXTRACTOR.extract(text)
+
+
+def extract_detail_guarantee(text: str) -> int:
+    """詳細ページのテキストから保証額を抽出（円単位、見つからない場合は0）"""
+    return DETAIL_EXTRACTOR.extract(text)
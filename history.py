@@ -0,0 +1,235 @@
+"""
+トーナメントごとのエントリー数の推移を記録する追記専用の保存先
+
+取得のたびに前回の値を上書きするのではなく、(detail_url, 時刻, エントリー数, 定員, 保証額) を
+サンプルとして追記する。前回のサンプルから値が変わっていない行は記録しない（重複除去）。
+トーナメント（日付・会場・タイトル）は別のテーブルに1行ずつ持ち、日付・会場の索引から
+サンプルを引く。最新の値もトーナメントの行に持つので、日付ごと・会場ごとの集計は
+サンプルを走査せずに済む。
+
+SQLite ファイル（既定は POKERODDS_CACHE_DIR の history.sqlite3）に保存し、キャッシュとは別に残す。
+"""
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from storage import SQLiteStore, default_db_path
+
+# 保存先（キャッシュを消しても推移は残すため別のファイルにする）
+DEFAULT_PATH = os.environ.get("POKERODDS_HISTORY_DB", "") or default_db_path("history.sqlite3")
+# entry_curve の既定の集計間隔（秒）
+DEFAULT_BUCKET = 15 * 60
+
+_shared_store: Optional["HistoryStore"] = None
+_shared_lock = threading.Lock()
+
+
+class HistoryStore(SQLiteStore):
+    """
+    エントリー数のサンプルの保存先
+    Args:
+        path: データベースファイルのパス。Noneの場合は既定のパス
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS history_tournaments (
+            id INTEGER PRIMARY KEY,
+            detail_url TEXT NOT NULL UNIQUE,
+            date TEXT NOT NULL,
+            venue TEXT NOT NULL,
+            title TEXT NOT NULL,
+            start_time TEXT,
+            entry_fee INTEGER NOT NULL,
+            current_entries INTEGER NOT NULL,
+            max_entries INTEGER NOT NULL,
+            guarantee INTEGER NOT NULL,
+            samples INTEGER NOT NULL,
+            first_sampled_at REAL NOT NULL,
+            last_sampled_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS history_tournaments_date ON history_tournaments (date);
+        CREATE INDEX IF NOT EXISTS history_tournaments_venue ON history_tournaments (venue, date);
+        CREATE TABLE IF NOT EXISTS history_samples (
+            tournament_id INTEGER NOT NULL,
+            sampled_at REAL NOT NULL,
+            current_entries INTEGER NOT NULL,
+            max_entries INTEGER NOT NULL,
+            guarantee INTEGER NOT NULL,
+            PRIMARY KEY (tournament_id, sampled_at)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path: str = None):
+        super().__init__(path or DEFAULT_PATH)
+
+    def record(self, date_str: str, tournaments: Iterable, sampled_at: float = None) -> Dict:
+        """
+        1回の取得結果をサンプルとして追記する（前回から値が変わっていない行は記録しない）
+        Args:
+            date_str: 'YYYY/MM/DD'形式の日付文字列
+            tournaments: 取得した行
+            sampled_at: 取得時刻（省略時は現在時刻）
+        Returns:
+            {'added': 新しく記録した行数, 'unchanged': 変化がなく記録しなかった行数, 'new_tournaments': 初めての行数}
+        """
+        sampled_at = time.time() if sampled_at is None else sampled_at
+        connection = self._connection()
+        # 同じ日付の既知のトーナメントと最新の値（1回の検索でまとめて引く）
+        known = {
+            url: (tournament_id, values)
+            for tournament_id, url, *values in connection.execute(
+                "SELECT id, detail_url, current_entries, max_entries, guarantee "
+                "FROM history_tournaments WHERE date = ?", (date_str,)
+            )
+        }
+        added = unchanged = created = 0
+        samples: List[Tuple] = []
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for t in tournaments:
+                url = t['detail_url']
+                values = [t.get('current_entries', 0) or 0, t.get('max_entries', 0) or 0, t.get('guarantee', 0) or 0]
+                previous = known.get(url)
+                if previous is None:
+                    cursor = connection.execute(
+                        "INSERT OR IGNORE INTO history_tournaments (detail_url, date, venue, title, start_time, "
+                        "entry_fee, current_entries, max_entries, guarantee, samples, first_sampled_at, "
+                        "last_sampled_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?, ?)",
+                        (url, date_str, t.get('venue', '') or '', t.get('title', '') or '', t.get('start_time'),
+                         t.get('entry_fee', 0) or 0, *values, sampled_at, sampled_at)
+                    )
+                    if cursor.rowcount:
+                        known[url] = (cursor.lastrowid, values)
+                        samples.append((cursor.lastrowid, sampled_at, *values))
+                        added += 1
+                        created += 1
+                        continue
+                    # 別の日付として記録済みの行（日付をまたいで同じURLが現れた場合）
+                    tournament_id, *stored = connection.execute(
+                        "SELECT id, current_entries, max_entries, guarantee FROM history_tournaments "
+                        "WHERE detail_url = ?", (url,)
+                    ).fetchone()
+                    previous = known[url] = (tournament_id, stored)
+                if previous[1] == values:
+                    unchanged += 1
+                    continue
+                tournament_id = previous[0]
+                connection.execute(
+                    "UPDATE history_tournaments SET current_entries = ?, max_entries = ?, guarantee = ?, "
+                    "samples = samples + 1, last_sampled_at = ? WHERE id = ?",
+                    (*values, sampled_at, tournament_id)
+                )
+                known[url] = (tournament_id, values)
+                samples.append((tournament_id, sampled_at, *values))
+                added += 1
+            connection.executemany(
+                "INSERT OR IGNORE INTO history_samples "
+                "(tournament_id, sampled_at, current_entries, max_entries, guarantee) VALUES (?, ?, ?, ?, ?)",
+                samples
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return {'added': added, 'unchanged': unchanged, 'new_tournaments': created}
+
+    def growth(self, detail_url: str) -> List[Dict]:
+        """1つのトーナメントのサンプル（時刻順）"""
+        rows = self._connection().execute(
+            "SELECT s.sampled_at, s.current_entries, s.max_entries, s.guarantee "
+            "FROM history_samples s JOIN history_tournaments t ON t.id = s.tournament_id "
+            "WHERE t.detail_url = ? ORDER BY s.sampled_at", (detail_url,)
+        ).fetchall()
+        return [{'sampled_at': at, 'current_entries': entries, 'max_entries': max_entries, 'guarantee': guarantee}
+                for at, entries, max_entries, guarantee in rows]
+
+    def growth_curves(self, date_str: str, venue: str = None) -> Dict[str, List[Tuple[float, int]]]:
+        """日付（と会場）のトーナメントごとの (時刻, エントリー数) の推移"""
+        query = ("SELECT t.detail_url, s.sampled_at, s.current_entries "
+                 "FROM history_tournaments t JOIN history_samples s ON s.tournament_id = t.id WHERE t.date = ?")
+        params: Tuple = (date_str,)
+        if venue is not None:
+            query += " AND t.venue = ?"
+            params += (venue,)
+        curves: Dict[str, List[Tuple[float, int]]] = {}
+        for url, at, entries in self._connection().execute(query + " ORDER BY t.id, s.sampled_at", params):
+            curves.setdefault(url, []).append((at, entries))
+        return curves
+
+    def entry_curve(self, date_str: str, venue: str = None, bucket: int = DEFAULT_BUCKET) -> List[Tuple[float, int]]:
+        """
+        日付（と会場）のエントリー数の合計の推移
+        bucket 秒ごとに、各トーナメントのその時点までの最新の値を合計する
+        Returns:
+            [(区間の開始時刻, エントリー数の合計), ...]
+        """
+        query = ("SELECT s.tournament_id, s.sampled_at, s.current_entries "
+                 "FROM history_tournaments t JOIN history_samples s ON s.tournament_id = t.id WHERE t.date = ?")
+        params: Tuple = (date_str,)
+        if venue is not None:
+            query += " AND t.venue = ?"
+            params += (venue,)
+        samples = sorted(self._connection().execute(query, params), key=lambda row: row[1])
+        if not samples:
+            return []
+
+        latest: Dict[int, int] = {}
+        total = 0
+        curve = []
+        current_bucket = samples[0][1] // bucket * bucket
+        for tournament_id, at, entries in samples:
+            at_bucket = at // bucket * bucket
+            if at_bucket != current_bucket:
+                curve.append((current_bucket, total))
+                current_bucket = at_bucket
+            total += entries - latest.get(tournament_id, 0)
+            latest[tournament_id] = entries
+        curve.append((current_bucket, total))
+        return curve
+
+    def daily_totals(self, start: str, end: str, venue: str = None) -> List[Dict]:
+        """日付ごとのトーナメント数・最新のエントリー数の合計・定員の合計（start〜end、両端を含む）"""
+        query = ("SELECT date, COUNT(*), SUM(current_entries), SUM(max_entries), SUM(samples) "
+                 "FROM history_tournaments WHERE date BETWEEN ? AND ?")
+        params: Tuple = (start, end)
+        if venue is not None:
+            query += " AND venue = ?"
+            params += (venue,)
+        rows = self._connection().execute(query + " GROUP BY date ORDER BY date", params).fetchall()
+        return [{'date': date, 'tournaments': count, 'entries': entries, 'max_entries': max_entries,
+                 'samples': samples} for date, count, entries, max_entries, samples in rows]
+
+    def venue_totals(self, start: str, end: str) -> List[Dict]:
+        """会場ごとのトーナメント数・エントリー数の合計・平均の埋まり具合（エントリー数の多い順）"""
+        rows = self._connection().execute(
+            "SELECT venue, COUNT(*), SUM(current_entries), SUM(max_entries) FROM history_tournaments "
+            "WHERE date BETWEEN ? AND ? GROUP BY venue ORDER BY SUM(current_entries) DESC", (start, end)
+        ).fetchall()
+        return [{'venue': venue, 'tournaments': count, 'entries': entries,
+                 'fill_rate': round(entries / max_entries, 3) if max_entries else None}
+                for venue, count, entries, max_entries in rows]
+
+    def prune(self, before: str):
+        """指定日付より前のトーナメントとサンプルを削除"""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "DELETE FROM history_samples WHERE tournament_id IN "
+                "(SELECT id FROM history_tournaments WHERE date < ?)", (before,)
+            )
+            connection.execute("DELETE FROM history_tournaments WHERE date < ?", (before,))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+
+def get_shared_history_store() -> HistoryStore:
+    """プロセス全体で共有する保存先を返す（初回呼び出し時に作成）"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = HistoryStore()
+        return _shared_store
@@ -0,0 +1,151 @@
+"""
+一覧・詳細ページの条件付きGET（ETag / Last-Modified）のための保存領域
+
+ページごと（一覧は日付とクエリ、詳細はURL）に、検証子・本文（zlib圧縮）・本文のハッシュ・
+解析結果を保存する。再取得時は If-None-Match / If-Modified-Since を付けて送り、
+304 なら保存済みの解析結果をそのまま使う。サーバが検証子を返さない場合でも、
+本文のハッシュが前回と同じなら解析をやり直さない。
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+from storage import SQLiteStore
+
+# この日数より前に保存したページは削除する
+DEFAULT_MAX_AGE = int(os.environ.get("POKERODDS_VALIDATOR_MAX_AGE", str(7 * 86400)))
+# 古いページの削除を行う間隔（保存回数）
+PRUNE_EVERY = 100
+
+_shared_store: Optional["ValidatorStore"] = None
+_shared_lock = threading.Lock()
+
+
+def body_hash(body: bytes) -> str:
+    """本文の高速なハッシュ"""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def list_page_key(url: str, params: Dict) -> str:
+    """一覧ページのキー（URLと、日付・絞り込み条件・ページ番号を含むクエリ）"""
+    return "list:" + url + "?" + urlencode(sorted(params.items()))
+
+
+def detail_page_key(url: str) -> str:
+    """詳細ページのキー"""
+    return "detail:" + url
+
+
+class ValidatorStore(SQLiteStore):
+    """
+    検証子と解析結果の保存先
+    Args:
+        path: データベースファイルのパス。Noneの場合は既定のパス
+        max_age: 保存しておく最大秒数
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS page_validators (
+            key TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            body_hash TEXT NOT NULL,
+            body BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            parsed TEXT NOT NULL,
+            parse_seconds REAL NOT NULL,
+            stored_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path: str = None, max_age: int = DEFAULT_MAX_AGE):
+        self.max_age = max_age
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'not_modified': 0,      # 304 で再利用
+            'unchanged': 0,         # 200 だが本文が同じで再利用
+            'changed': 0,           # 解析し直した
+            'bytes_saved': 0,       # 304 により受信しなかった本文のバイト数
+            'parse_seconds_saved': 0.0,
+        }
+        self._puts = 0
+        super().__init__(path)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """保存済みのエントリ（本文は含まない）"""
+        row = self._connection().execute(
+            "SELECT etag, last_modified, body_hash, size, parsed, parse_seconds "
+            "FROM page_validators WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, digest, size, parsed, parse_seconds = row
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'body_hash': digest,
+            'size': size,
+            'parsed': parsed,
+            'parse_seconds': parse_seconds,
+        }
+
+    def get_body(self, key: str) -> Optional[bytes]:
+        """保存済みの本文"""
+        row = self._connection().execute("SELECT body FROM page_validators WHERE key = ?", (key,)).fetchone()
+        return zlib.decompress(row[0]) if row else None
+
+    def put(self, key: str, body: bytes, parsed, parse_seconds: float,
+            etag: str = None, last_modified: str = None, digest: str = None):
+        """取得・解析した結果を保存（Tournament などの Mapping は dict として保存する）"""
+        connection = self._connection()
+        now = time.time()
+        connection.execute(
+            "INSERT OR REPLACE INTO page_validators "
+            "(key, etag, last_modified, body_hash, body, size, parsed, parse_seconds, stored_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, etag, last_modified, digest or body_hash(body), zlib.compress(body), len(body),
+             json.dumps(parsed, ensure_ascii=False, default=dict), parse_seconds, now)
+        )
+        with self._stats_lock:
+            self._puts += 1
+            prune = self._puts % PRUNE_EVERY == 0
+        if prune:
+            connection.execute("DELETE FROM page_validators WHERE stored_at < ?", (now - self.max_age,))
+
+    def touch(self, key: str, etag: str = None, last_modified: str = None):
+        """本文が変わっていないページの検証子と保存時刻を更新"""
+        self._connection().execute(
+            "UPDATE page_validators SET etag = COALESCE(?, etag), "
+            "last_modified = COALESCE(?, last_modified), stored_at = ? WHERE key = ?",
+            (etag, last_modified, time.time(), key)
+        )
+
+    def record(self, outcome: str, entry: Dict = None):
+        """再利用の結果を集計（outcome: 'not_modified' / 'unchanged' / 'changed'）"""
+        with self._stats_lock:
+            self._stats[outcome] += 1
+            if entry and outcome != 'changed':
+                self._stats['parse_seconds_saved'] += entry['parse_seconds']
+                if outcome == 'not_modified':
+                    self._stats['bytes_saved'] += entry['size']
+
+    def stats(self) -> Dict:
+        """304・本文一致による再利用数と、節約できた通信量・解析時間"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['parse_seconds_saved'] = round(stats['parse_seconds_saved'], 3)
+        return stats
+
+
+def get_shared_validator_store() -> ValidatorStore:
+    """プロセス全体で共有する保存先を返す（初回呼び出し時に作成）"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = ValidatorStore()
+        return _shared_store
@@ -0,0 +1,161 @@
+"""
+pokerfans.jp への HTTP 接続を共有するセッション層
+
+スクレイパーのインスタンスごとに requests.get を呼ぶと、ページや詳細URLのたびに
+TCP+TLS のハンドシェイクが発生する。ここでは接続プール付きの requests.Session を
+プロセス全体で共有し、接続の新規作成数と再利用数を数えられるようにする。
+接続の確立（DNS解決・TCP/TLS）にかかった時間はスレッドごとに記録し、take_connect_seconds() で取り出せる。
+新規作成数は接続を確立した時点で数える（プールが追い出されても数え直さない）。
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.request import make_headers
+
+# 1ホストあたりに保持する接続数（並列取得のワーカー数以上にしておく）
+DEFAULT_POOL_SIZE = int(os.environ.get("POKERODDS_POOL_SIZE", "10"))
+
+_shared_session: Optional[requests.Session] = None
+_shared_lock = threading.Lock()
+# このスレッドで接続の確立（DNS解決・TCP/TLS）にかかった秒数と、確立した接続数
+_connect_timing = threading.local()
+
+
+def accept_encoding() -> str:
+    """
+    このプロセスで展開できる圧縮形式を Accept-Encoding 用に返す
+    （brotli / brotlicffi がインストールされていれば br も含む）
+    """
+    return make_headers(accept_encoding=True)["accept-encoding"]
+
+
+def take_connect_seconds() -> float:
+    """このスレッドで前回の呼び出し以降に接続の確立にかかった秒数（接続を再利用した場合は0）"""
+    seconds = getattr(_connect_timing, "seconds", 0.0)
+    _connect_timing.seconds = 0.0
+    return seconds
+
+
+def _connect_count() -> int:
+    """このスレッドで確立した接続数の累計"""
+    return getattr(_connect_timing, "count", 0)
+
+
+def _record_connect(started: float):
+    _connect_timing.seconds = getattr(_connect_timing, "seconds", 0.0) + time.perf_counter() - started
+
+
+def _timed_connect(connect):
+    started = time.perf_counter()
+    try:
+        connect()
+    finally:
+        _record_connect(started)
+    _connect_timing.count = _connect_count() + 1
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """接続の確立にかかった時間を記録する HTTPConnection"""
+
+    def connect(self):
+        _timed_connect(super().connect)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    """接続の確立（TLSハンドシェイクを含む）にかかった時間を記録する HTTPSConnection"""
+
+    def connect(self):
+        _timed_connect(super().connect)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """送信したリクエスト数と接続の新規作成数を数える HTTPAdapter"""
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, **kwargs):
+        self._lock = threading.Lock()
+        self.requests_sent = 0
+        self.connections_created = 0
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size, **kwargs)
+
+    def send(self, request, **kwargs):
+        # 送信はこのスレッドで行われるので、送信中にこのスレッドで確立した接続はこのアダプタのもの
+        connects = _connect_count()
+        with self._lock:
+            self.requests_sent += 1
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            created = _connect_count() - connects
+            if created:
+                with self._lock:
+                    self.connections_created += created
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+    def new_connections(self) -> int:
+        """このアダプタで確立した接続数の合計（追い出されたプールの接続を含む）"""
+        with self._lock:
+            return self.connections_created
+
+
+def create_session(pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """
+    接続プール付きのセッションを作成
+    Args:
+        pool_size: 1ホストあたりの最大接続数
+    """
+    session = requests.Session()
+    adapter = CountingHTTPAdapter(pool_size=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Accept-Encoding"] = accept_encoding()
+    return session
+
+
+def get_shared_session(pool_size: Optional[int] = None) -> requests.Session:
+    """
+    プロセス全体で共有するセッションを返す（初回呼び出し時に作成）
+    Args:
+        pool_size: 初回作成時のプールサイズ。Noneの場合は DEFAULT_POOL_SIZE
+    """
+    global _shared_session
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = create_session(pool_size or DEFAULT_POOL_SIZE)
+        return _shared_session
+
+
+def connection_stats(session: Optional[requests.Session] = None) -> Dict:
+    """
+    接続の再利用状況を返す
+    Returns:
+        {'requests': 送信数, 'new_connections': 新規接続数, 'reused_connections': 再利用数}
+    """
+    session = session or get_shared_session()
+    adapters = {id(a): a for a in session.adapters.values() if isinstance(a, CountingHTTPAdapter)}
+    sent = sum(a.requests_sent for a in adapters.values())
+    created = sum(a.new_connections() for a in adapters.values())
+    return {
+        'requests': sent,
+        'new_connections': created,
+        'reused_connections': max(sent - created, 0),
+    }
@@ -0,0 +1,122 @@
+"""
+取得済みのトーナメント一覧を差分だけ更新する
+
+再取得で実際に変わるのは主にエントリー数（と参加可否）で、タイトル・会場・参加費・保証額は
+ほとんど変わらない。前回の一覧（スナップショット）を detail_url で引けるようにしてクロールし、
+既知の行は保証額の抽出と詳細ページの取得を省略する。新しい一覧との差分（追加・削除・変更）を
+求め、変更のあった行だけをスナップショットのリストに反映する。
+"""
+import asyncio
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from async_crawler import DEFAULT_CONCURRENCY, crawl_merged, date_queries, query_crawlers
+from scraper import PokerfansScraper
+
+
+def index_by_url(tournaments: List[Dict]) -> Dict[str, Dict]:
+    """detail_url → 行"""
+    return {t['detail_url']: t for t in tournaments}
+
+
+def diff_tournaments(old: List[Dict], new: List[Dict]) -> Dict:
+    """
+    2つの一覧の差分を求める
+    比較するのは新しい行に含まれる項目だけ（参加可否などの表示用の項目は無視する）
+    Returns:
+        {'added': [新しい行], 'removed': [古い行], 'changed': [新しい行], 'unchanged': 件数}
+    """
+    old_by_url = index_by_url(old)
+    new_by_url = index_by_url(new)
+
+    added, changed = [], []
+    unchanged = 0
+    for url, row in new_by_url.items():
+        previous = old_by_url.get(url)
+        if previous is None:
+            added.append(row)
+        elif any(previous.get(key) != value for key, value in row.items()):
+            changed.append(row)
+        else:
+            unchanged += 1
+    removed = [row for url, row in old_by_url.items() if url not in new_by_url]
+    return {'added': added, 'removed': removed, 'changed': changed, 'unchanged': unchanged}
+
+
+def apply_diff(target: List[Dict], diff: Dict) -> List[Dict]:
+    """
+    差分を target（スナップショットのリスト）にその場で反映する
+    変更のあった行は既存の dict を更新し、削除された行を除き、追加された行を末尾に足す
+    Returns:
+        変更・追加された行（target 内のオブジェクト）
+    """
+    by_url = index_by_url(target)
+    touched = []
+    for row in diff['changed']:
+        existing = by_url[row['detail_url']]
+        existing.update(row)
+        touched.append(existing)
+
+    if diff['removed']:
+        removed = {row['detail_url'] for row in diff['removed']}
+        target[:] = [t for t in target if t['detail_url'] not in removed]
+
+    target.extend(diff['added'])
+    touched.extend(diff['added'])
+    return touched
+
+
+def merge_diff(rows: List[Dict], diff: Dict) -> List[Dict]:
+    """
+    apply_diff と同じ結果の新しいリストを返す（rows とその行は変更しない）
+    変更のない行は rows のオブジェクトをそのまま使い、変更・追加された行は新しい行を使う
+    """
+    changed = index_by_url(diff['changed'])
+    removed = {row['detail_url'] for row in diff['removed']}
+    merged = [changed.get(t['detail_url'], t) for t in rows if t['detail_url'] not in removed]
+    merged.extend(diff['added'])
+    return merged
+
+
+def diff_report(diff: Dict) -> Dict:
+    """差分の件数"""
+    return {
+        'added': len(diff['added']),
+        'removed': len(diff['removed']),
+        'changed': len(diff['changed']),
+        'unchanged': diff['unchanged'],
+    }
+
+
+def refresh_incremental(snapshot: List[Dict], date_str: str = None, concurrency: int = DEFAULT_CONCURRENCY,
+                        max_details_per_page: int = 0,
+                        scraper: Optional[PokerfansScraper] = None,
+                        locations: Optional[Sequence[str]] = None) -> Tuple[Dict, Dict]:
+    """
+    スナップショットを基準に全ページを再取得して差分を求める（スナップショットは変更しない）
+    Args:
+        snapshot: 前回取得した一覧
+        date_str: 'YYYY/MM/DD'形式の日付文字列。Noneの場合は今日
+        concurrency: 同時リクエスト数の上限
+        max_details_per_page: 新しく現れた行の詳細取得数（0=取得しない）
+        scraper: 使用するスクレイパー（省略時は date_str から作成）
+        locations: 取得する都道府県（省略時は crawl_date と同じ）
+    Returns:
+        (diff, report): diff は diff_tournaments の戻り値、report は件数と所要時間
+    """
+    started = time.perf_counter()
+    queries = date_queries(scraper, locations)
+    scraper = scraper or PokerfansScraper(target_date=date_str)
+    crawlers = query_crawlers(scraper, queries, concurrency=concurrency, max_details_per_page=max_details_per_page,
+                              known=index_by_url(snapshot))
+    tournaments = asyncio.run(crawl_merged(crawlers))
+
+    diff = diff_tournaments(snapshot, tournaments)
+    failed_pages = sum(len(crawler.failed_pages) for crawler in crawlers)
+    if failed_pages:
+        # 取得できなかったページの行は削除扱いにしない
+        diff['removed'] = []
+    report = diff_report(diff)
+    report['failed_pages'] = failed_pages
+    report['seconds'] = round(time.perf_counter() - started, 3)
+    return diff, report
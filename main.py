@@ -1,11 +1,31 @@
-from scraper import PokerfansScraper
+"""
+コマンドラインからトーナメント一覧を取得する
 
-def main():
+    python main.py                                   # 今日の一覧を取得しながら表示
+    python main.py --start 2025/03/27 --days 7 --output out [--format jsonl|csv|parquet]
+
+--output を指定すると、日付の範囲を1日ずつ取得して日付ごとのファイルに書き出す（export.py）。
+同じ出力先で再実行すると、書き出しが完了している日付は飛ばす（--no-resume で取り直す）。
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from async_crawler import DEFAULT_CONCURRENCY
+from scraper import PageEvent, PokerfansScraper
+
+
+def print_today():
     scraper = PokerfansScraper()
-    tournaments = scraper.get_tournament_list()
-    
-    # バリュー計算（エントリー総額 ÷ 保証賞金）
-    for tournament in tournaments:
+
+    # ページを取得するたびに、解析できたトーナメントから順に表示する
+    for item in scraper.iter_tournaments():
+        if isinstance(item, PageEvent):
+            status = "取得失敗" if item.failed else f"{item.count}件"
+            print(f"=== ページ {item.page + 1}/{item.total_pages}（{status}） ===")
+            continue
+
+        tournament = item
+        # バリュー計算（エントリー総額 ÷ 保証賞金）
         if tournament['guarantee'] > 0:
             total_entry_amount = tournament['current_entries'] * tournament['entry_fee']
             value_ratio = total_entry_amount / tournament['guarantee']
@@ -13,11 +33,48 @@ def main():
         else:
             tournament['value_ratio'] = None
 
-    # 結果表示（例）
-    for t in tournaments:
-        print(f"イベント: {t['title']}")
-        print(f"バリュー比率: {t['value_ratio']:.2f}" if t['value_ratio'] else "保証なし")
+        # 結果表示（例）
+        print(f"イベント: {tournament['title']}")
+        print(f"バリュー比率: {tournament['value_ratio']:.2f}" if tournament['value_ratio'] else "保証なし")
         print("---")
 
+
+def main():
+    parser = argparse.ArgumentParser(description="pokerfans.jp のトーナメント一覧を取得する")
+    parser.add_argument('--start', help="開始日（'YYYY/MM/DD'、省略時は今日）")
+    parser.add_argument('--end', help="終了日（'YYYY/MM/DD'、省略時は --days から計算）")
+    parser.add_argument('--days', type=int, default=0, help="開始日に加えて取得する日数（--end がない場合）")
+    parser.add_argument('--output', help="出力ディレクトリ（省略時は今日の一覧を表示するだけ）")
+    parser.add_argument('--format', choices=('jsonl', 'csv', 'parquet'), default='jsonl', help="出力形式")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help="同時リクエスト数の上限")
+    parser.add_argument('--max-details', type=int, default=0, help="1ページあたりの詳細取得数")
+    parser.add_argument('--no-resume', action='store_true', help="書き出し済みの日付も取り直す")
+    args = parser.parse_args()
+
+    if not args.output:
+        print_today()
+        return
+
+    from export import date_range, export_range
+
+    start = args.start or datetime.now().strftime('%Y/%m/%d')
+    end = args.end or (datetime.strptime(start, '%Y/%m/%d') + timedelta(days=args.days)).strftime('%Y/%m/%d')
+
+    def on_date(result):
+        if result.get('skipped'):
+            print(f"{result['date']}: 書き出し済みのため飛ばします")
+        elif result['failed_pages']:
+            print(f"{result['date']}: {len(result['failed_pages'])} ページの取得に失敗（次回の実行で取り直します）")
+        else:
+            print(f"{result['date']}: {result['rows']} 件 / {result['pages']} ページ（{result['seconds']:.1f}秒）"
+                  f" → {result['path']}")
+
+    results = export_range(date_range(start, end), args.output, args.format, concurrency=args.concurrency,
+                           max_details_per_page=args.max_details, resume=not args.no_resume, on_date=on_date)
+    incomplete = [r['date'] for r in results if not r.get('skipped') and r['failed_pages']]
+    if incomplete:
+        raise SystemExit(f"未完了の日付: {', '.join(incomplete)}")
+
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
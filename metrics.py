@@ -0,0 +1,250 @@
+"""
+一覧ページ・詳細ページの取得を段階ごとに計測する軽量なメトリクス
+
+1回の取得（ページ・詳細URLごと）を span として、次の段階の所要時間を記録する。
+
+- sleep: レート制限による待機
+- connect: DNS解決・TCP/TLS接続（接続を再利用した場合は記録されない）
+- ttfb: リクエスト送信から応答ヘッダ受信まで（接続時間を除く）
+- download: 本文の受信
+- parse: HTMLの解析
+- rows: 一覧ページの行の抽出（保証額の抽出を除く）
+- guarantee: 保証額の抽出
+
+段階ごとの件数・合計・最大を集計し、直近の span は JSON で、集計は Prometheus の
+テキスト形式でも取り出せる。span の完了は logging（ロガー名 'metrics'、DEBUG）と
+add_hook() で登録した関数に通知する。環境変数 POKERODDS_METRICS_PORT を設定すると
+/metrics（Prometheus）と /metrics.json を返す HTTP サーバを起動する。
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 記録する段階（表示順）
+STAGES = ('sleep', 'connect', 'ttfb', 'download', 'parse', 'rows', 'guarantee')
+# 保持する直近の span の数
+MAX_RECENT = int(os.environ.get("POKERODDS_METRICS_RECENT", "200"))
+# メトリクスを返す HTTP サーバのポート（未設定なら起動しない）
+METRICS_PORT = os.environ.get("POKERODDS_METRICS_PORT", "")
+
+_shared_metrics: Optional["Metrics"] = None
+_shared_server: Optional[ThreadingHTTPServer] = None
+_shared_lock = threading.Lock()
+
+
+class Metrics:
+    """
+    段階ごとの所要時間の集計
+    Args:
+        max_recent: 保持する直近の span の数
+    """
+
+    def __init__(self, max_recent: int = MAX_RECENT):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # (種類, 段階) → [件数, 合計秒, 最大秒]
+        self._stages: Dict[Tuple[str, str], List[float]] = {}
+        # (種類, ステータス) → 件数
+        self._responses: Dict[Tuple[str, str], int] = {}
+        self._recent = deque(maxlen=max_recent)
+        self._hooks: List[Callable[[Dict], None]] = []
+
+    def add_hook(self, hook: Callable[[Dict], None]):
+        """span が完了するたびに記録（dict）を渡して呼ぶ関数を登録"""
+        with self._lock:
+            self._hooks.append(hook)
+
+    @contextmanager
+    def span(self, kind: str, key: str):
+        """
+        1回の取得の計測範囲（この中の observe は span の記録にも加算される）
+        Args:
+            kind: 'list' / 'detail'
+            key: ページやURLを表す文字列
+        """
+        record = {'kind': kind, 'key': key, 'status': None, 'started_at': time.time()}
+        parent = getattr(self._local, 'record', None)
+        self._local.record = record
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            self._local.record = parent
+            record['total'] = round(time.perf_counter() - started, 6)
+            self._finish(record)
+
+    def _finish(self, record: Dict):
+        with self._lock:
+            self._recent.append(record)
+            status = str(record['status']) if record['status'] is not None else 'error'
+            self._responses[(record['kind'], status)] = self._responses.get((record['kind'], status), 0) + 1
+            hooks = list(self._hooks)
+        if logger.isEnabledFor(logging.DEBUG):
+            stages = " ".join(f"{stage}={record[stage] * 1000:.1f}ms" for stage in STAGES if stage in record)
+            logger.debug("%s %s status=%s %s total=%.1fms", record['kind'], record['key'], record['status'],
+                         stages, record['total'] * 1000)
+        for hook in hooks:
+            try:
+                hook(record)
+            except Exception as e:
+                logger.warning("メトリクスのフックでエラー: %s", e)
+
+    def current(self) -> Optional[Dict]:
+        """このスレッドで計測中の span の記録（なければNone）"""
+        return getattr(self._local, 'record', None)
+
+    def observe(self, stage: str, seconds: float, kind: str = None):
+        """
+        段階の所要時間を記録
+        Args:
+            stage: STAGES のいずれか
+            seconds: 所要時間
+            kind: 種類（省略時は計測中の span の種類。span の外なら 'other'）
+        """
+        record = self.current()
+        if record is not None:
+            record[stage] = round(record.get(stage, 0.0) + seconds, 6)
+            kind = kind or record['kind']
+        key = (kind or 'other', stage)
+        with self._lock:
+            entry = self._stages.get(key)
+            if entry is None:
+                entry = self._stages[key] = [0, 0.0, 0.0]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    @contextmanager
+    def timed(self, stage: str):
+        """with ブロックの所要時間を stage として記録"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._responses.clear()
+            self._recent.clear()
+
+    def summary(self) -> Dict:
+        """種類ごと・段階ごとの {'count', 'seconds', 'max'}"""
+        with self._lock:
+            stages = {key: list(value) for key, value in self._stages.items()}
+        summary: Dict[str, Dict] = {}
+        for (kind, stage), (count, total, maximum) in sorted(stages.items()):
+            summary.setdefault(kind, {})[stage] = {
+                'count': int(count), 'seconds': round(total, 6), 'max': round(maximum, 6),
+            }
+        return summary
+
+    def to_json(self) -> Dict:
+        """集計・応答数・直近の span（ダッシュボード用）"""
+        with self._lock:
+            responses = {f"{kind}:{status}": count for (kind, status), count in sorted(self._responses.items())}
+            recent = list(self._recent)
+        return {'stages': self.summary(), 'responses': responses, 'recent': recent}
+
+    def dump_json(self, path: str):
+        """to_json() をファイルに書き出す"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, ensure_ascii=False, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Prometheus のテキスト形式"""
+        lines = [
+            "# HELP pokerodds_stage_seconds Time spent per fetch stage.",
+            "# TYPE pokerodds_stage_seconds summary",
+        ]
+        summary = self.summary()
+        for kind, stages in summary.items():
+            for stage, values in stages.items():
+                labels = f'kind="{kind}",stage="{stage}"'
+                lines.append(f"pokerodds_stage_seconds_sum{{{labels}}} {values['seconds']}")
+                lines.append(f"pokerodds_stage_seconds_count{{{labels}}} {values['count']}")
+        lines += [
+            "# HELP pokerodds_stage_seconds_max Longest observation per fetch stage.",
+            "# TYPE pokerodds_stage_seconds_max gauge",
+        ]
+        for kind, stages in summary.items():
+            for stage, values in stages.items():
+                lines.append(f'pokerodds_stage_seconds_max{{kind="{kind}",stage="{stage}"}} {values["max"]}')
+        lines += [
+            "# HELP pokerodds_responses_total Fetches by kind and HTTP status.",
+            "# TYPE pokerodds_responses_total counter",
+        ]
+        with self._lock:
+            responses = sorted(self._responses.items())
+        for (kind, status), count in responses:
+            lines.append(f'pokerodds_responses_total{{kind="{kind}",status="{status}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+def get_shared_metrics() -> Metrics:
+    """プロセス全体で共有するメトリクスを返す（初回呼び出し時に作成）"""
+    global _shared_metrics
+    with _shared_lock:
+        if _shared_metrics is None:
+            _shared_metrics = Metrics()
+        return _shared_metrics
+
+
+def serve_metrics(port: int, metrics: Metrics = None, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    /metrics（Prometheus）と /metrics.json を返す HTTP サーバをバックグラウンドで起動
+    Args:
+        port: 待ち受けるポート（0なら空いているポート）
+        metrics: 公開するメトリクス（省略時はプロセス共有のもの）
+    """
+    metrics = metrics or get_shared_metrics()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path == "/metrics":
+                body, content_type = metrics.to_prometheus(), "text/plain; version=0.0.4"
+            elif path == "/metrics.json":
+                body, content_type = json.dumps(metrics.to_json(), ensure_ascii=False), "application/json"
+            else:
+                self.send_error(404)
+                return
+            payload = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+
+def start_shared_metrics_server() -> Optional[ThreadingHTTPServer]:
+    """POKERODDS_METRICS_PORT が設定されていれば、このプロセスで1つだけサーバを起動する"""
+    global _shared_server
+    if not METRICS_PORT:
+        return None
+    metrics = get_shared_metrics()
+    with _shared_lock:
+        if _shared_server is None:
+            try:
+                _shared_server = serve_metrics(int(METRICS_PORT), metrics, host="0.0.0.0")
+            except (OSError, ValueError) as e:
+                logger.warning("メトリクスのサーバを起動できません: %s", e)
+                return None
+        return _shared_server
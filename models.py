@@ -0,0 +1,259 @@
+"""
+トーナメント1件分のデータ型
+
+一覧の1行を dict ではなく __slots__ を使った Tournament で持つことで、1件あたりのメモリを抑える。
+会場名・時刻は同じ文字列が何度も現れるため intern して共有する。
+参加可否・JOPT判定・回収率は保存せず、参照されたときに計算する（参加可否は現在時刻に依存するため毎回計算）。
+複数のセッションで共有する行は freeze() で変更できないようにする。
+
+Tournament は dict と同じように t['title'] や t.get('guarantee', 0) で参照・更新できるので、
+既存の表示処理や main.py はそのまま動く。
+"""
+import re
+import sys
+from collections.abc import MutableMapping
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+import pytz
+
+# 日本のタイムゾーン
+JST = pytz.timezone('Asia/Tokyo')
+
+# 一覧ページから取得する項目（この順で保存・表示する）
+FIELDS = ('title', 'venue', 'start_time', 'end_time', 'entry_fee',
+          'current_entries', 'max_entries', 'detail_url', 'guarantee')
+# 参照時に計算する項目
+DERIVED_FIELDS = ('is_available', 'is_jopt', 'value_ratio')
+# intern して共有する項目（同じ値が多い文字列）
+_INTERNED = frozenset(('venue', 'start_time', 'end_time'))
+
+_JOPT = re.compile(r'JOPT', re.IGNORECASE)
+
+
+def parse_time(time_str):
+    """時間文字列をパース"""
+    if not time_str:
+        return None
+
+    try:
+        hours, minutes = map(int, time_str.split(':'))
+        return hours, minutes
+    except (ValueError, AttributeError):
+        return None
+
+
+def is_available(start_time_str, end_time_str, now: datetime = None):
+    """
+    トーナメントがまだ参加可能かを確認
+
+    ルール：
+    1. 深夜開始（0-6時）のトーナメント：
+       - 現在が早朝（0-6時）なら、当日のイベントとして判定
+       - 現在が日中/夜（7-23時）なら、翌日のイベントなので無視
+
+    2. 日中/夜開始（7-23時）のトーナメント：
+       - 現在時刻が開始時刻より前なら参加可能
+       - 現在時刻が開始時刻より後なら、締切時刻と比較
+       - 締切が翌日深夜（0-6時）の場合は特別処理
+
+    Args:
+        start_time_str: 開始時間 (HH:MM)
+        end_time_str: 締切時間 (HH:MM)
+        now: 判定の基準時刻。Noneの場合は現在の日本時間
+    Returns:
+        bool: 参加可能ならTrue
+    """
+    if not start_time_str:
+        return False  # 開始時間がない場合は除外
+
+    # 現在の日本時間
+    if now is None:
+        now = datetime.now(JST)
+    current_hour = now.hour
+    current_minute = now.minute
+
+    # 開始時間と締切時間をパース
+    start_time = parse_time(start_time_str)
+    if not start_time:
+        return False
+
+    start_hour, start_minute = start_time
+
+    # ケース1: 深夜開始（0-6時）のトーナメント
+    if 0 <= start_hour < 7:
+        # 現在も深夜（0-6時）なら、開始時間と比較
+        if 0 <= current_hour < 7:
+            # 現在時刻 < 開始時刻なら参加可能
+            return (current_hour < start_hour) or (current_hour == start_hour and current_minute < start_minute)
+        else:
+            # 現在が7時以降なら、このトーナメントは今日の早朝に終了済み
+            return False
+
+    # ケース2: 日中/夜開始（7-23時）のトーナメント
+    else:
+        # 現在時刻と開始時刻を比較
+        if (current_hour < start_hour) or (current_hour == start_hour and current_minute < start_minute):
+            # 開始前なら参加可能
+            return True
+        else:
+            # 開始後なら締切時間と比較
+            end_time = parse_time(end_time_str)
+            if not end_time:
+                return False  # 締切時間がない場合は除外
+
+            end_hour, end_minute = end_time
+
+            # 締切が深夜（0-6時）なら翌日と解釈
+            if 0 <= end_hour < 7:
+                # 現在も深夜（0-6時）なら当日の締切と比較
+                if 0 <= current_hour < 7:
+                    return (current_hour < end_hour) or (current_hour == end_hour and current_minute < end_minute)
+                else:
+                    # 現在が7時以降なら、締切は翌日なので参加可能
+                    return True
+            else:
+                # 締切も日中/夜なら単純比較
+                return (current_hour < end_hour) or (current_hour == end_hour and current_minute < end_minute)
+
+
+def is_jopt_tournament(title):
+    """タイトルにJOPTが含まれるかチェック"""
+    return bool(_JOPT.search(title))
+
+
+def value_ratio(guarantee: int, entry_fee: int, current_entries: int) -> Optional[float]:
+    """保証賞金÷エントリー総額（%）。保証なし・エントリー総額0の場合はNone"""
+    if guarantee > 0:
+        total_entry_amount = current_entries * entry_fee
+        if total_entry_amount > 0:
+            return guarantee / total_entry_amount * 100
+    return None
+
+
+class Tournament(MutableMapping):
+    """
+    一覧ページのトーナメント1件
+
+    FIELDS の各項目を属性として持ち、dict と同じ操作（t['key']、get、items、update、==）ができる。
+    DERIVED_FIELDS は t['is_available'] のように参照したときに計算する。
+    それ以外のキーを代入した場合（main.py の value_ratio など）は追加の項目として別に保持する。
+    """
+
+    __slots__ = FIELDS + ('_is_jopt', '_extra', '_frozen')
+
+    def __init__(self, title: str = '', venue: str = '', start_time: str = None, end_time: str = None,
+                 entry_fee: int = 0, current_entries: int = 0, max_entries: int = 0,
+                 detail_url: str = '', guarantee: int = 0):
+        self.title = title
+        self.venue = sys.intern(venue) if venue else venue
+        self.start_time = sys.intern(start_time) if start_time else start_time
+        self.end_time = sys.intern(end_time) if end_time else end_time
+        self.entry_fee = entry_fee
+        self.current_entries = current_entries
+        self.max_entries = max_entries
+        self.detail_url = detail_url
+        self.guarantee = guarantee
+        self._is_jopt = None
+        self._extra = None
+        self._frozen = False
+
+    @classmethod
+    def from_dict(cls, data) -> "Tournament":
+        """dict（保存済みの解析結果など）から作成。Tournament はそのまま返す"""
+        if isinstance(data, cls):
+            return data
+        tournament = cls(**{key: data[key] for key in FIELDS if key in data})
+        for key, value in data.items():
+            if key not in FIELDS and key not in DERIVED_FIELDS:
+                tournament[key] = value
+        return tournament
+
+    def freeze(self) -> "Tournament":
+        """以降の変更を禁止する（共有する取得結果の行に使う）"""
+        self._frozen = True
+        return self
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
+    @property
+    def is_jopt(self) -> bool:
+        if self._is_jopt is None:
+            self._is_jopt = is_jopt_tournament(self.title)
+        return self._is_jopt
+
+    @property
+    def value_ratio(self) -> Optional[float]:
+        return value_ratio(self.guarantee, self.entry_fee, self.current_entries)
+
+    def is_available(self, now: datetime = None) -> bool:
+        return is_available(self.start_time, self.end_time, now)
+
+    def __getitem__(self, key: str):
+        if key in FIELDS:
+            return getattr(self, key)
+        extra = self._extra
+        if extra is not None and key in extra:
+            return extra[key]
+        if key == 'is_available':
+            return self.is_available()
+        if key == 'is_jopt':
+            return self.is_jopt
+        if key == 'value_ratio':
+            return self.value_ratio
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value):
+        if self._frozen:
+            raise TypeError(f"共有中のトーナメントは変更できません: {key}")
+        if key in FIELDS:
+            if key in _INTERNED and value:
+                value = sys.intern(value)
+            elif key == 'title':
+                self._is_jopt = None
+            setattr(self, key, value)
+            return
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key: str):
+        if self._frozen:
+            raise TypeError(f"共有中のトーナメントは変更できません: {key}")
+        if key in FIELDS or self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from FIELDS
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return len(FIELDS) + (len(self._extra) if self._extra else 0)
+
+    def __contains__(self, key) -> bool:
+        return key in FIELDS or (self._extra is not None and key in self._extra)
+
+    def __repr__(self) -> str:
+        return f"Tournament({self.to_dict()!r})"
+
+    def __getstate__(self):
+        return tuple(getattr(self, key) for key in FIELDS) + (self._extra,)
+
+    def __setstate__(self, state):
+        self._is_jopt = None
+        self._extra = None
+        self._frozen = False
+        for key, value in zip(FIELDS, state):
+            self[key] = value
+        self._extra = state[len(FIELDS)]
+
+    def to_dict(self, derived: bool = False) -> Dict:
+        """dict に変換（derived=True なら参加可否・JOPT判定・回収率も含める）"""
+        data = dict(self.items())
+        if derived:
+            data.update((key, self[key]) for key in DERIVED_FIELDS)
+        return data
@@ -0,0 +1,88 @@
+"""
+検索条件・日付ごとの一覧の総ページ数の記録（投機的なページ取得の予測に使う）
+
+ページ0を取得して総ページ数が分かってから残りのページを取得すると、ページ0の往復の分だけ
+並列取得の開始が遅れる。前回の同じ日付（なければ同じ曜日の直近の日付、それもなければ既定値）の
+総ページ数を予測値として、ページ0と同時にその数までのページを取得する。
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+from storage import SQLiteStore
+
+# 記録がない場合の予測ページ数
+DEFAULT_PAGES = int(os.environ.get("POKERODDS_PREDICTED_PAGES", "3"))
+# 予測ページ数の上限（記録が壊れていても大量に取得しない）
+MAX_PAGES = 30
+# 一覧ページの検索条件のうち、総ページ数の記録に含めないもの
+_VOLATILE_PARAMS = ('startDate', 'page')
+
+_shared_store: Optional["PageCountStore"] = None
+_shared_lock = threading.Lock()
+
+
+def query_key(base_url: str, params: Dict) -> str:
+    """日付・ページ番号を除いた検索条件のキー"""
+    return base_url + "?" + urlencode(sorted((k, v) for k, v in params.items() if k not in _VOLATILE_PARAMS))
+
+
+def weekday(date_str: str) -> int:
+    """'YYYY/MM/DD' の曜日（月曜=0）"""
+    return datetime.strptime(date_str, '%Y/%m/%d').weekday()
+
+
+class PageCountStore(SQLiteStore):
+    """
+    (検索条件, 日付) → 総ページ数
+    Args:
+        path: データベースファイルのパス。Noneの場合は既定のパス
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS page_counts (
+            query TEXT NOT NULL,
+            date TEXT NOT NULL,
+            weekday INTEGER NOT NULL,
+            total_pages INTEGER NOT NULL,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (query, date)
+        );
+        CREATE INDEX IF NOT EXISTS page_counts_weekday ON page_counts (query, weekday, date);
+    """
+
+    def record(self, query: str, date_str: str, total_pages: int):
+        """取得で分かった総ページ数を記録"""
+        self._connection().execute(
+            "INSERT OR REPLACE INTO page_counts (query, date, weekday, total_pages, updated_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (query, date_str, weekday(date_str), total_pages, time.time())
+        )
+
+    def predict(self, query: str, date_str: str, default: int = DEFAULT_PAGES) -> int:
+        """
+        総ページ数の予測値
+        同じ日付の記録 → 同じ曜日の直近の日付の記録 → default の順に使う
+        """
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT total_pages FROM page_counts WHERE query = ? AND date = ?", (query, date_str)
+        ).fetchone()
+        if row is None:
+            row = connection.execute(
+                "SELECT total_pages FROM page_counts WHERE query = ? AND weekday = ? "
+                "ORDER BY date DESC LIMIT 1", (query, weekday(date_str))
+            ).fetchone()
+        return max(1, min(MAX_PAGES, row[0] if row else default))
+
+
+def get_shared_page_counts() -> PageCountStore:
+    """プロセス全体で共有する記録を返す（初回呼び出し時に作成）"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = PageCountStore()
+        return _shared_store
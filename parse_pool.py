@@ -0,0 +1,105 @@
+"""
+一覧・詳細ページの解析を別プロセスで行うためのプロセスプール
+
+HTMLの解析と行ごとの正規表現の処理は CPU 処理なので、スレッドを増やしても GIL で直列になる。
+取得（I/O）はこれまでどおりスレッドで行い、取得した本文だけをプロセスプールに渡して解析する。
+解析関数はワーカープロセスごとに1つのスクレイパー（通信・キャッシュを持たない）を使い回し、
+解析にかかった段階ごとの時間を結果と一緒に返す（呼び出し側のメトリクスに加算する）。
+
+ワーカーは spawn で起動する（Streamlit などのスレッドを持つプロセスから fork しないため）。
+共有のプールはプロセス数ごとに1つ作り、別の取得が使っている間に閉じることはしない。
+ワーカーが異常終了して使えなくなったプール（BrokenProcessPool）は discard_shared_pool で
+取り除き、次に get_shared_parse_pool を呼んだときに作り直す。
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+# 解析に使うプロセス数（0=プロセスプールを使わず、取得したスレッドで解析する）
+DEFAULT_PARSE_WORKERS = int(os.environ.get("POKERODDS_PARSE_WORKERS", "0"))
+# 解析待ちの本文を保持する数（これを超えると取得を待たせる）
+DEFAULT_QUEUE_SIZE = int(os.environ.get("POKERODDS_PARSE_QUEUE", "8"))
+
+# ワーカープロセス内で使い回すスクレイパー（(base_url, parser) ごと）
+_worker_scrapers: Dict[Tuple[str, Optional[str]], object] = {}
+
+# プロセス数 → 共有のプール
+_shared_pools: Dict[int, ProcessPoolExecutor] = {}
+_shared_lock = threading.Lock()
+
+
+def _worker_scraper(base_url: str, parser: Optional[str]):
+    """解析だけに使うスクレイパー（通信・キャッシュはこのプロセス内のメモリ上のもの）"""
+    key = (base_url, parser)
+    scraper = _worker_scrapers.get(key)
+    if scraper is None:
+        import requests
+
+        from detail_cache import DetailCache
+        from http_cache import ValidatorStore
+        from metrics import Metrics
+        from rate_limiter import RateLimiter
+        from scraper import PokerfansScraper
+        scraper = _worker_scrapers[key] = PokerfansScraper(
+            base_url=base_url, parser=parser, session=requests.Session(), rate_limiter=RateLimiter(),
+            detail_cache=DetailCache(":memory:"), validators=ValidatorStore(":memory:"), metrics=Metrics())
+    return scraper
+
+
+def _stage_seconds(scraper, kind: str) -> Dict[str, float]:
+    """このワーカーで計測した段階ごとの時間を取り出して、計測をやり直す"""
+    stages = scraper.metrics.summary().get(kind, {})
+    scraper.metrics.reset()
+    return {stage: values['seconds'] for stage, values in stages.items()}
+
+
+def parse_list_html(html: str, base_url: str, parser: Optional[str] = None,
+                    location: str = None) -> Tuple[Dict, Dict[str, float]]:
+    """
+    一覧ページを解析する（ワーカープロセスで実行）
+    Args:
+        location: 対象の都道府県（Noneの場合はスクレイパーの既定）
+    Returns:
+        ({'tournaments': [...], 'pagination': {...}}, 段階ごとの秒数)
+    """
+    scraper = _worker_scraper(base_url, parser)
+    if location is not None:
+        scraper = scraper.for_query(location=location)
+    tournaments, pagination = scraper.parse_tournament_list(html)
+    return {'tournaments': tournaments, 'pagination': pagination}, _stage_seconds(scraper, 'other')
+
+
+def parse_detail_html(html: str, base_url: str, parser: Optional[str] = None) -> Tuple[Dict, Dict[str, float]]:
+    """詳細ページを解析する（ワーカープロセスで実行）"""
+    scraper = _worker_scraper(base_url, parser)
+    return scraper.parse_tournament_detail(html), _stage_seconds(scraper, 'other')
+
+
+def create_pool(workers: int) -> ProcessPoolExecutor:
+    """解析用のプロセスプールを作成"""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def get_shared_parse_pool(workers: int = None) -> ProcessPoolExecutor:
+    """
+    プロセス全体で共有する解析用のプロセスプールを返す（プロセス数ごとに1つ）
+    Args:
+        workers: プロセス数。Noneの場合は DEFAULT_PARSE_WORKERS（0ならCPU数）
+    """
+    workers = workers or DEFAULT_PARSE_WORKERS or os.cpu_count() or 1
+    with _shared_lock:
+        pool = _shared_pools.get(workers)
+        if pool is None:
+            pool = _shared_pools[workers] = create_pool(workers)
+        return pool
+
+
+def discard_shared_pool(pool: ProcessPoolExecutor):
+    """使えなくなった共有のプールを取り除く（次の get_shared_parse_pool で作り直す）"""
+    with _shared_lock:
+        for workers, shared in list(_shared_pools.items()):
+            if shared is pool:
+                del _shared_pools[workers]
+    pool.shutdown(wait=False)
@@ -0,0 +1,136 @@
+"""
+本文のハッシュをキーにした解析結果のキャッシュ（内容アドレス）
+
+一覧・詳細ページの本文が以前に解析したものとバイト単位で同じなら、URL や日付が違っても
+解析結果は同じになる。本文のハッシュ・解析処理の版（PARSER_VERSION）・解析結果に影響する
+条件（一覧ページの取得先と対象地域）をキーに、解析結果を保存しておき、同じ本文を受け取ったら
+HTMLの解析と行の抽出を丸ごと省略する。
+
+一覧ページの行は項目名を繰り返さないよう FIELDS の順の配列にして JSON にし、zlib で圧縮して保存する。
+件数が上限を超えたら最終アクセスが古いものから削除する（LRU）。
+"""
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+from models import FIELDS
+from storage import SQLiteStore
+
+DEFAULT_MAX_ENTRIES = int(os.environ.get("POKERODDS_PARSED_MAX_ENTRIES", "2000"))
+
+_shared_cache: Optional["ParsedPageCache"] = None
+_shared_lock = threading.Lock()
+
+
+def encode_parsed(parsed: Dict) -> bytes:
+    """解析結果を圧縮した JSON に変換（一覧ページの行は FIELDS の順の配列にする）"""
+    if 'tournaments' in parsed:
+        value = {
+            'rows': [[t.get(key) for key in FIELDS] for t in parsed['tournaments']],
+            'pagination': parsed.get('pagination', {}),
+        }
+    else:
+        value = {'detail': parsed}
+    return zlib.compress(json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def decode_parsed(blob: bytes) -> Dict:
+    """encode_parsed の逆変換（一覧ページの行は dict で返す）"""
+    value = json.loads(zlib.decompress(blob))
+    if 'detail' in value:
+        return value['detail']
+    return {'tournaments': [dict(zip(FIELDS, row)) for row in value['rows']], 'pagination': value['pagination']}
+
+
+class ParsedPageCache(SQLiteStore):
+    """
+    (名前空間, 本文のハッシュ) → 解析結果のキャッシュ
+    Args:
+        path: データベースファイルのパス。Noneの場合は既定のパス
+        max_entries: 保持する最大件数
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS parsed_pages (
+            key TEXT PRIMARY KEY,
+            value BLOB NOT NULL,
+            parse_seconds REAL NOT NULL,
+            stored_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS parsed_pages_accessed ON parsed_pages (accessed_at);
+    """
+
+    def __init__(self, path: str = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._stats_lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'parse_seconds_saved': 0.0}
+        super().__init__(path)
+
+    @staticmethod
+    def key(namespace: str, digest: str) -> str:
+        return f"{namespace}|{digest}"
+
+    def get(self, namespace: str, digest: str) -> Optional[Dict]:
+        """同じ本文の解析結果（なければNone）"""
+        key = self.key(namespace, digest)
+        connection = self._connection()
+        row = connection.execute("SELECT value, parse_seconds FROM parsed_pages WHERE key = ?", (key,)).fetchone()
+        with self._stats_lock:
+            self._stats['hits' if row else 'misses'] += 1
+            if row:
+                self._stats['parse_seconds_saved'] += row[1]
+        if row is None:
+            return None
+        connection.execute("UPDATE parsed_pages SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return decode_parsed(row[0])
+
+    def put(self, namespace: str, digest: str, parsed: Dict, parse_seconds: float = 0.0):
+        """解析結果を保存し、上限を超えた分を古い順に削除"""
+        connection = self._connection()
+        now = time.time()
+        connection.execute(
+            "INSERT OR REPLACE INTO parsed_pages (key, value, parse_seconds, stored_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (self.key(namespace, digest), encode_parsed(parsed), parse_seconds, now, now)
+        )
+        overflow = len(self) - self.max_entries
+        if overflow > 0:
+            cursor = connection.execute(
+                "DELETE FROM parsed_pages WHERE key IN "
+                "(SELECT key FROM parsed_pages ORDER BY accessed_at LIMIT ?)", (overflow,)
+            )
+            with self._stats_lock:
+                self._stats['evictions'] += cursor.rowcount
+
+    def clear(self):
+        """すべて削除"""
+        self._connection().execute("DELETE FROM parsed_pages")
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM parsed_pages").fetchone()[0]
+
+    def stats(self) -> Dict:
+        """ヒット・ミス・削除数・ヒット率・件数・保存サイズ・省略できた解析時間"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['parse_seconds_saved'] = round(stats['parse_seconds_saved'], 3)
+        entries, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM parsed_pages").fetchone()
+        stats['entries'] = entries
+        stats['bytes'] = size
+        return stats
+
+
+def get_shared_parsed_cache() -> ParsedPageCache:
+    """プロセス全体で共有するキャッシュを返す（初回呼び出し時に作成）"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ParsedPageCache()
+        return _shared_cache
@@ -0,0 +1,117 @@
+"""
+一覧・詳細ページの解析バックエンド
+
+インストール状況に応じて selectolax / lxml を使い、なければ標準の html.parser に
+フォールバックする。BeautifulSoup 系のバックエンドは SoupStrainer で
+.profile-event / ul.pagination / pre.pre-white の部分木だけを構築する。
+どのバックエンドでもスクレイパーからは同じ select / select_one / text / attr で扱える。
+"""
+import os
+import re
+from typing import List, Optional
+
+# 解析対象の部分木（クラス属性は複数値の文字列のまま渡ってくるため正規表現で判定）
+TARGET_CLASSES = re.compile(r'(?:^|\s)(?:profile-event|pagination|pre-white)(?:\s|$)')
+
+# 自動選択時の優先順（速い順）
+BACKEND_PRIORITY = ['selectolax', 'lxml', 'html.parser']
+
+
+class SoupBackend:
+    """
+    BeautifulSoup による解析
+    Args:
+        features: BeautifulSoup のパーサ名（'lxml' / 'html.parser'）
+        strain: Trueの場合、対象の部分木だけを構築する
+    """
+
+    def __init__(self, features: str = 'html.parser', strain: bool = True):
+        from bs4 import BeautifulSoup, SoupStrainer
+        self.name = features if strain else f'{features} (full)'
+        self.features = features
+        self._soup = BeautifulSoup
+        self._strainer = SoupStrainer(class_=TARGET_CLASSES) if strain else None
+
+    def parse(self, html: str):
+        return self._soup(html, self.features, parse_only=self._strainer)
+
+    def select(self, node, selector: str) -> List:
+        return node.select(selector)
+
+    def select_one(self, node, selector: str):
+        return node.select_one(selector)
+
+    def text(self, node) -> str:
+        return node.text
+
+    def attr(self, node, name: str) -> Optional[str]:
+        return node.get(name)
+
+
+class SelectolaxBackend:
+    """selectolax（lexbor）による解析。Cで全体を解析するため部分木の絞り込みは行わない"""
+
+    name = 'selectolax'
+
+    def __init__(self):
+        try:
+            from selectolax.lexbor import LexborHTMLParser as parser
+        except ImportError:
+            from selectolax.parser import HTMLParser as parser
+        self._parser = parser
+
+    def parse(self, html: str):
+        return self._parser(html)
+
+    def select(self, node, selector: str) -> List:
+        return node.css(selector)
+
+    def select_one(self, node, selector: str):
+        return node.css_first(selector)
+
+    def text(self, node) -> str:
+        return node.text()
+
+    def attr(self, node, name: str) -> Optional[str]:
+        return node.attributes.get(name)
+
+
+def _create(name: str):
+    if name == 'selectolax':
+        return SelectolaxBackend()
+    if name == 'lxml':
+        import lxml  # noqa: F401  lxml がなければ ImportError
+        return SoupBackend('lxml')
+    if name == 'html.parser':
+        return SoupBackend('html.parser')
+    raise ValueError(f"unknown parser backend: {name}")
+
+
+def available_backends() -> List[str]:
+    """このプロセスで使えるバックエンド名（優先順）"""
+    names = []
+    for name in BACKEND_PRIORITY:
+        try:
+            _create(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_backend(name: str = None):
+    """
+    解析バックエンドを返す
+    Args:
+        name: 'selectolax' / 'lxml' / 'html.parser'。Noneの場合は環境変数
+              POKERODDS_PARSER、未設定ならインストール済みの最速のもの
+    """
+    name = name or os.environ.get('POKERODDS_PARSER')
+    if name:
+        return _create(name)
+    for candidate in BACKEND_PRIORITY:
+        try:
+            return _create(candidate)
+        except ImportError:
+            continue
+    raise RuntimeError("no HTML parser backend available")
@@ -0,0 +1,197 @@
+"""
+今日から数日先までの取得結果を事前に取得しておく先読みスケジューラ
+
+ユーザーがボタンを押してから全ページを取得するのではなく、バックグラウンドで定期的に
+今日＋N日分を取得して共有の保存先（result_store）に入れておき、画面は読み出すだけにする。
+開始が近い日付ほどエントリー数がよく変わるため、今日・明日は短い間隔で、先の日付ほど
+長い間隔で取り直す（2回目以降は差分更新）。
+
+Streamlit と同じプロセスで動かす（環境変数 POKERODDS_PREFETCH=inprocess）か、
+別プロセスのワーカーとして起動する:
+
+    python prefetch.py [--days 7] [--max-details 0] [--once]
+
+ワーカーが取得した結果は SQLite 経由で Streamlit 側から読み出される
+（同じマシン・同じ POKERODDS_CACHE_DIR で動かすこと）。
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from metrics import start_shared_metrics_server
+from models import JST
+from result_store import ResultStore, get_shared_result_store
+
+# 'off'（先読みしない）/ 'inprocess'（Streamlit と同じプロセスで先読み）/ 'worker'（別プロセスのワーカーが先読み）
+PREFETCH_MODE = os.environ.get("POKERODDS_PREFETCH", "off")
+# 今日に加えて先読みする日数
+DEFAULT_DAYS = int(os.environ.get("POKERODDS_PREFETCH_DAYS", "7"))
+# 先読み時の1ページあたりの詳細取得数
+DEFAULT_MAX_DETAILS = int(os.environ.get("POKERODDS_PREFETCH_DETAILS", "0"))
+# 今日からの日数ごとの取り直し間隔（秒）。(この日数まで, 間隔) の順に当てはめる
+DEFAULT_INTERVALS: Tuple[Tuple[int, int], ...] = (
+    (0, 5 * 60),        # 今日
+    (1, 30 * 60),       # 明日
+    (6, 3 * 3600),      # 1週間以内
+    (366, 12 * 3600),   # それより先
+)
+# 取得に失敗した日付を再試行するまでの秒数
+RETRY_SECONDS = 60
+# 次の取得予定までの待機の上限（停止要求・日付の変わり目に気付くため）
+MAX_SLEEP = 60
+
+logger = logging.getLogger(__name__)
+
+_shared_scheduler: Optional["PrefetchScheduler"] = None
+_shared_lock = threading.Lock()
+
+
+def today_jst() -> datetime:
+    return datetime.now(JST)
+
+
+def prefetch_dates(now: datetime = None, days: int = DEFAULT_DAYS) -> List[str]:
+    """先読みする日付（今日から順に 'YYYY/MM/DD'）"""
+    today = (now or today_jst()).date()
+    return [(today + timedelta(days=offset)).strftime('%Y/%m/%d') for offset in range(days + 1)]
+
+
+class PrefetchScheduler:
+    """
+    今日＋days 日分のスナップショットを定期的に取り直す
+    Args:
+        store: 取得結果の保存先
+        days: 今日に加えて先読みする日数
+        max_details: 1ページあたりの詳細取得数
+        intervals: 今日からの日数ごとの取り直し間隔 ((日数, 秒), ...)
+        clock: 現在の日本時間を返す関数（テスト用）
+    """
+
+    def __init__(self, store: ResultStore, days: int = DEFAULT_DAYS, max_details: int = DEFAULT_MAX_DETAILS,
+                 intervals: Tuple[Tuple[int, int], ...] = DEFAULT_INTERVALS,
+                 clock: Callable[[], datetime] = today_jst):
+        self.store = store
+        self.days = days
+        self.max_details = max_details
+        self.intervals = intervals
+        self.clock = clock
+        self._failed_at: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.runs = 0
+        self.failures = 0
+
+    def dates(self) -> List[str]:
+        """先読みする日付（今日から順に）"""
+        return prefetch_dates(self.clock(), self.days)
+
+    def interval(self, offset: int) -> int:
+        """今日から offset 日後の日付の取り直し間隔（秒）"""
+        for max_offset, seconds in self.intervals:
+            if offset <= max_offset:
+                return seconds
+        return self.intervals[-1][1]
+
+    def next_due(self, date_str: str, offset: int) -> float:
+        """次に取り直すまでの秒数（0以下なら取り直す）"""
+        failed_at = self._failed_at.get(date_str)
+        if failed_at is not None:
+            return RETRY_SECONDS - (time.time() - failed_at)
+        snapshot = self.store.get(date_str)
+        if snapshot is None:
+            return 0
+        return self.interval(offset) - snapshot.age
+
+    def run_once(self) -> List[str]:
+        """取り直す時期になった日付を今日から順に取得し、取得した日付を返す"""
+        dates = self.dates()
+        self.store.prune(dates[0])
+        refreshed = []
+        for offset, date_str in enumerate(dates):
+            if self._stop.is_set():
+                break
+            if self.next_due(date_str, offset) > 0:
+                continue
+            try:
+                self.store.refresh(date_str, self.max_details)
+            except Exception as e:
+                logger.warning("先読みに失敗: %s: %s", date_str, e)
+                self._failed_at[date_str] = time.time()
+                self.failures += 1
+                continue
+            self._failed_at.pop(date_str, None)
+            refreshed.append(date_str)
+        self.runs += 1
+        return refreshed
+
+    def seconds_until_next(self) -> float:
+        """次に取り直す日付までの秒数"""
+        waits = [self.next_due(date_str, offset) for offset, date_str in enumerate(self.dates())]
+        return max(0.0, min(waits + [MAX_SLEEP]))
+
+    def run_forever(self):
+        """stop() されるまで取得と待機を繰り返す"""
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.seconds_until_next())
+
+    def start(self) -> "PrefetchScheduler":
+        """バックグラウンドのスレッドで実行を開始"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name="prefetch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = None):
+        """実行中の取得が終わったら停止する"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def status(self) -> Dict:
+        """先読み対象の日付ごとの取得時刻と、次に取り直すまでの秒数"""
+        status = {}
+        for offset, date_str in enumerate(self.dates()):
+            snapshot = self.store.get(date_str)
+            status[date_str] = {
+                'fetched_at': snapshot.fetched_at if snapshot else None,
+                'next_in': round(max(0.0, self.next_due(date_str, offset)), 1),
+            }
+        return status
+
+
+def start_shared_scheduler(days: int = DEFAULT_DAYS, max_details: int = DEFAULT_MAX_DETAILS) -> PrefetchScheduler:
+    """共有の保存先に先読みするスケジューラをこのプロセスで1つだけ起動する"""
+    global _shared_scheduler
+    with _shared_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = PrefetchScheduler(get_shared_result_store(), days=days, max_details=max_details)
+        return _shared_scheduler.start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="今日から数日先までのトーナメント一覧を先読みするワーカー")
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS, help="今日に加えて先読みする日数")
+    parser.add_argument('--max-details', type=int, default=DEFAULT_MAX_DETAILS, help="1ページあたりの詳細取得数")
+    parser.add_argument('--once', action='store_true', help="1回だけ取得して終了する")
+    args = parser.parse_args()
+
+    scheduler = PrefetchScheduler(get_shared_result_store(), days=args.days, max_details=args.max_details)
+    # POKERODDS_METRICS_PORT が設定されていれば取得の段階ごとの所要時間を公開する
+    start_shared_metrics_server()
+    if args.once:
+        print("取得した日付:", ", ".join(scheduler.run_once()) or "なし")
+        return
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
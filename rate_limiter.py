@@ -0,0 +1,173 @@
+"""
+pokerfans.jp へのリクエスト間隔を制御するトークンバケット
+
+スレッドからは acquire()、asyncio からは acquire_async() で同じバケットを共有できる。
+待ち時間はロックの外で消化するため、待機中も他のスレッド・タスクを止めない。
+429/503 を受けたら Retry-After（なければ現在の間隔の倍）だけ全体を止め、
+レートを半分に落としてから成功応答ごとに少しずつ戻す。
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+# 既定値（1秒あたり1リクエスト、最大3リクエストまで連続可）
+DEFAULT_RATE = float(os.environ.get("POKERODDS_RATE", "1.0"))
+DEFAULT_BURST = int(os.environ.get("POKERODDS_BURST", "3"))
+DEFAULT_JITTER = float(os.environ.get("POKERODDS_JITTER", "0.3"))
+
+# バックオフ時にレートを落とす下限（元のレートに対する倍率）
+MIN_RATE_FACTOR = 1 / 16
+# 成功応答ごとにレート倍率を戻す割合
+RECOVERY_FACTOR = 1.25
+# 混雑を示すステータスコード
+THROTTLE_STATUSES = (429, 503)
+
+_shared_limiter: Optional["RateLimiter"] = None
+_shared_lock = threading.Lock()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-After ヘッダを秒数に変換（秒数・HTTP日付の両形式に対応）
+    Returns:
+        float: 待機秒数。解釈できない場合はNone
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateLimiter:
+    """
+    スレッド・asyncio 共用のトークンバケット
+    Args:
+        rate: 1秒あたりの許可リクエスト数
+        burst: バケットの容量（連続して送れる最大数）
+        jitter: 待機時間に加えるランダムな揺らぎの最大秒数
+        max_backoff: Retry-After がない場合のバックオフ上限（秒）
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                 jitter: float = DEFAULT_JITTER, max_backoff: float = 60.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.jitter = max(0.0, jitter)
+        self.max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._factor = 1.0
+
+        # メトリクス
+        self._acquired = 0
+        self._throttled = 0
+        self._wait_seconds = 0.0
+        self._fetch_seconds = 0.0
+
+    @property
+    def current_rate(self) -> float:
+        """バックオフを反映した現在のレート"""
+        return self.rate * self._factor
+
+    def _reserve(self) -> float:
+        """トークンを1つ予約して、送信前に待つべき秒数を返す"""
+        with self._lock:
+            now = time.monotonic()
+            rate = self.current_rate
+            # バックオフ中は _updated が未来の時刻になっており、それまでは補充しない
+            if now > self._updated:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * rate)
+                self._updated = now
+            # 残量がマイナスになる分は将来のトークンを先取りする（待ち順が保たれる）
+            self._tokens -= 1
+            wait = (self._updated - now) + max(0.0, -self._tokens) / rate
+            self._acquired += 1
+        if wait > 0 and self.jitter:
+            wait += random.uniform(0, self.jitter)
+        return wait
+
+    def _record_wait(self, seconds: float):
+        with self._lock:
+            self._wait_seconds += seconds
+
+    def acquire(self) -> float:
+        """トークンを取得するまで待機（スレッド用）。待機した秒数を返す"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+            self._record_wait(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """トークンを取得するまで待機（asyncio 用）。待機した秒数を返す"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+            self._record_wait(wait)
+        return wait
+
+    def record_fetch(self, seconds: float):
+        """リクエストの送受信にかかった時間を記録"""
+        with self._lock:
+            self._fetch_seconds += seconds
+
+    def on_response(self, status_code: int, retry_after: Optional[str] = None) -> Optional[float]:
+        """
+        応答ステータスをもとにレートを調整
+        Args:
+            status_code: HTTPステータスコード
+            retry_after: Retry-After ヘッダの値
+        Returns:
+            float: 混雑応答の場合は全体を止める秒数、それ以外はNone
+        """
+        with self._lock:
+            if status_code not in THROTTLE_STATUSES:
+                self._factor = min(1.0, self._factor * RECOVERY_FACTOR)
+                return None
+
+            self._throttled += 1
+            self._factor = max(MIN_RATE_FACTOR, self._factor / 2)
+            delay = parse_retry_after(retry_after)
+            if delay is None:
+                delay = min(self.max_backoff, 2 / self.current_rate)
+            # 止めている間はトークンを補充せず、再開直後に集中しないようにする
+            self._updated = max(self._updated, time.monotonic() + delay)
+            self._tokens = min(self._tokens, 0.0)
+            return delay
+
+    def stats(self) -> Dict:
+        """待機時間と通信時間などのメトリクス"""
+        with self._lock:
+            return {
+                'requests': self._acquired,
+                'throttled': self._throttled,
+                'wait_seconds': round(self._wait_seconds, 3),
+                'fetch_seconds': round(self._fetch_seconds, 3),
+                'current_rate': round(self.current_rate, 3),
+            }
+
+
+def get_shared_limiter() -> RateLimiter:
+    """プロセス全体で共有するレートリミッタを返す（初回呼び出し時に作成）"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+        return _shared_limiter
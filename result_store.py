@@ -0,0 +1,286 @@
+"""
+日付ごとの取得結果をプロセス全体で共有する保存先
+
+Streamlit の各セッションが個別にクロールすると、同時に開いている人数分だけ
+pokerfans.jp に全ページのリクエストが飛ぶ。取得結果を日付ごとに1つだけ持ち、
+同じ日付の取得が同時に要求された場合は実行中の1回の取得に相乗りさせる（single-flight）。
+
+セッションには変更できないスナップショット（行は freeze 済みの Tournament）と
+取得時刻を渡すので、後から来たセッションは待たずに同じ結果を表示できる。
+
+スナップショットは SQLite にも保存するので、別プロセスの先読みワーカー（prefetch.py）が
+取得した結果も、再起動前に取得した結果も同じように読み出せる。
+"""
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from async_crawler import crawl_date
+from history import HistoryStore, get_shared_history_store
+from incremental import merge_diff, refresh_incremental
+from models import Tournament
+from storage import SQLiteStore
+
+# スナップショットを再利用する最大秒数（これより古ければ取得し直す）
+DEFAULT_TTL = int(os.environ.get("POKERODDS_RESULT_TTL", "86400"))
+
+logger = logging.getLogger(__name__)
+
+_shared_store: Optional["ResultStore"] = None
+_shared_lock = threading.Lock()
+
+
+class Snapshot(NamedTuple):
+    """ある日付の取得結果（変更不可）"""
+    date: str
+    tournaments: Tuple[Tournament, ...]
+    fetched_at: float       # 取得完了時刻（time.time()）
+    seconds: float          # 取得にかかった秒数
+    max_details: int = 0    # 取得時の1ページあたりの詳細取得数
+
+    @property
+    def age(self) -> float:
+        """取得からの経過秒数"""
+        return time.time() - self.fetched_at
+
+
+class _Flight:
+    """実行中の取得1回分（相乗りしたスレッドは done を待つ）"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.snapshot: Optional[Snapshot] = None
+        self.report: Optional[Dict] = None
+        self.error: Optional[BaseException] = None
+
+
+def make_snapshot(date_str: str, tournaments: List[Dict], seconds: float, max_details: int = 0,
+                  fetched_at: float = None) -> Snapshot:
+    """取得結果からスナップショットを作成（行は freeze する）"""
+    rows = tuple(Tournament.from_dict(t).freeze() for t in tournaments)
+    fetched_at = time.time() if fetched_at is None else fetched_at
+    return Snapshot(date_str, rows, fetched_at, round(seconds, 3), max_details)
+
+
+class SnapshotStore(SQLiteStore):
+    """
+    スナップショットの保存先（プロセス間で共有する）
+    Args:
+        path: データベースファイルのパス。Noneの場合は既定のパス
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS result_snapshots (
+            date TEXT PRIMARY KEY,
+            rows BLOB NOT NULL,
+            fetched_at REAL NOT NULL,
+            seconds REAL NOT NULL,
+            max_details INTEGER NOT NULL
+        );
+    """
+
+    def fetched_at(self, date_str: str) -> Optional[float]:
+        """保存済みのスナップショットの取得時刻（なければNone）"""
+        row = self._connection().execute(
+            "SELECT fetched_at FROM result_snapshots WHERE date = ?", (date_str,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def load(self, date_str: str) -> Optional[Snapshot]:
+        """保存済みのスナップショット"""
+        row = self._connection().execute(
+            "SELECT rows, fetched_at, seconds, max_details FROM result_snapshots WHERE date = ?", (date_str,)
+        ).fetchone()
+        if row is None:
+            return None
+        rows, fetched_at, seconds, max_details = row
+        return make_snapshot(date_str, json.loads(zlib.decompress(rows)), seconds, max_details, fetched_at)
+
+    def save(self, snapshot: Snapshot):
+        """スナップショットを保存（同じ日付のより新しいものがあれば保存しない）"""
+        rows = zlib.compress(json.dumps(snapshot.tournaments, ensure_ascii=False, default=dict).encode("utf-8"))
+        self._connection().execute(
+            "INSERT INTO result_snapshots (date, rows, fetched_at, seconds, max_details) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(date) DO UPDATE SET rows = excluded.rows, fetched_at = excluded.fetched_at, "
+            "seconds = excluded.seconds, max_details = excluded.max_details "
+            "WHERE excluded.fetched_at >= result_snapshots.fetched_at",
+            (snapshot.date, rows, snapshot.fetched_at, snapshot.seconds, snapshot.max_details)
+        )
+
+    def prune(self, before: str):
+        """指定日付より前のスナップショットを削除"""
+        self._connection().execute("DELETE FROM result_snapshots WHERE date < ?", (before,))
+
+
+class ResultStore:
+    """
+    日付 → スナップショット
+    Args:
+        ttl: スナップショットを再利用する最大秒数
+        crawl: 全ページ取得に使う関数（crawl_date と同じ引数）
+        refresh: 差分更新に使う関数（refresh_incremental と同じ引数）
+        persist: スナップショットの保存先（Noneの場合はこのプロセス内だけで共有）
+        history: 取得のたびにエントリー数を追記する保存先（Noneの場合は記録しない）
+    """
+
+    def __init__(self, ttl: int = DEFAULT_TTL, crawl: Callable = crawl_date,
+                 refresh: Callable = refresh_incremental, persist: Optional[SnapshotStore] = None,
+                 history: Optional[HistoryStore] = None):
+        self.ttl = ttl
+        self._crawl = crawl
+        self._refresh = refresh
+        self.persist = persist
+        self.history = history
+        self._lock = threading.Lock()
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._flights: Dict[str, _Flight] = {}
+        self._stats = {'hits': 0, 'crawls': 0, 'refreshes': 0, 'coalesced': 0}
+
+    def get(self, date_str: str) -> Optional[Snapshot]:
+        """保存済みのスナップショット（古くても返す。なければNone）"""
+        with self._lock:
+            snapshot = self._snapshots.get(date_str)
+        if self.persist is not None:
+            # 他のプロセスがより新しい結果を保存していれば読み込む
+            stored_at = self.persist.fetched_at(date_str)
+            if stored_at is not None and (snapshot is None or stored_at > snapshot.fetched_at):
+                loaded = self.persist.load(date_str)
+                if loaded is not None:
+                    self._remember(loaded)
+                    snapshot = loaded
+        return snapshot
+
+    def _remember(self, snapshot: Snapshot) -> bool:
+        """メモリ上のスナップショットを置き換える（より新しい場合のみ）"""
+        with self._lock:
+            current = self._snapshots.get(snapshot.date)
+            if current is None or current.fetched_at <= snapshot.fetched_at:
+                self._snapshots[snapshot.date] = snapshot
+                return True
+            return False
+
+    def put(self, snapshot: Snapshot):
+        """スナップショットを保存（同じ日付の古いものは置き換える）"""
+        if self._remember(snapshot) and self.persist is not None:
+            self.persist.save(snapshot)
+
+    def prune(self, before: str):
+        """指定日付（'YYYY/MM/DD'）より前のスナップショットを削除"""
+        with self._lock:
+            for date_str in [d for d in self._snapshots if d < before]:
+                del self._snapshots[date_str]
+        if self.persist is not None:
+            self.persist.prune(before)
+
+    def in_flight(self, date_str: str) -> bool:
+        """指定日付の取得が実行中か"""
+        with self._lock:
+            return date_str in self._flights
+
+    def get_or_fetch(self, date_str: str, max_details: int = 0, max_age: float = None,
+                     on_page: Callable = None) -> Snapshot:
+        """
+        新しいスナップショットがあればそれを返し、なければ全ページを取得する
+        同じ日付の取得が実行中ならその結果を待つ（詳細取得数が異なっても相乗りする）
+        Args:
+            date_str: 'YYYY/MM/DD'形式の日付文字列
+            max_details: 1ページあたりの詳細取得数
+            max_age: これより古いスナップショットは使わない（秒、省略時は ttl）
+            on_page: 一覧ページごとの進捗コールバック（実際に取得するスレッドでのみ呼ばれる）
+        """
+        max_age = self.ttl if max_age is None else max_age
+        snapshot = self.get(date_str)
+        if snapshot is not None and snapshot.age <= max_age and snapshot.max_details >= max_details:
+            with self._lock:
+                self._stats['hits'] += 1
+            return snapshot
+
+        def work():
+            started = time.perf_counter()
+            tournaments = self._crawl(date_str, max_details_per_page=max_details, on_page=on_page)
+            return make_snapshot(date_str, tournaments, time.perf_counter() - started, max_details), None
+
+        return self._single_flight(date_str, 'crawls', work)[0]
+
+    def refresh(self, date_str: str, max_details: int = 0) -> Tuple[Snapshot, Optional[Dict]]:
+        """
+        保存済みのスナップショットを基準に差分更新した新しいスナップショットを作る
+        変更のない行は前のスナップショットと共有する。スナップショットがなければ全ページを取得する
+        Returns:
+            (snapshot, report): report は差分の件数（全ページ取得した場合・相乗りした取得が全件取得の場合はNone）
+        """
+        def work():
+            base = self.get(date_str)
+            if base is None:
+                started = time.perf_counter()
+                tournaments = self._crawl(date_str, max_details_per_page=max_details)
+                return make_snapshot(date_str, tournaments, time.perf_counter() - started, max_details), None
+            diff, report = self._refresh(list(base.tournaments), date_str, max_details_per_page=max_details)
+            rows = merge_diff(base.tournaments, diff)
+            return make_snapshot(date_str, rows, report['seconds'], max(base.max_details, max_details)), report
+
+        return self._single_flight(date_str, 'refreshes', work)
+
+    def _single_flight(self, date_str: str, counter: str, work: Callable) -> Tuple[Snapshot, Optional[Dict]]:
+        """同じ日付の取得を1つにまとめて実行する"""
+        with self._lock:
+            flight = self._flights.get(date_str)
+            leader = flight is None
+            if leader:
+                flight = self._flights[date_str] = _Flight()
+                self._stats[counter] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.snapshot, flight.report
+
+        try:
+            flight.snapshot, flight.report = work()
+            self.put(flight.snapshot)
+            self._record_history(flight.snapshot)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[date_str]
+            flight.done.set()
+        return flight.snapshot, flight.report
+
+    def _record_history(self, snapshot: Snapshot):
+        """取得したエントリー数を推移の保存先に追記（失敗しても取得結果は返す）"""
+        if self.history is None:
+            return
+        try:
+            self.history.record(snapshot.date, snapshot.tournaments, snapshot.fetched_at)
+        except Exception as e:
+            logger.warning("エントリー数の推移の保存に失敗: %s - %s", snapshot.date, e)
+
+    def dates(self) -> List[str]:
+        """保存済みの日付"""
+        with self._lock:
+            return sorted(self._snapshots)
+
+    def stats(self) -> Dict:
+        """再利用・取得・相乗りの回数"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['dates'] = len(self._snapshots)
+        return stats
+
+
+def get_shared_result_store() -> ResultStore:
+    """プロセス全体で共有する保存先を返す（初回呼び出し時に作成）"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = ResultStore(persist=SnapshotStore(), history=get_shared_history_store())
+        return _shared_store
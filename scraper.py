@@ -1,30 +1,95 @@
 import requests
-from bs4 import BeautifulSoup
 import re
+import json
 from datetime import datetime
 import time
-from typing import List, Dict
-import random
-import streamlit as st
+import copy
+from typing import AsyncIterator, Iterator, List, Dict, NamedTuple, Optional, Union
+from http_session import get_shared_session, take_connect_seconds
+from rate_limiter import RateLimiter, get_shared_limiter, THROTTLE_STATUSES
+from parsers import get_backend
+from guarantee import extract_title_guarantee, extract_detail_guarantee
+from detail_cache import DetailCache, get_shared_detail_cache
+from models import Tournament
+from http_cache import ValidatorStore, get_shared_validator_store, body_hash, list_page_key, detail_page_key
+from metrics import Metrics, get_shared_metrics
+from parsed_cache import ParsedPageCache, get_shared_parsed_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 既定の対象地域
+DEFAULT_LOCATION = "東京都"
+# 解析処理の版（一覧・詳細ページから取り出す値が変わる変更をしたら上げる。解析結果のキャッシュを無効にする）
+PARSER_VERSION = "1"
+
+# 429/503 を受けたときの再試行回数
+MAX_RETRIES = 3
+
+
+class PageEvent(NamedTuple):
+    """iter_tournaments で1ページ分のトーナメントを返し終えたことを表すイベント"""
+    page: int           # ページ番号（0-based）
+    total_pages: int    # 総ページ数
+    count: int          # このページのトーナメント数
+    failed: bool = False  # 取得に失敗したか
+
+
+class RawPage(NamedTuple):
+    """条件付きGETの結果（parsed があれば保存済みの解析結果をそのまま使える）"""
+    key: str                        # 保存先のキー
+    text: Optional[str]             # 本文（解析が必要な場合のみ）
+    body: Optional[bytes]
+    digest: Optional[str]           # 本文のハッシュ
+    etag: Optional[str]
+    last_modified: Optional[str]
+    parsed: Optional[Dict] = None   # 保存済みの解析結果（304 または本文が同じ場合）
+    namespace: Optional[str] = None  # 解析結果のキャッシュの名前空間
+
 
 class PokerfansScraper:
-    def __init__(self, target_date: str = None):
+    def __init__(self, target_date: str = None, session: requests.Session = None,
+                 base_url: str = "https://pokerfans.jp/", rate_limiter: RateLimiter = None,
+                 parser: str = None, detail_cache: DetailCache = None,
+                 validators: ValidatorStore = None, metrics: Metrics = None,
+                 location: str = DEFAULT_LOCATION, prize: str = "", club_id: str = "",
+                 parsed_cache: ParsedPageCache = None):
         """
         Args:
             target_date (str, optional): 'YYYY/MM/DD'形式の日付文字列。
                                        Noneの場合は現在の日付を使用。
+            session (requests.Session, optional): 使用するHTTPセッション。
+                                       Noneの場合はプロセス共有の接続プールを使用。
+            base_url (str, optional): 取得先のURL（テスト用のスタブサーバなど）
+            rate_limiter (RateLimiter, optional): リクエスト間隔の制御。
+                                       Noneの場合はプロセス共有のリミッタを使用。
+            parser (str, optional): 解析バックエンド名（'selectolax' / 'lxml' / 'html.parser'）。
+                                       Noneの場合はインストール済みの最速のものを使用。
+            detail_cache (DetailCache, optional): 詳細ページの永続キャッシュ。
+                                       Noneの場合はプロセス共有のキャッシュを使用。
+            validators (ValidatorStore, optional): 条件付きGET用の検証子と解析結果の保存先。
+                                       Noneの場合はプロセス共有の保存先を使用。
+            metrics (Metrics, optional): 取得の段階ごとの所要時間の記録先。
+                                       Noneの場合はプロセス共有のメトリクスを使用。
+            location (str, optional): 都道府県（'東京都' など）。空文字の場合はすべての地域。
+                                       会場がこの地域でない行は解析の途中で読み飛ばす。
+            prize (str, optional): 賞品の絞り込み（サイトの検索条件をそのまま渡す）
+            club_id (str, optional): 店舗の絞り込み（サイトの検索条件をそのまま渡す）
+            parsed_cache (ParsedPageCache, optional): 本文のハッシュをキーにした解析結果のキャッシュ。
+                                       Noneの場合は validators と同じファイル（validators も省略時は
+                                       プロセス共有のキャッシュ）を使用。
         """
         # target_dateが指定されていない場合は現在の日付を使用
         date_str = target_date or datetime.now().strftime('%Y/%m/%d')
         
         # ベースURLとクエリパラメータを分離
-        self.base_url = "https://pokerfans.jp/"
+        self.base_url = base_url
         self.params = {
             "startDate": date_str,
             "weekly": "false",
-            "prize": "",
-            "location": "東京都",
-            "clubId": "",
+            "prize": prize,
+            "location": location,
+            "clubId": club_id,
             "withEndTime": "false",
             "applyEndTime": "",
             "size": "50"
@@ -33,13 +98,165 @@ class PokerfansScraper:
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
-        # キャッシュ: 詳細ページの内容を保存
-        self._detail_cache = {}
+        # 接続プール付きセッション（インスタンス間で共有）
+        self.session = session if session is not None else get_shared_session()
+        # リクエスト間隔の制御（インスタンス間で共有）
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_shared_limiter()
+        # HTML解析バックエンド（selectolax などの読み込みは最初の解析まで遅らせる）
+        self._parser_name = parser
+        self._parser = None
+        # キャッシュ: 詳細ページの内容を保存（再起動・他プロセスとも共有）
+        self.detail_cache = detail_cache if detail_cache is not None else get_shared_detail_cache()
+        # 条件付きGET: ページごとの検証子と解析結果
+        self.validators = validators if validators is not None else get_shared_validator_store()
+        # 同じ本文の解析結果（URL・日付が違っても再利用する）
+        if parsed_cache is None:
+            parsed_cache = ParsedPageCache(validators.path) if validators is not None else get_shared_parsed_cache()
+        self.parsed_cache = parsed_cache
+        # 段階ごとの所要時間（接続・TTFB・受信・解析・行の抽出・保証額の抽出・待機）
+        self.metrics = metrics if metrics is not None else get_shared_metrics()
+
+    @property
+    def parser(self):
+        """HTML解析バックエンド（初回参照時に作成）"""
+        if self._parser is None:
+            self._parser = get_backend(self._parser_name)
+        return self._parser
+
+    @parser.setter
+    def parser(self, backend):
+        self._parser = backend
+
+    @property
+    def parser_name(self) -> Optional[str]:
+        """指定された解析バックエンドの名前（別プロセスで同じバックエンドを作る場合に使う）"""
+        return self._parser_name
+
+    def _request(self, url: str, params: Dict = None, throttle: bool = True,
+                 headers: Dict = None) -> requests.Response:
+        """
+        レート制限に従ってGETリクエストを送信（429/503は待機して再試行）
+        Args:
+            url: 取得するURL
+            params: クエリパラメータ
+            throttle: Falseの場合、初回はトークン取得を呼び出し側で済ませたものとみなす
+            headers: 追加のリクエストヘッダ
+        Raises:
+            requests.RequestException: 取得に失敗した場合
+        """
+        metrics = self.metrics
+        for attempt in range(MAX_RETRIES + 1):
+            if throttle or attempt > 0:
+                metrics.observe('sleep', self.rate_limiter.acquire())
+            started = time.perf_counter()
+            take_connect_seconds()
+            try:
+                # 応答ヘッダまで（TTFB）と本文の受信を分けて計測する
+                response = self.session.get(url, params=params, headers={**self.headers, **(headers or {})},
+                                            timeout=30, stream=True)
+                headers_at = time.perf_counter()
+                response.content
+            finally:
+                self.rate_limiter.record_fetch(time.perf_counter() - started)
+            connect = take_connect_seconds()
+            if connect:
+                metrics.observe('connect', connect)
+            metrics.observe('ttfb', headers_at - started - connect)
+            metrics.observe('download', time.perf_counter() - headers_at)
+            record = metrics.current()
+            if record is not None:
+                record['status'] = response.status_code
+            self.rate_limiter.on_response(response.status_code, response.headers.get('Retry-After'))
+            if response.status_code not in THROTTLE_STATUSES:
+                break
+        response.raise_for_status()  # エラーチェック
+        return response
 
-    def _random_delay(self, min_seconds=3, max_seconds=7):
-        """ランダムな時間待機してリクエスト制限を回避"""
-        delay = random.uniform(min_seconds, max_seconds)
-        time.sleep(delay)
+    def _fetch_raw(self, key: str, url: str, params: Dict = None, throttle: bool = True,
+                   namespace: str = None) -> RawPage:
+        """
+        条件付きGETで取得する（解析済みの内容なら保存済みの解析結果を、そうでなければ解析前の本文を返す）
+        Args:
+            key: 保存先のキー
+            url: 取得するURL
+            params: クエリパラメータ
+            throttle: Falseの場合、初回はトークン取得を呼び出し側で済ませたものとみなす
+            namespace: 解析結果のキャッシュの名前空間（解析結果に影響する条件。_list_namespace など）
+        """
+        entry = self.validators.get(key)
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self._request(url, params=params, throttle=throttle, headers=headers)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+
+        # 304: 本文を受信せずに前回の解析結果を使う
+        if response.status_code == 304 and entry:
+            self.validators.touch(key, etag, last_modified)
+            self.validators.record('not_modified', entry)
+            return RawPage(key, None, None, None, etag, last_modified, json.loads(entry['parsed']), namespace)
+
+        # 検証子がなくても、同じ本文を解析したことがあれば解析しない（URL・日付が違っても同じ結果になる）
+        body = response.content
+        digest = body_hash(body)
+        same_body = entry is not None and entry['body_hash'] == digest
+        parsed = self.parsed_cache.get(namespace, digest) if namespace else None
+        if parsed is None and same_body:
+            # 解析結果のキャッシュから削除されていても、このページの前回の結果は使える
+            parsed = json.loads(entry['parsed'])
+            if namespace:
+                self.parsed_cache.put(namespace, digest, parsed, entry['parse_seconds'])
+        if parsed is None:
+            return RawPage(key, response.text, body, digest, etag, last_modified, None, namespace)
+
+        if same_body:
+            self.validators.touch(key, etag, last_modified)
+        else:
+            # このページとしては初めての本文なので、次回の条件付きGETのために保存する
+            self.validators.put(key, body, parsed, 0.0, etag=etag, last_modified=last_modified, digest=digest)
+        self.validators.record('unchanged', entry if same_body else None)
+        return RawPage(key, None, None, digest, etag, last_modified, parsed, namespace)
+
+    def _store_parsed(self, raw: RawPage, parsed, parse_seconds: float):
+        """_fetch_raw で取得した本文の解析結果を保存する"""
+        self.validators.put(raw.key, raw.body, parsed, parse_seconds, etag=raw.etag,
+                            last_modified=raw.last_modified, digest=raw.digest)
+        if raw.namespace:
+            self.parsed_cache.put(raw.namespace, raw.digest, parsed, parse_seconds)
+        self.validators.record('changed')
+
+    def _list_namespace(self) -> str:
+        """一覧ページの解析結果のキャッシュの名前空間（行の detail_url と地域の絞り込みが解析結果に影響する）"""
+        return f"list:{PARSER_VERSION}:{self.base_url}:{self.location}"
+
+    @staticmethod
+    def _detail_namespace() -> str:
+        return f"detail:{PARSER_VERSION}"
+
+    def _fetch_parsed(self, key: str, url: str, parse, params: Dict = None, throttle: bool = True,
+                      namespace: str = None):
+        """
+        条件付きGETで取得し、変更がなければ前回の解析結果を返す
+        Args:
+            key: 保存先のキー
+            url: 取得するURL
+            parse: 本文（str）を解析して JSON に変換できる値を返す関数
+            params: クエリパラメータ
+            throttle: Falseの場合、初回はトークン取得を呼び出し側で済ませたものとみなす
+            namespace: 解析結果のキャッシュの名前空間
+        """
+        raw = self._fetch_raw(key, url, params=params, throttle=throttle, namespace=namespace)
+        if raw.parsed is not None:
+            return raw.parsed
+
+        started = time.perf_counter()
+        parsed = parse(raw.text)
+        self._store_parsed(raw, parsed, time.perf_counter() - started)
+        return parsed
 
     def _extract_number(self, text: str) -> int:
         """文字列から数値のみを抽出"""
@@ -56,32 +273,7 @@ class PokerfansScraper:
         Returns:
             int: 保証額（円単位）。見つからない場合は0
         """
-        if not text:
-            return 0
-        
-        # 全角数字を半角に変換
-        text = text.translate(str.maketrans('０１２３４５６７８９', '0123456789'))
-        
-        # 保証額のパターン
-        patterns = [
-            # "万"を含むパターン（例：84万相当、40万コイン、7万円保証）
-            (r'(?:総額)?(\d+)万(?:円|coin|コイン)?(?:相当|保証)?', lambda x: int(x) * 10000),
-            
-            # 数値+通貨単位のパターン（例：50,000coin、100,000コイン）
-            (r'(?:Web|ウェブ)?(?:最低保証)?[^\d]*(\d+[,\d]*)(?:円|coin|コイン)(?:保証)?',
-             lambda x: int(x.replace(',', ''))),
-        ]
-        
-        # 各パターンで検索
-        for pattern, converter in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)  # 大文字小文字を区別しない
-            if match:
-                try:
-                    return converter(match.group(1))
-                except (ValueError, IndexError):
-                    continue
-        
-        return 0
+        return extract_title_guarantee(text)
 
     def _extract_guarantee_from_detail(self, text: str) -> int:
         """
@@ -91,51 +283,73 @@ class PokerfansScraper:
         Returns:
             int: 保証額（円単位）。見つからない場合は0
         """
-        if not text:
-            return 0
-        
-        # 全角数字を半角に変換
-        text = text.translate(str.maketrans('０１２３４５６７８９', '0123456789'))
-        
-        # 詳細ページ用の厳密なパターン
-        patterns = [
-            # "保証"という単語が必ず含まれるパターンのみ
-            
-            # ●●万円保証
-            (r'(\d+)万円保証', lambda x: int(x) * 10000),
-            
-            # ●●万保証
-            (r'(\d+)万保証', lambda x: int(x) * 10000),
-            
-            # ●●,●●●円保証
-            (r'(\d+[,\d]*)円保証', lambda x: int(x.replace(',', ''))),
-            
-            # ●●万コイン保証
-            (r'(\d+)万(?:coin|コイン)保証', lambda x: int(x) * 10000),
-            
-            # ●●,●●●コイン保証
-            (r'(\d+[,\d]*)(?:coin|コイン)保証', lambda x: int(x.replace(',', ''))),
-            
-            # 総額●●万保証
-            (r'総額(\d+)万保証', lambda x: int(x) * 10000),
-            
-            # 最低保証●●万
-            (r'最低保証[^\d]*(\d+)万', lambda x: int(x) * 10000),
-            
-            # 最低保証●●,●●●コイン
-            (r'最低保証[^\d]*(\d+[,\d]*)(?:coin|コイン)', lambda x: int(x.replace(',', ''))),
-        ]
-        
-        # 各パターンで検索（改行を含む可能性があるため、re.MULTILINE | re.IGNORECASE を使用）
-        for pattern, converter in patterns:
-            match = re.search(pattern, text, re.MULTILINE | re.IGNORECASE)
-            if match:
-                try:
-                    return converter(match.group(1))
-                except (ValueError, IndexError):
-                    continue
-        
-        return 0
+        return extract_detail_guarantee(text)
+
+    def for_date(self, date_str: str) -> "PokerfansScraper":
+        """同じ接続・レート制限・キャッシュを使い、対象日付だけが異なるスクレイパーを返す"""
+        return self.for_query(date_str=date_str)
+
+    def for_query(self, date_str: str = None, location: str = None, prize: str = None,
+                  club_id: str = None) -> "PokerfansScraper":
+        """
+        同じ接続・レート制限・キャッシュを使い、検索条件だけが異なるスクレイパーを返す
+        Noneの条件はこのスクレイパーの設定を引き継ぐ
+        """
+        scraper = copy.copy(self)
+        scraper.params = dict(self.params)
+        for key, value in (('startDate', date_str), ('location', location), ('prize', prize), ('clubId', club_id)):
+            if value is not None:
+                scraper.params[key] = value
+        return scraper
+
+    @property
+    def location(self) -> str:
+        """対象の都道府県（空文字はすべての地域）"""
+        return self.params.get('location', '')
+
+    def iter_tournaments(self, date_str: str = None,
+                         known: Dict[str, Dict] = None) -> Iterator[Union[Tournament, PageEvent]]:
+        """
+        一覧ページを順に取得し、解析できたトーナメントから1件ずつ返すジェネレータ
+        各ページの行を返し終えるたびに PageEvent を返す（取得に失敗したページは failed=True）
+        Args:
+            date_str: 'YYYY/MM/DD'形式の日付文字列。Noneの場合はこのスクレイパーの対象日付
+            known: 前回取得した行（detail_url → 行）。タイトルが同じ行は保証額を引き継ぐ
+        """
+        scraper = self.for_date(date_str) if date_str else self
+        page, total_pages = 0, 1
+        while page < total_pages:
+            try:
+                tournaments, pagination_info = scraper.fetch_tournament_list(page, known=known)
+            except requests.RequestException as e:
+                logger.warning("一覧ページの取得に失敗: page=%s - %s", page, e)
+                yield PageEvent(page, total_pages, 0, failed=True)
+                page += 1
+                continue
+            total_pages = max(total_pages, pagination_info.get('total_pages', 1))
+            yield from tournaments
+            yield PageEvent(page, total_pages, len(tournaments))
+            page += 1
+
+    async def aiter_tournaments(self, date_str: str = None, concurrency: int = None,
+                                max_details_per_page: int = 0) -> AsyncIterator[Union[Tournament, PageEvent]]:
+        """
+        iter_tournaments の非同期版。複数ページを並列に取得し、取得できたページから順に返す
+        （ページ番号順とは限らない。取得に失敗したページのイベントは返さない）
+        Args:
+            date_str: 'YYYY/MM/DD'形式の日付文字列。Noneの場合はこのスクレイパーの対象日付
+            concurrency: 同時リクエスト数の上限（省略時は async_crawler の既定値）
+            max_details_per_page: 1ページあたりの詳細取得数（0=取得しない）
+        """
+        from async_crawler import DEFAULT_CONCURRENCY, AsyncCrawler
+
+        crawler = AsyncCrawler(self.for_date(date_str) if date_str else self,
+                               concurrency=concurrency or DEFAULT_CONCURRENCY,
+                               max_details_per_page=max_details_per_page)
+        async for page, total_pages, tournaments in crawler.iter_pages():
+            for tournament in tournaments:
+                yield tournament
+            yield PageEvent(page, total_pages, len(tournaments))
 
     def get_tournament_list(self, page: int = 0, max_details_per_page: int = 5) -> tuple[List[Dict], Dict]:
         """
@@ -144,53 +358,142 @@ class PokerfansScraper:
             page: ページ番号（0-based）
             max_details_per_page: 1ページあたり取得する詳細ページの最大数（0=すべて取得しない）
         """
-        tournaments = []
-        
-        # ページ番号をパラメータに設定
-        params = self.params.copy()
-        params["page"] = str(page)
-        
-        # リクエスト実行（より長い待機時間）
+        # リクエスト実行
         try:
-            response = requests.get(
-                self.base_url,
-                params=params,
-                headers=self.headers,
-                timeout=30
-            )
-            response.raise_for_status()  # エラーチェック
+            return self.fetch_tournament_list(page)
         except requests.RequestException as e:
-            print(f"一覧ページの取得に失敗: {e}")
+            logger.warning("一覧ページの取得に失敗: %s", e)
             return [], {"current_page": page, "total_pages": 1}
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
+
+    def fetch_tournament_list(self, page: int = 0, throttle: bool = True,
+                              known: Dict[str, Dict] = None) -> tuple[List[Dict], Dict]:
+        """
+        一覧ページを条件付きGETで取得して解析（変更がなければ前回の解析結果を使う）
+        Args:
+            page: ページ番号（0-based）
+            throttle: Falseの場合、レート制限の待機を呼び出し側で済ませたものとみなす
+            known: 前回取得した行（detail_url → 行）。タイトルが同じ行は保証額を引き継ぐ
+        Raises:
+            requests.RequestException: 取得に失敗した場合
+        """
+        params = self.params.copy()
+        params["page"] = str(page)
+
+        def parse(html):
+            # 前回と同じ行は保証額を抽出せずに None のまま保存する（本文だけで決まる値以外は保存しない）。
+            # 前回の値の引き継ぎと、引き継げなかった行の抽出は _list_result で行う
+            tournaments, pagination_info = self.parse_tournament_list(html, known=known)
+            return {'tournaments': tournaments, 'pagination': pagination_info}
+
+        with self.metrics.span('list', f"{params['startDate']} page={page}"):
+            parsed = self._fetch_parsed(list_page_key(self.base_url, params), self.base_url, parse,
+                                        params=params, throttle=throttle, namespace=self._list_namespace())
+        return self._list_result(parsed, known)
+
+    def fetch_list_raw(self, page: int = 0, throttle: bool = True) -> RawPage:
+        """
+        一覧ページを条件付きGETで取得するだけで解析しない（解析は別のプロセスで行う場合）
+        Raises:
+            requests.RequestException: 取得に失敗した場合
+        """
+        params = self.params.copy()
+        params["page"] = str(page)
+        with self.metrics.span('list', f"{params['startDate']} page={page}"):
+            return self._fetch_raw(list_page_key(self.base_url, params), self.base_url, params=params,
+                                   throttle=throttle, namespace=self._list_namespace())
+
+    def complete_list(self, raw: RawPage, parsed: Dict = None, parse_seconds: float = 0.0,
+                      known: Dict[str, Dict] = None) -> tuple[List[Dict], Dict]:
+        """
+        fetch_list_raw の結果と、別に解析した結果（parse_list_html の戻り値）から一覧を返す
+        解析した場合は保存して、次回の条件付きGETで再利用する
+        """
+        if raw.parsed is not None:
+            parsed = raw.parsed
+        else:
+            self._store_parsed(raw, parsed, parse_seconds)
+        return self._list_result(parsed, known)
+
+    def _list_result(self, parsed: Dict, known: Dict[str, Dict] = None) -> tuple[List[Dict], Dict]:
+        # 保存済みの解析結果（JSON）から復元した行は dict なので Tournament に戻す
+        tournaments = [Tournament.from_dict(t) for t in parsed['tournaments']]
+        extract_seconds = 0.0
+        for tournament in tournaments:
+            # 保存済みの解析結果を使った場合も、前回の行（詳細ページ由来の保証額を含む）を引き継ぐ
+            previous = known.get(tournament['detail_url']) if known else None
+            if previous is not None and previous.get('title') == tournament['title'] and 'guarantee' in previous:
+                tournament['guarantee'] = previous['guarantee']
+            elif tournament['guarantee'] is None:
+                # 解析時に抽出を省略した行で、今回は引き継げないもの
+                started = time.perf_counter()
+                tournament['guarantee'] = self._extract_guarantee(tournament['title'])
+                extract_seconds += time.perf_counter() - started
+        if extract_seconds:
+            self.metrics.observe('guarantee', extract_seconds)
+        return tournaments, parsed['pagination']
+
+    def fetch_list_html(self, page: int = 0, throttle: bool = True) -> str:
+        """
+        一覧ページのHTMLを取得
+        Args:
+            page: ページ番号（0-based）
+            throttle: Falseの場合、レート制限の待機を呼び出し側で済ませたものとみなす
+        Raises:
+            requests.RequestException: 取得に失敗した場合
+        """
+        # ページ番号をパラメータに設定
+        params = self.params.copy()
+        params["page"] = str(page)
+
+        with self.metrics.span('list', f"{params['startDate']} page={page}"):
+            return self._request(self.base_url, params=params, throttle=throttle).text
+
+    def parse_tournament_list(self, html: str, known: Dict[str, Dict] = None) -> tuple[List[Dict], Dict]:
+        """
+        一覧ページのHTMLからトーナメント情報とページネーション情報を抽出
+        Args:
+            html: 一覧ページのHTML
+            known: 前回取得した行（detail_url → 行）。タイトルが同じ行は保証額の抽出を省略して None にする
+                   （fetch_tournament_list / complete_list が前回の値を引き継ぐ）
+        """
+        tournaments = []
+        p = self.parser
+        metrics = self.metrics
+        location = self.location
+        started = time.perf_counter()
+        soup = p.parse(html)
+
         # ページネーション情報を取得
         pagination_info = self._get_pagination_info(soup)
-        
+        events = p.select(soup, '.profile-event')
+        rows_started = time.perf_counter()
+        metrics.observe('parse', rows_started - started)
+
         # トーナメント情報の取得
-        details_count = 0
-        
-        for event in soup.select('.profile-event'):
+        guarantee_seconds = 0.0
+
+        for event in events:
             try:
                 # タイトルと詳細ページURL
-                title_link = event.select_one('h5 > a.color-green.tooltips')
+                title_link = p.select_one(event, 'h5 > a.color-green.tooltips')
                 if not title_link:
                     continue
                     
-                title = title_link.text.strip()
-                detail_url = self.base_url.rstrip('/') + title_link['href']
+                title = p.text(title_link).strip()
+                detail_url = self.base_url.rstrip('/') + p.attr(title_link, 'href')
                 
                 # リングゲームは除外
                 if any(keyword in title for keyword in ['リング', 'コインリング', 'RING', 'Ring', 'ring']):
                     continue
                 
-                # 施設名
-                venue_spans = event.select('div.oneline span')
-                venue = venue_spans[1].text.strip() if len(venue_spans) > 1 else ''            
+                # 施設名（対象の地域でなければ、時刻・参加費などを解析する前に読み飛ばす）
+                venue_spans = p.select(event, 'div.oneline span')
+                venue = p.text(venue_spans[1]).strip() if len(venue_spans) > 1 else ''
+                if location and location not in venue:
+                    continue
+
                 # 開始・締切時刻の抽出
-                time_text = event.select_one('strong.text-danger').text.strip()
-                print(f"🕒 time_text raw: '{time_text}'")  # デバッグ用
+                time_text = p.text(p.select_one(event, 'strong.text-danger')).strip()
 
                 # 開始時間の抽出（最初に出てくる時間）
                 start_time_match = re.search(r'(\d{2}:\d{2})', time_text)
@@ -203,8 +506,8 @@ class PokerfansScraper:
                 
                 # エントリー費
                 entry_fee_text = ''
-                for span in event.select('div.col-xs-6 span'):
-                    text = span.text.strip()
+                for span in p.select(event, 'div.col-xs-6 span'):
+                    text = p.text(span).strip()
                     if re.search(r'\(?E\)?|エントリー|参加費|¥|円|￥', text):
                         entry_fee_text = text
                         break
@@ -212,7 +515,7 @@ class PokerfansScraper:
                 
                 # エントリー人数／定員の処理を修正
                 try:
-                    entry_count_text = event.select_one('i.icon-users + span').text.strip()
+                    entry_count_text = p.text(p.select_one(event, 'i.icon-users + span')).strip()
                     # "0 /" や "0 / " のようなケースに対応
                     parts = [p.strip() for p in entry_count_text.split('/')]
                     current_entries = int(parts[0]) if parts[0].strip() else 0
@@ -220,84 +523,115 @@ class PokerfansScraper:
                 except (ValueError, AttributeError, IndexError):
                     current_entries = 0
                     max_entries = 0
-                    print(f"Warning: Could not parse entry count from text: {entry_count_text}")
-                # venue 抽出
-                venue_spans = event.select('div.oneline span')
-                venue = venue_spans[1].text.strip() if len(venue_spans) > 1 else ''
+                    logger.warning("エントリー数を解析できません: %s", entry_count_text)
 
-                # ✅ フィルタ：東京都以外はスキップ
-                if "東京都" not in venue:
-                    continue
-                
-                tournament_info = {
-                    'title': title,
-                    'venue': venue,
-                    'start_time': start_time,
-                    'end_time': end_time,
-                    'entry_fee': entry_fee,
-                    'current_entries': current_entries,
-                    'max_entries': max_entries,
-                    'detail_url': detail_url
-                }
+                tournament_info = Tournament(
+                    title=title,
+                    venue=venue,
+                    start_time=start_time,
+                    end_time=end_time,
+                    entry_fee=entry_fee,
+                    current_entries=current_entries,
+                    max_entries=max_entries,
+                    detail_url=detail_url
+                )
                 
-                # タイトルから保証額を取得
-                guarantee = self._extract_guarantee(title)
+                # タイトルから保証額を取得（前回と同じタイトルなら抽出を省略し、_list_result で引き継ぐ）
+                previous = known.get(detail_url) if known else None
+                if previous is not None and previous.get('title') == title and 'guarantee' in previous:
+                    guarantee = None
+                else:
+                    extract_started = time.perf_counter()
+                    guarantee = self._extract_guarantee(title)
+                    guarantee_seconds += time.perf_counter() - extract_started
                 tournament_info['guarantee'] = guarantee
                 
-                # タイトルから取得できず、詳細取得数が上限未満の場合のみ詳細ページをチェック
-                # if guarantee == 0 and (max_details_per_page == 0 or details_count < max_details_per_page):
-                #     detail_info = self.get_tournament_detail(detail_url)
-                #     tournament_info['guarantee'] = detail_info['guarantee']
-                #     details_count += 1
-                #     self._random_delay()  # 詳細ページアクセス後に待機
+                # タイトルから取得できなかった行は、一覧の解析後に詳細ページで補う（enrichment.py）
                 
                 tournaments.append(tournament_info)
                 
             except Exception as e:
-                print(f"トーナメント情報の取得中にエラー: {e}")
+                logger.warning("トーナメント情報の取得中にエラー: %s", e)
                 continue
-        
-        # 次のリクエストまでより長く待機
-        self._random_delay(5, 10)
-        
+
+        metrics.observe('rows', time.perf_counter() - rows_started - guarantee_seconds)
+        metrics.observe('guarantee', guarantee_seconds)
         return tournaments, pagination_info
 
     def _get_pagination_info(self, soup) -> Dict:
         """ページネーション情報を取得"""
-        pagination = soup.select_one('ul.pagination')
-        if not pagination:
+        p = self.parser
+        pagination = p.select_one(soup, 'ul.pagination')
+        active = p.select_one(pagination, 'li.active a') if pagination else None
+        if active is None:
             return {'current_page': 0, 'total_pages': 1}
         
-        current_page = int(pagination.select_one('li.active a').text) - 1
-        page_numbers = [int(a.text) for a in pagination.select('li a') if a.text.isdigit()]
+        current_page = int(p.text(active)) - 1
+        page_numbers = [int(p.text(a)) for a in p.select(pagination, 'li a') if p.text(a).isdigit()]
         total_pages = max(page_numbers) if page_numbers else 1
         
         return {'current_page': current_page, 'total_pages': total_pages}
 
-    def get_tournament_detail(self, url: str) -> Dict:
+    def cached_detail(self, url: str) -> Optional[Dict]:
+        """キャッシュ済みの詳細情報を返す（なければNone）"""
+        return self.detail_cache.get(url)
+
+    def get_tournament_detail(self, url: str, throttle: bool = True) -> Dict:
         """詳細ページから情報取得（キャッシュ対応）"""
         # キャッシュにあればそれを返す
-        if url in self._detail_cache:
-            return self._detail_cache[url]
-            
+        cached = self.cached_detail(url)
+        if cached is not None:
+            return cached
+        return self.fetch_tournament_detail(url, throttle=throttle)
+
+    def fetch_detail_raw(self, url: str, throttle: bool = True) -> RawPage:
+        """
+        詳細ページを条件付きGETで取得するだけで解析しない（解析は別のプロセスで行う場合）
+        Raises:
+            requests.RequestException: 取得に失敗した場合
+        """
+        with self.metrics.span('detail', url):
+            return self._fetch_raw(detail_page_key(url), url, throttle=throttle, namespace=self._detail_namespace())
+
+    def complete_detail(self, url: str, raw: RawPage, parsed: Dict = None, parse_seconds: float = 0.0) -> Dict:
+        """fetch_detail_raw の結果と、別に解析した結果から詳細情報を返してキャッシュに保存"""
+        if raw.parsed is not None:
+            parsed = raw.parsed
+        else:
+            self._store_parsed(raw, parsed, parse_seconds)
+        self.detail_cache.set(url, parsed)
+        return parsed
+
+    def load_tournament_detail(self, url: str, throttle: bool = True) -> Dict:
+        """
+        詳細ページを取得してキャッシュに保存（キャッシュは参照しない）
+        Raises:
+            requests.RequestException: 取得に失敗した場合
+        """
+        with self.metrics.span('detail', url):
+            result = self._fetch_parsed(detail_page_key(url), url, self.parse_tournament_detail, throttle=throttle,
+                                        namespace=self._detail_namespace())
+
+        # キャッシュに保存
+        self.detail_cache.set(url, result)
+        return result
+
+    def fetch_tournament_detail(self, url: str, throttle: bool = True) -> Dict:
+        """詳細ページを取得してキャッシュに保存（キャッシュは参照しない。失敗時は保証額0）"""
         try:
-            response = requests.get(url, headers=self.headers, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            detail_text = soup.select_one('pre.pre-white').text if soup.select_one('pre.pre-white') else ''
-            
-            # 保証賞金の抽出
-            guarantee = self._extract_guarantee_from_detail(detail_text)
-            
-            result = {'guarantee': guarantee}
-            
-            # キャッシュに保存
-            self._detail_cache[url] = result
-            return result
-            
+            return self.load_tournament_detail(url, throttle=throttle)
         except Exception as e:
-            print(f"詳細ページの取得に失敗: {url} - {e}")
+            logger.warning("詳細ページの取得に失敗: %s - %s", url, e)
             return {'guarantee': 0}
 
+    def parse_tournament_detail(self, html: str) -> Dict:
+        """詳細ページのHTMLから情報を抽出"""
+        with self.metrics.timed('parse'):
+            pre = self.parser.select_one(self.parser.parse(html), 'pre.pre-white')
+            detail_text = self.parser.text(pre) if pre else ''
+
+        # 保証賞金の抽出
+        with self.metrics.timed('guarantee'):
+            guarantee = self._extract_guarantee_from_detail(detail_text)
 
+        return {'guarantee': guarantee}
@@ -0,0 +1,52 @@
+"""
+ローカル SQLite ファイルを使うストアの共通部分
+
+接続はスレッドごとに作成し（sqlite3 の接続はスレッド間で共有できないため）、
+WAL モードにして複数スレッド・複数プロセスからの読み書きを並行できるようにする。
+"""
+import os
+import sqlite3
+import threading
+
+# キャッシュ類を置くディレクトリ（Streamlit サーバとワーカーで共有する）
+DEFAULT_DIR = os.environ.get("POKERODDS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "pokerodds"))
+DEFAULT_DB = "cache.sqlite3"
+
+
+def default_db_path(filename: str = DEFAULT_DB) -> str:
+    """既定のデータベースファイルのパス"""
+    return os.path.join(DEFAULT_DIR, filename)
+
+
+class SQLiteStore:
+    """
+    スレッドごとの接続とスキーマ作成を受け持つ基底クラス
+    Args:
+        path: データベースファイルのパス。Noneの場合は既定のパス
+    """
+
+    # サブクラスで CREATE TABLE / CREATE INDEX 文を定義する
+    SCHEMA = ""
+
+    def __init__(self, path: str = None):
+        self.path = path or default_db_path()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def close(self):
+        """このスレッドの接続を閉じる"""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
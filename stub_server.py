@@ -0,0 +1,265 @@
+"""
+テスト・ベンチマーク用の pokerfans.jp スタブサーバ
+
+一覧ページ（ページネーション付き）と詳細ページをローカルで返す。
+PokerfansScraper(base_url=server.base_url) とすれば本番サイトにアクセスせずに
+取得・解析の動作を確認できる。
+FixturePokerfans は記録済みのHTML（benchmarks/fixtures）をそのまま返す。
+"""
+import hashlib
+import html
+import os
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+
+
+def make_event(page: int, index: int, revision: int = 0) -> Dict:
+    """ページ番号と行番号（と更新回数）から決まるダミーのトーナメント情報を生成"""
+    event_id = page * 100 + index
+    hour = 10 + (index % 14)
+    guarantee = ['{}万保証'.format(5 + index), '', '30,000coin保証', ''][index % 4]
+    return {
+        'id': event_id,
+        'title': f'デイリートーナメント #{event_id} {guarantee}'.strip(),
+        'venue': f'東京都 新宿区 テストポーカー{index % 5}',
+        'time_text': f'{hour:02d}:00〜 〆{hour + 1:02d}:30',
+        'fee_text': f'参加費 ¥{(index % 5 + 1) * 1000:,}',
+        'entries_text': f'{(index + revision) % 30} / 40',
+        'detail_text': f'本トーナメントは{10 + index}万円保証です。' if not guarantee else '',
+    }
+
+
+def render_event(event: Dict) -> str:
+    """一覧ページの .profile-event 1件分のHTMLを生成"""
+    return f"""
+<div class="profile-event">
+  <h5><a class="color-green tooltips" href="/tournaments/{event['id']}">{html.escape(event['title'])}</a></h5>
+  <div class="oneline"><span><i class="icon-pointer"></i></span><span>{html.escape(event['venue'])}</span></div>
+  <strong class="text-danger">{html.escape(event['time_text'])}</strong>
+  <div class="row">
+    <div class="col-xs-6"><span>{html.escape(event['fee_text'])}</span></div>
+    <div class="col-xs-6"><i class="icon-users"></i><span>{html.escape(event['entries_text'])}</span></div>
+  </div>
+</div>"""
+
+
+def render_list_page(events: List[Dict], page: int, total_pages: int) -> str:
+    """一覧ページ全体のHTMLを生成"""
+    items = []
+    for number in range(1, total_pages + 1):
+        active = ' class="active"' if number == page + 1 else ''
+        items.append(f'<li{active}><a href="/?page={number - 1}">{number}</a></li>')
+    pagination = f'<ul class="pagination">{"".join(items)}<li><a href="#">»</a></li></ul>' if total_pages > 1 else ''
+    body = "".join(render_event(e) for e in events)
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Pokerfans</title></head>
+<body>
+<nav class="navbar"><ul class="nav"><li><a href="/">トップ</a></li></ul></nav>
+<div class="container">{body}</div>
+{pagination}
+<footer>pokerfans stub</footer>
+</body></html>"""
+
+
+def render_detail_page(text: str) -> str:
+    """詳細ページのHTMLを生成"""
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head>
+<body><div class="container"><pre class="pre-white">{html.escape(text)}</pre></div></body></html>"""
+
+
+class StubPokerfans:
+    """
+    スタブサーバ本体
+    Args:
+        total_pages: 一覧ページの総ページ数
+        events_per_page: 1ページあたりのトーナメント数
+        latency: 1リクエストごとに加える応答遅延（秒）
+        validators: 検証子（ETag / Last-Modified）を返して条件付きGETに 304 で応じるか
+        locations: 都道府県ごとに別のトーナメントを返す場合の都道府県の一覧。
+                   location を指定した一覧ページは、その都道府県の行に5行ごとに隣の都道府県の行が混ざる。
+                   location を指定しない一覧ページはすべての都道府県の行を返す
+    """
+
+    # 都道府県ごとのトーナメントIDの間隔
+    LOCATION_ID_STEP = 10000
+
+    def __init__(self, total_pages: int = 3, events_per_page: int = 20, latency: float = 0.0,
+                 validators: bool = False, locations: Sequence[str] = None):
+        self.total_pages = total_pages
+        self.events_per_page = events_per_page
+        self.latency = latency
+        self.validators = validators
+        self.locations = tuple(locations or ())
+        # 値を増やすとエントリー数が変わる（一覧ページの内容が更新される）
+        self.revision = 0
+        self.requests: List[str] = []
+        # requests と同じ順の、リクエストごとのヘッダ
+        self.request_headers: List[Dict[str, str]] = []
+        self._throttled: List = []
+        # パス → 返し続けるエラーのステータス
+        self._failing: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/"
+
+    def events(self, page: int, location: str = None) -> List[Dict]:
+        """指定ページに並ぶトーナメント（location は locations を指定した場合のみ使う）"""
+        if not self.locations:
+            return [make_event(page, i, self.revision) for i in range(self.events_per_page)]
+        if not location:
+            return [event for number in range(len(self.locations)) for event in self._location_events(page, number)]
+        number = self.locations.index(location)
+        events = self._location_events(page, number)
+        neighbour = self._location_events(page, (number + 1) % len(self.locations))
+        return [neighbour[i] if i % 5 == 4 else event for i, event in enumerate(events)]
+
+    def _location_events(self, page: int, number: int) -> List[Dict]:
+        location = self.locations[number]
+        events = []
+        for i in range(self.events_per_page):
+            event = make_event(page, i, self.revision)
+            event['id'] += number * self.LOCATION_ID_STEP
+            event['venue'] = event['venue'].replace('東京都', location, 1)
+            events.append(event)
+        return events
+
+    def list_html(self, page: int, location: str = None) -> str:
+        return render_list_page(self.events(page, location), page, self.total_pages)
+
+    def detail_html(self, event_id: int) -> str:
+        event_id %= self.LOCATION_ID_STEP
+        event = make_event(event_id // 100, event_id % 100)
+        return render_detail_page(event['detail_text'])
+
+    def throttle(self, count: int = 1, status: int = 429, retry_after: Optional[str] = "1"):
+        """次の count 件のリクエストに混雑応答（429/503）を返す"""
+        with self._lock:
+            self._throttled.extend([(status, retry_after)] * count)
+
+    def fail(self, path: str, status: int = 500):
+        """path へのリクエストにエラー（status）を返し続ける"""
+        with self._lock:
+            self._failing[path] = status
+
+    def handle(self, path: str, query: Dict[str, List[str]]):
+        """パスに対応する (status, body) を返す"""
+        if path in self._failing:
+            return self._failing[path], "error"
+        if path == "/":
+            page = int(query.get("page", ["0"])[0])
+            if page >= self.total_pages:
+                return 200, render_list_page([], page, self.total_pages)
+            return 200, self.list_html(page, query.get("location", [""])[0])
+        if path.startswith("/tournaments/"):
+            return 200, self.detail_html(int(path.rsplit("/", 1)[1]))
+        return 404, "not found"
+
+    def start(self) -> "StubPokerfans":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                with stub._lock:
+                    stub.requests.append(self.path)
+                    stub.request_headers.append(dict(self.headers.items()))
+                    throttled = stub._throttled.pop(0) if stub._throttled else None
+                if stub.latency:
+                    time.sleep(stub.latency)
+                headers = {}
+                if throttled:
+                    status, retry_after = throttled
+                    body = "busy"
+                    if retry_after is not None:
+                        headers["Retry-After"] = retry_after
+                else:
+                    status, body = stub.handle(url.path, parse_qs(url.query))
+                payload = body.encode("utf-8")
+                if stub.validators and status == 200:
+                    headers["ETag"] = '"' + hashlib.md5(payload).hexdigest() + '"'
+                    headers["Last-Modified"] = formatdate(1700000000 + stub.revision, usegmt=True)
+                    if self.headers.get("If-None-Match") == headers["ETag"]:
+                        status, payload = 304, b""
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FixturePokerfans(StubPokerfans):
+    """
+    記録済みのHTML（benchmarks/record_fixtures.py で保存したもの）をそのまま返すスタブサーバ
+    一覧ページは list-NNN.html、詳細ページは detail-<ID>.html から読み込む。
+    記録されていないページは空の一覧ページ・空の詳細ページを返す。
+    Args:
+        directory: 記録済みのHTMLを置いたディレクトリ
+        latency: 1リクエストごとに加える応答遅延（秒）
+    """
+
+    def __init__(self, directory: str, latency: float = 0.0):
+        self.directory = directory
+        names = os.listdir(directory)
+        self.list_pages = sorted(int(name[5:-5]) for name in names if name.startswith("list-") and name.endswith(".html"))
+        self.detail_ids = sorted(name[7:-5] for name in names if name.startswith("detail-") and name.endswith(".html"))
+        self._pages: Dict[str, str] = {}
+        super().__init__(total_pages=len(self.list_pages), events_per_page=0, latency=latency)
+
+    def _read(self, name: str) -> Optional[str]:
+        """記録済みのHTML（なければNone）"""
+        if name not in self._pages:
+            path = os.path.join(self.directory, name)
+            if not os.path.exists(path):
+                return None
+            with open(path, encoding="utf-8") as f:
+                self._pages[name] = f.read()
+        return self._pages[name]
+
+    def list_html(self, page: int) -> str:
+        html_text = self._read(f"list-{page:03d}.html")
+        return html_text if html_text is not None else render_list_page([], page, self.total_pages)
+
+    def detail_html(self, event_id) -> str:
+        html_text = self._read(f"detail-{event_id}.html")
+        return html_text if html_text is not None else render_detail_page("")
+
+    def handle(self, path: str, query: Dict[str, List[str]]):
+        if path == "/":
+            return 200, self.list_html(int(query.get("page", ["0"])[0]))
+        if path.startswith("/tournaments/"):
+            return 200, self.detail_html(path.rsplit("/", 1)[1])
+        return 404, "not found"
@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+import pytest
+
+from async_crawler import AsyncCrawler, crawl_date
+from detail_cache import DetailCache
+from enrichment import EnrichmentStats
+from http_session import create_session
+from rate_limiter import RateLimiter
+from scraper import PokerfansScraper
+from stub_server import StubPokerfans
+
+
+@pytest.fixture
+def make_scraper(tmp_path):
+    def make(stub, cache=None):
+        return PokerfansScraper(target_date="2025/03/27", session=create_session(), base_url=stub.base_url,
+                                rate_limiter=RateLimiter(rate=1000, burst=100, jitter=0),
+                                detail_cache=cache if cache is not None else DetailCache(str(tmp_path / "cache.sqlite3")))
+    return make
+
+
+def test_crawl_returns_all_pages_in_order(make_scraper):
+    with StubPokerfans(total_pages=4, events_per_page=10) as stub:
+        tournaments = crawl_date(scraper=make_scraper(stub))
+
+    assert len(tournaments) == 40
+    ids = [int(t['detail_url'].rsplit('/', 1)[1]) for t in tournaments]
+    assert ids == [page * 100 + i for page in range(4) for i in range(10)]
+    list_requests = [r for r in stub.requests if not r.startswith('/tournaments/')]
+    assert len(list_requests) == 4
+
+
+def test_crawl_fetches_wanted_details(make_scraper):
+    with StubPokerfans(total_pages=2, events_per_page=8) as stub:
+        tournaments = crawl_date(scraper=make_scraper(stub), max_details_per_page=1)
+
+    # 保証額が取れなかった行（各ページの 1, 3, 5, 7 番目）から1ページ1件ずつ
+    detail_requests = [r for r in stub.requests if r.startswith('/tournaments/')]
+    fetched = sorted(int(r.rsplit('/', 1)[1]) for r in detail_requests)
+    assert len(fetched) == 2 and fetched[0] % 100 in (1, 3, 5, 7) and fetched[1] // 100 == 1
+    by_url = {int(t['detail_url'].rsplit('/', 1)[1]): t for t in tournaments}
+    assert [by_url[i]['guarantee'] for i in fetched] == [(10 + i % 100) * 10000 for i in fetched]
+    assert sum(1 for t in tournaments if t['guarantee'] == 0) == 6
+
+
+def test_pages_are_fetched_concurrently(make_scraper):
+    with StubPokerfans(total_pages=6, events_per_page=2, latency=0.2) as stub:
+        started = time.perf_counter()
+        crawl_date(scraper=make_scraper(stub), concurrency=5)
+        elapsed = time.perf_counter() - started
+
+    # ページ0 + 残り5ページを1つの並列ウェーブで取得
+    assert elapsed < 0.2 * 6 * 0.75
+
+
+def test_on_page_reports_every_page(make_scraper):
+    seen = []
+    with StubPokerfans(total_pages=3, events_per_page=5) as stub:
+        crawler = AsyncCrawler(make_scraper(stub), on_page=lambda page, total, rows: seen.append((page, total)))
+        asyncio.run(crawler.crawl())
+
+    assert sorted(seen) == [(0, 3), (1, 3), (2, 3)]
+
+
+def test_details_are_reused_from_persistent_cache(make_scraper, tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    with StubPokerfans(total_pages=1, events_per_page=8) as stub:
+        crawl_date(scraper=make_scraper(stub, DetailCache(path)), max_details_per_page=2)
+        first_run = len(stub.requests)
+        # 再起動した別プロセスを想定して、新しいキャッシュインスタンスで同じファイルを開く
+        warm = DetailCache(path)
+        tournaments = crawl_date(scraper=make_scraper(stub, warm), max_details_per_page=2)
+
+    assert len(stub.requests) - first_run == 1  # 一覧ページのみ
+    assert warm.stats()['hits'] == 2
+    assert sum(1 for t in tournaments if t['guarantee'] == 0) == 2
+
+
+def test_failed_detail_fetch_is_counted_as_failed(make_scraper):
+    stats = EnrichmentStats()
+    with StubPokerfans(total_pages=1, events_per_page=4) as stub:
+        stub.fail('/tournaments/1')
+        crawler = AsyncCrawler(make_scraper(stub), max_details_per_page=10, enrichment_stats=stats)
+        tournaments = asyncio.run(crawler.crawl())
+
+    # 保証額が取れなかった行（1, 3 番目）のうち、取得に失敗した1件だけが failed になる
+    result = stats.stats()
+    assert (result['fetched'], result['found'], result['failed']) == (2, 1, 1)
+    assert [t['guarantee'] > 0 for t in tournaments] == [True, False, True, True]
+
+
+def test_locations_are_filtered_while_parsing_and_merged_by_url(make_scraper):
+    with StubPokerfans(total_pages=2, events_per_page=10, locations=('東京都', '大阪府', '神奈川県')) as stub:
+        scraper = make_scraper(stub)
+        tournaments = crawl_date(scraper=scraper, locations=('東京都', '大阪府'))
+        everything = crawl_date(scraper=scraper, locations=('東京都', ''))
+
+    # 5行ごとに混ざる隣の都道府県の行は読み飛ばす
+    assert len(tournaments) == 2 * 2 * 8
+    assert {t['venue'].split()[0] for t in tournaments} == {'東京都', '大阪府'}
+    # すべての地域の結果と東京都の結果の重複は1件にまとめる
+    urls = [t['detail_url'] for t in everything]
+    assert len(urls) == len(set(urls)) == 3 * 2 * 10
+    assert any('location=%E5%A4%A7%E9%98%AA%E5%BA%9C' in r for r in stub.requests)
+
+
+def test_multi_query_progress_reports_new_rows_once(make_scraper):
+    seen = []
+    with StubPokerfans(total_pages=3, events_per_page=5, locations=('東京都', '大阪府')) as stub:
+        tournaments = crawl_date(scraper=make_scraper(stub), locations=('東京都', ''),
+                                 on_page=lambda page, total, rows: seen.append((page, total, len(rows))))
+
+    assert [page for page, _, _ in seen] == list(range(6))
+    assert all(page < total <= 6 for page, total, _ in seen)
+    assert sum(count for _, _, count in seen) == len(tournaments) == 2 * 3 * 5
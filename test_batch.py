@@ -0,0 +1,38 @@
+import itertools
+from datetime import datetime
+
+import pytest
+
+from batch import TournamentBatch, time_key
+from models import JST, Tournament, is_available, is_jopt_tournament, value_ratio
+
+TIMES = [None, '', 'xx', '00:30', '03:00', '06:59', '07:00', '12:00', '18:30', '23:59', '24:30']
+NOWS = [JST.localize(datetime(2025, 3, 27, h, m)) for h in range(24) for m in (0, 30, 59)]
+
+
+def rows():
+    result = []
+    for i, (start, end) in enumerate(itertools.product(TIMES, TIMES)):
+        result.append(Tournament(title='JOPT 予選' if i % 7 == 0 else f'デイリー {i}', start_time=start or None,
+                                 end_time=end or None, entry_fee=(i % 4) * 1000, current_entries=i % 5,
+                                 guarantee=(i % 3) * 50000, detail_url=str(i)))
+    return result
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_matches_row_by_row_results(use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    tournaments = rows()
+    batch = TournamentBatch(tournaments, use_numpy=use_numpy)
+
+    for now in NOWS:
+        expected = [is_available(t['start_time'], t['end_time'], now) for t in tournaments]
+        assert [bool(v) for v in batch.availability(now)] == expected
+    assert batch.ratios() == [value_ratio(t['guarantee'], t['entry_fee'], t['current_entries']) for t in tournaments]
+    assert [bool(v) for v in batch.is_jopt] == [is_jopt_tournament(t['title']) for t in tournaments]
+
+
+def test_time_key_keeps_order():
+    assert time_key('06:59') < time_key('07:00') < time_key('23:59') < time_key('24:30')
+    assert time_key(None) == time_key('bad') == -1
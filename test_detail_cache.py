@@ -0,0 +1,49 @@
+import threading
+import time
+
+from detail_cache import DetailCache
+
+
+def test_hit_miss_and_ttl(tmp_path):
+    cache = DetailCache(str(tmp_path / "c.sqlite3"), ttl=0.2)
+    assert cache.get("https://pokerfans.jp/tournaments/1") is None
+    cache.set("https://pokerfans.jp/tournaments/1", {'guarantee': 50000})
+    assert cache.get("https://pokerfans.jp/tournaments/1") == {'guarantee': 50000}
+
+    time.sleep(0.25)
+    assert cache.get("https://pokerfans.jp/tournaments/1") is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['expired'], stats['entries']) == (1, 2, 1, 0)
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    cache = DetailCache(str(tmp_path / "c.sqlite3"), max_entries=3)
+    for i in range(3):
+        cache.set(f"u{i}", {'guarantee': i})
+        time.sleep(0.01)
+    cache.get("u0")
+    cache.set("u3", {'guarantee': 3})
+
+    assert cache.get("u1") is None
+    assert cache.get("u0") == {'guarantee': 0}
+    assert len(cache) == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_shared_between_threads_and_instances(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    cache = DetailCache(path)
+
+    def writer(start):
+        for i in range(start, start + 50):
+            cache.set(f"u{i}", {'guarantee': i})
+
+    threads = [threading.Thread(target=writer, args=(n * 50,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    other = DetailCache(path)
+    assert len(other) == 200
+    assert other.get("u123") == {'guarantee': 123}
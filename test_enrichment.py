@@ -0,0 +1,54 @@
+import asyncio
+from datetime import datetime
+
+from enrichment import DetailEnricher, EnrichmentStats, coverage, select_candidates
+from models import JST, Tournament
+
+NOW = JST.localize(datetime(2025, 3, 27, 14, 0))
+
+
+def row(event_id, start, end, fee, guarantee=0):
+    return Tournament(title=f"#{event_id}", venue="テスト", start_time=start, end_time=end, entry_fee=fee,
+                      current_entries=0, max_entries=40, detail_url=f"/tournaments/{event_id}", guarantee=guarantee)
+
+
+def test_candidates_are_ordered_available_soonest_then_fee():
+    rows = [
+        row(1, "11:00", "12:30", 9000),   # 締切済み
+        row(2, "19:00", "20:30", 1000),
+        row(3, "15:00", "16:30", 2000),
+        row(4, "15:00", "16:30", 5000),
+        row(5, "01:00", "02:00", 3000),   # 深夜開始は翌日扱い
+        row(6, "13:00", "15:00", 1000),   # 開始済みだが締切前
+        row(7, "16:00", "17:00", 1000, guarantee=100000),
+    ]
+    picked = select_candidates(rows, budget=10, now=NOW)
+    assert [t['title'] for t in picked] == ["#6", "#4", "#3", "#2", "#1", "#5"]
+    assert [t['title'] for t in select_candidates(rows, budget=2, skip={"/tournaments/6": {}}, now=NOW)] == \
+        ["#4", "#3"]
+    assert select_candidates(rows + [row(4, "15:00", "16:30", 5000)], budget=0, now=NOW) == []
+
+
+def test_enricher_merges_results_as_they_arrive_and_records_stats():
+    details = {"/tournaments/1": {'guarantee': 50000}, "/tournaments/2": {'guarantee': 0}}
+    arrived = []
+
+    async def load(url):
+        await asyncio.sleep(0.01 if url.endswith("1") else 0.0)
+        return details[url]
+
+    rows = [row(1, "20:00", "21:00", 1000), row(2, "19:00", "20:00", 1000), row(3, "18:00", "19:00", 1000),
+            row(4, "17:00", "18:00", 1000, guarantee=30000)]
+    stats = EnrichmentStats()
+    enricher = DetailEnricher(load, cached=lambda url: {'guarantee': 70000} if url.endswith("3") else None,
+                              stats=stats)
+    found = asyncio.run(enricher.enrich(rows, budget=3, on_result=lambda t, d: arrived.append(t['title'])))
+
+    assert found == 2
+    assert arrived[-1] == "#1"   # 遅い取得は最後に反映される
+    assert [t['guarantee'] for t in rows] == [50000, 0, 70000, 30000]
+    assert coverage(rows) == 0.75
+    result = stats.stats()
+    assert (result['candidates'], result['fetched'], result['cached'], result['found']) == (3, 2, 1, 2)
+    assert (result['coverage_before'], result['coverage_after']) == (0.25, 0.75)
+    assert result['max_ms'] >= 10
@@ -0,0 +1,68 @@
+import csv
+import json
+import os
+
+import pytest
+
+from detail_cache import DetailCache
+from export import date_range, export_range, output_path
+from http_cache import ValidatorStore
+from http_session import create_session
+from rate_limiter import RateLimiter
+from scraper import PokerfansScraper
+from stub_server import StubPokerfans
+
+
+def make_scraper(stub, tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    return PokerfansScraper(target_date="2025/03/27", session=create_session(), base_url=stub.base_url,
+                            rate_limiter=RateLimiter(rate=1000, burst=100, jitter=0),
+                            detail_cache=DetailCache(path), validators=ValidatorStore(path))
+
+
+def test_date_range_includes_both_ends():
+    assert date_range("2025/03/30", "2025/04/01") == ["2025/03/30", "2025/03/31", "2025/04/01"]
+
+
+def test_exports_one_file_per_date_and_resumes(tmp_path):
+    out = str(tmp_path / "out")
+    dates = date_range("2025/03/27", "2025/03/28")
+    with StubPokerfans(total_pages=3, events_per_page=5) as stub:
+        results = export_range(dates, out, 'jsonl', scraper=make_scraper(stub, tmp_path))
+        requests_after_first_run = len(stub.requests)
+        again = export_range(dates + ["2025/03/29"], out, 'jsonl', scraper=make_scraper(stub, tmp_path))
+
+    assert [r['rows'] for r in results] == [15, 15]
+    with open(output_path(out, "2025/03/27", 'jsonl'), encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert len(rows) == 15 and rows[0]['date'] == "2025/03/27"
+    assert set(rows[0]) >= {'title', 'guarantee', 'is_jopt', 'value_ratio'}
+
+    # 完成している日付は取得しない
+    assert [r.get('skipped', False) for r in again] == [True, True, False]
+    assert len(stub.requests) - requests_after_first_run == 3
+
+
+def test_failed_page_leaves_date_incomplete(tmp_path):
+    out = str(tmp_path / "out")
+    with StubPokerfans(total_pages=1, events_per_page=5) as stub:
+        stub.throttle(1, status=500, retry_after=None)
+        failed = export_range(["2025/03/27"], out, 'csv', scraper=make_scraper(stub, tmp_path))[0]
+        retried = export_range(["2025/03/27"], out, 'csv', scraper=make_scraper(stub, tmp_path))[0]
+
+    assert failed['failed_pages'] == [0] and failed['path'] is None
+    assert not retried.get('skipped') and retried['rows'] == 5
+    assert os.listdir(out) == ["2025-03-27.csv"]
+    with open(retried['path'], encoding="utf-8", newline="") as f:
+        assert len(list(csv.DictReader(f))) == 5
+
+
+def test_parquet_export(tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    out = str(tmp_path / "out")
+    with StubPokerfans(total_pages=2, events_per_page=4) as stub:
+        result = export_range(["2025/03/27"], out, 'parquet', scraper=make_scraper(stub, tmp_path))[0]
+
+    table = parquet.read_table(result['path'])
+    assert table.num_rows == 8
+    assert table.column('date').to_pylist() == ["2025/03/27"] * 8
@@ -0,0 +1,53 @@
+import importlib.util
+import os
+
+from async_crawler import crawl_date
+from detail_cache import DetailCache
+from http_cache import ValidatorStore
+from http_session import create_session
+from rate_limiter import RateLimiter
+from scraper import PokerfansScraper
+from stub_server import FixturePokerfans
+
+BENCHMARKS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+FIXTURES = os.path.join(BENCHMARKS, "fixtures", "synthetic")
+
+
+def load_suite():
+    spec = importlib.util.spec_from_file_location("bench_suite", os.path.join(BENCHMARKS, "bench_suite.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_fixture_server_replays_recorded_pages(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    with FixturePokerfans(FIXTURES) as stub:
+        scraper = PokerfansScraper(target_date="2025/03/27", session=create_session(), base_url=stub.base_url,
+                                   rate_limiter=RateLimiter(rate=1000, burst=100, jitter=0),
+                                   detail_cache=DetailCache(path), validators=ValidatorStore(path))
+        tournaments = crawl_date(scraper=scraper, max_details_per_page=1)
+        # 記録済みの詳細ページから保証額が取れる
+        row = next(t for t in tournaments if t['detail_url'].endswith('/' + stub.detail_ids[0]))
+        detail = scraper.get_tournament_detail(row['detail_url'])
+
+    assert len(stub.list_pages) == 5
+    assert len(tournaments) == 5 * 50
+    assert detail['guarantee'] > 0
+    # 記録されていない詳細ページは空のページになる
+    assert 'pre-white' in stub.detail_html('999999')
+
+
+def test_compare_reports_regressions_in_both_directions():
+    suite = load_suite()
+    baseline = {'parse': {'list_ms_per_page': 2.0}, 'guarantee': {'title_per_second': 100000},
+                'crawl': [{'concurrency': 3, 'rate': 20.0, 'seconds': 1.0}], 'memory': {'peak_bytes': 1000}}
+    same = {'parse': {'list_ms_per_page': 2.2}, 'guarantee': {'title_per_second': 95000},
+            'crawl': [{'concurrency': 3, 'rate': 20.0, 'seconds': 0.5}], 'memory': {'peak_bytes': 1100}}
+    worse = {'parse': {'list_ms_per_page': 3.0}, 'guarantee': {'title_per_second': 50000},
+             'crawl': [{'concurrency': 3, 'rate': 20.0, 'seconds': 2.0}], 'memory': {'peak_bytes': 1000}}
+
+    assert suite.compare(same, baseline) == []
+    regressions = suite.compare(worse, baseline)
+    assert [line.split(':')[0] for line in regressions] == [
+        'parse.list_ms_per_page', 'guarantee.title_per_second', 'crawl.c3-r20.seconds']
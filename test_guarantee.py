@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from guarantee import DETAIL_EXTRACTOR, TITLE_EXTRACTOR, extract_detail_guarantee, extract_title_guarantee
+
+TITLES = [
+    ('【毎日開催】デイリー 10万保証', 100000),
+    ('ウィークリー１０万円保証', 100000),
+    ('総額84万相当 スペシャル', 840000),
+    ('40万コイン保証 ターボ', 400000),
+    ('Web予約 50,000coin', 50000),
+    ('ウェブ最低保証 100,000コイン', 100000),
+    ('参加費3,000円 / 5万保証', 50000),
+    ('エントリー 3,000円', 3000),
+    ('JOPT サテライト', 0),
+    ('', 0),
+    ('7万円保証 + 1,000,000coin', 70000),
+    ('1,000,000COIN GTD', 1000000),
+]
+
+DETAILS = [
+    ('本トーナメントは30万円保証です。', 300000),
+    ('プライズ: 5万保証\n参加費 3,000円', 50000),
+    ('参加費 3,000円\n200,000円保証', 200000),
+    ('10万コイン保証', 100000),
+    ('150,000coin保証', 150000),
+    ('総額１２万保証', 120000),
+    ('最低保証：8万（参加人数により増加）', 80000),
+    ('最低保証 300,000コイン', 300000),
+    # 優先順: 後ろにあっても「万円保証」が「円保証」より優先される
+    ('50,000円保証のサテライト。本戦は20万円保証', 200000),
+    ('保証なし', 0),
+]
+
+TOKENS = ['万', '円', 'coin', 'COIN', 'CoIn', 'coın', 'コイン', '保証', '総額', '最低保証', 'Web', 'ウェブ', '相当',
+          '1', '2', '0', '5', '５', '０', ',', ' ', '\n', 'JOPT', '：', 'abc']
+
+
+def fuzz_corpus(count, seed=0):
+    rng = random.Random(seed)
+    return [''.join(rng.choice(TOKENS) for _ in range(rng.randint(0, 25))) for _ in range(count)]
+
+
+@pytest.mark.parametrize('text,expected', TITLES)
+def test_title_guarantee(text, expected):
+    assert extract_title_guarantee(text) == expected
+    assert TITLE_EXTRACTOR.extract_sequential(text) == expected
+
+
+@pytest.mark.parametrize('text,expected', DETAILS)
+def test_detail_guarantee(text, expected):
+    assert extract_detail_guarantee(text) == expected
+    assert DETAIL_EXTRACTOR.extract_sequential(text) == expected
+
+
+def test_single_pass_matches_sequential_on_corpus():
+    corpus = [t for t, _ in TITLES + DETAILS] + fuzz_corpus(5000)
+    for text in corpus:
+        assert TITLE_EXTRACTOR.extract(text) == TITLE_EXTRACTOR.extract_sequential(text), text
+        assert DETAIL_EXTRACTOR.extract(text) == DETAIL_EXTRACTOR.extract_sequential(text), text
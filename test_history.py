@@ -0,0 +1,56 @@
+from history import HistoryStore
+from result_store import ResultStore
+
+
+def rows(entries, first_id=0):
+    return [{'detail_url': f'https://pokerfans.jp/tournaments/{first_id + i}', 'title': f'T{i}', 'venue': f'V{i % 2}',
+             'start_time': '19:00', 'entry_fee': 3000, 'current_entries': count, 'max_entries': 40,
+             'guarantee': 100000 if i == 0 else 0}
+            for i, count in enumerate(entries)]
+
+
+def test_records_only_changed_samples(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.sqlite3"))
+    assert store.record("2025/03/27", rows([1, 5, 9]), sampled_at=1000.0) == {
+        'added': 3, 'unchanged': 0, 'new_tournaments': 3}
+    assert store.record("2025/03/27", rows([1, 5, 9]), sampled_at=1600.0) == {
+        'added': 0, 'unchanged': 3, 'new_tournaments': 0}
+    assert store.record("2025/03/27", rows([2, 5, 9, 4]), sampled_at=2200.0) == {
+        'added': 2, 'unchanged': 2, 'new_tournaments': 1}
+
+    growth = store.growth('https://pokerfans.jp/tournaments/0')
+    assert [(s['sampled_at'], s['current_entries']) for s in growth] == [(1000.0, 1), (2200.0, 2)]
+    curves = store.growth_curves("2025/03/27", venue='V1')
+    assert curves == {'https://pokerfans.jp/tournaments/1': [(1000.0, 5)],
+                      'https://pokerfans.jp/tournaments/3': [(2200.0, 4)]}
+
+
+def test_entry_curve_carries_latest_value_forward(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.sqlite3"))
+    store.record("2025/03/27", rows([1, 5]), sampled_at=0.0)
+    store.record("2025/03/27", rows([3, 5]), sampled_at=900.0)
+    store.record("2025/03/27", rows([3, 8]), sampled_at=1000.0)
+    store.record("2025/03/28", rows([30, 30], first_id=100), sampled_at=1000.0)
+
+    assert store.entry_curve("2025/03/27", bucket=900) == [(0.0, 6), (900.0, 11)]
+    assert store.entry_curve("2025/03/27", venue='V0', bucket=900) == [(0.0, 1), (900.0, 3)]
+    totals = store.daily_totals("2025/03/01", "2025/03/31")
+    assert [(t['date'], t['tournaments'], t['entries']) for t in totals] == [
+        ("2025/03/27", 2, 11), ("2025/03/28", 2, 60)]
+    assert store.venue_totals("2025/03/27", "2025/03/27")[0] == {
+        'venue': 'V1', 'tournaments': 1, 'entries': 8, 'fill_rate': 0.2}
+
+    store.prune("2025/03/28")
+    assert store.entry_curve("2025/03/27") == []
+
+
+def test_result_store_records_each_fetch(tmp_path):
+    counts = iter([[1, 2], [1, 4]])
+    history = HistoryStore(str(tmp_path / "history.sqlite3"))
+    store = ResultStore(crawl=lambda date_str, **kwargs: rows(next(counts)), history=history)
+
+    store.get_or_fetch("2025/03/27")
+    store.get_or_fetch("2025/03/27", max_age=0)
+
+    assert [s['current_entries'] for s in history.growth('https://pokerfans.jp/tournaments/1')] == [2, 4]
+    assert len(history.growth('https://pokerfans.jp/tournaments/0')) == 1
@@ -0,0 +1,65 @@
+import pytest
+
+from detail_cache import DetailCache
+from http_cache import ValidatorStore
+from http_session import create_session
+from rate_limiter import RateLimiter
+from scraper import PokerfansScraper
+from stub_server import StubPokerfans
+
+
+@pytest.fixture
+def make_scraper(tmp_path):
+    store = ValidatorStore(str(tmp_path / "cache.sqlite3"))
+
+    def make(stub):
+        return PokerfansScraper(session=create_session(), base_url=stub.base_url,
+                                rate_limiter=RateLimiter(rate=1000, burst=100, jitter=0),
+                                detail_cache=DetailCache(str(tmp_path / "cache.sqlite3"), ttl=0),
+                                validators=store)
+    return make
+
+
+def test_not_modified_reuses_parsed_page(make_scraper):
+    with StubPokerfans(total_pages=1, events_per_page=5, validators=True) as stub:
+        scraper = make_scraper(stub)
+        first = scraper.get_tournament_list()
+        second = make_scraper(stub).get_tournament_list()
+
+    assert first == second
+    stats = scraper.validators.stats()
+    assert (stats['changed'], stats['not_modified']) == (1, 1)
+    assert stats['bytes_saved'] > 0
+
+
+def test_body_hash_used_without_validators(make_scraper):
+    with StubPokerfans(total_pages=1, events_per_page=5) as stub:
+        scraper = make_scraper(stub)
+        first = scraper.get_tournament_list()
+        second = scraper.get_tournament_list()
+
+    assert first == second
+    stats = scraper.validators.stats()
+    assert (stats['changed'], stats['unchanged'], stats['not_modified']) == (1, 1, 0)
+
+
+def test_changed_page_is_parsed_again(make_scraper):
+    with StubPokerfans(total_pages=1, events_per_page=5, validators=True) as stub:
+        scraper = make_scraper(stub)
+        before, _ = scraper.get_tournament_list()
+        stub.revision += 1
+        after, _ = scraper.get_tournament_list()
+
+    assert [t['current_entries'] for t in after] == [t['current_entries'] + 1 for t in before]
+    assert scraper.validators.stats()['changed'] == 2
+
+
+def test_detail_revalidated_after_ttl(make_scraper):
+    with StubPokerfans(total_pages=1, events_per_page=2, validators=True) as stub:
+        scraper = make_scraper(stub)
+        url = stub.base_url + "tournaments/1"
+        assert scraper.get_tournament_detail(url) == {'guarantee': 110000}
+        # TTL=0 なので詳細キャッシュは使われず、304 で前回の解析結果を再利用する
+        assert scraper.get_tournament_detail(url) == {'guarantee': 110000}
+
+    assert scraper.validators.stats()['not_modified'] == 1
@@ -0,0 +1,67 @@
+import importlib.util
+import threading
+
+from http_session import CountingHTTPAdapter, accept_encoding, connection_stats, create_session, \
+    take_connect_seconds
+from stub_server import StubPokerfans
+
+
+def adapter(session):
+    return session.get_adapter("http://")
+
+
+def test_requests_to_one_host_reuse_one_connection():
+    session = create_session()
+    with StubPokerfans(total_pages=1, events_per_page=1) as stub:
+        take_connect_seconds()
+        for _ in range(5):
+            session.get(stub.base_url).raise_for_status()
+        connect_seconds = take_connect_seconds()
+
+    assert connection_stats(session) == {'requests': 5, 'new_connections': 1, 'reused_connections': 4}
+    assert connect_seconds > 0 and take_connect_seconds() == 0
+
+
+def test_connections_of_evicted_pools_are_still_counted():
+    # 1ホスト分しかプールを持たないので、ホストを替えるたびに前のプールが追い出される
+    session = create_session(pool_size=1)
+    with StubPokerfans(total_pages=1, events_per_page=1) as first, \
+            StubPokerfans(total_pages=1, events_per_page=1) as second:
+        for stub in (first, second, first, second):
+            session.get(stub.base_url).raise_for_status()
+
+    assert connection_stats(session) == {'requests': 4, 'new_connections': 4, 'reused_connections': 0}
+
+
+def test_pool_size_limits_connections_per_host():
+    session = create_session(pool_size=3)
+    pool_adapter = adapter(session)
+    assert isinstance(pool_adapter, CountingHTTPAdapter)
+    assert (pool_adapter._pool_connections, pool_adapter._pool_maxsize) == (3, 3)
+
+    with StubPokerfans(total_pages=1, events_per_page=1, latency=0.1) as stub:
+        threads = [threading.Thread(target=lambda: session.get(stub.base_url)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        pool = pool_adapter.poolmanager.connection_from_url(stub.base_url)
+
+    # 同時に6件送ると接続は作られるが、プールに戻して保持するのは3接続まで
+    assert pool.pool.maxsize == 3
+    stats = connection_stats(session)
+    assert stats['requests'] == 6 and stats['new_connections'] >= 3
+
+
+def test_accept_encoding_is_negotiated():
+    session = create_session()
+    with StubPokerfans(total_pages=1, events_per_page=1) as stub:
+        response = session.get(stub.base_url)
+
+    sent = stub.request_headers[0]['Accept-Encoding']
+    assert sent == accept_encoding() == response.request.headers['Accept-Encoding']
+    encodings = set(sent.split(','))
+    assert {'gzip', 'deflate'} <= encodings
+    # br は brotli / brotlicffi があるときだけ送る
+    has_brotli = any(importlib.util.find_spec(name) for name in ('brotli', 'brotlicffi'))
+    assert ('br' in encodings) == has_brotli
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# 画面（Streamlit）を使わずに動くモジュール
+HEADLESS_MODULES = ['scraper', 'async_crawler', 'incremental', 'result_store', 'prefetch', 'batch',
+                    'tournament_index', 'metrics', 'export', 'enrichment', 'page_counts', 'main']
+
+
+def loaded_after(code: str) -> set:
+    """新しいプロセスで code を実行したあとに読み込まれているモジュール"""
+    script = f"{code}\nimport sys\nprint(' '.join(sys.modules))"
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+def test_headless_modules_do_not_import_ui_or_optional_dependencies():
+    loaded = loaded_after("import " + ", ".join(HEADLESS_MODULES))
+    for name in ('streamlit', 'pandas', 'numpy', 'selectolax', 'lxml', 'bs4'):
+        assert name not in loaded
+
+
+def test_parser_backend_is_loaded_on_first_parse():
+    loaded = loaded_after(
+        "from scraper import PokerfansScraper\n"
+        "scraper = PokerfansScraper(parser='html.parser')\n"
+        "import sys; assert 'bs4' not in sys.modules\n"
+        "scraper.parse_tournament_detail('<pre class=\"pre-white\">10万円保証</pre>')"
+    )
+    assert 'bs4' in loaded
@@ -0,0 +1,89 @@
+from async_crawler import crawl_date
+from detail_cache import DetailCache
+from http_cache import ValidatorStore
+from http_session import create_session
+from incremental import apply_diff, diff_tournaments, refresh_incremental
+from rate_limiter import RateLimiter
+from scraper import PokerfansScraper
+from stub_server import StubPokerfans
+
+
+def make_scraper(stub, tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    return PokerfansScraper(target_date="2025/03/27", session=create_session(), base_url=stub.base_url,
+                            rate_limiter=RateLimiter(rate=1000, burst=100, jitter=0),
+                            detail_cache=DetailCache(path, ttl=0), validators=ValidatorStore(path))
+
+
+def row(url, entries, guarantee=0):
+    return {'detail_url': url, 'title': url, 'current_entries': entries, 'guarantee': guarantee}
+
+
+def test_diff_and_apply():
+    old = [row('a', 1), row('b', 2), row('c', 3)]
+    new = [row('a', 1), row('b', 5), row('d', 0)]
+    diff = diff_tournaments(old, new)
+    assert [r['detail_url'] for r in diff['added']] == ['d']
+    assert [r['detail_url'] for r in diff['removed']] == ['c']
+    assert [r['detail_url'] for r in diff['changed']] == ['b']
+    assert diff['unchanged'] == 1
+
+    b = old[1]
+    touched = apply_diff(old, diff)
+    assert [r['detail_url'] for r in old] == ['a', 'b', 'd']
+    assert b['current_entries'] == 5 and touched[0] is b
+
+
+def test_refresh_reports_only_changed_rows(tmp_path):
+    with StubPokerfans(total_pages=2, events_per_page=6) as stub:
+        snapshot = crawl_date(scraper=make_scraper(stub, tmp_path))
+        diff, report = refresh_incremental(snapshot, scraper=make_scraper(stub, tmp_path))
+        assert (report['added'], report['removed'], report['changed']) == (0, 0, 0)
+
+        stub.revision += 1
+        diff, report = refresh_incremental(snapshot, scraper=make_scraper(stub, tmp_path))
+
+    assert (report['added'], report['removed'], report['changed'], report['failed_pages']) == (0, 0, 12, 0)
+    apply_diff(snapshot, diff)
+    assert snapshot[0]['current_entries'] == 1
+
+
+def test_known_detail_guarantee_is_kept_without_detail_requests(tmp_path):
+    with StubPokerfans(total_pages=1, events_per_page=4, validators=True) as stub:
+        snapshot = crawl_date(scraper=make_scraper(stub, tmp_path), max_details_per_page=4)
+        assert snapshot[1]['guarantee'] == 110000
+        # 一覧が 304 で返っても詳細由来の保証額は変更扱いにならない
+        _, report = refresh_incremental(snapshot, scraper=make_scraper(stub, tmp_path))
+        assert report['changed'] == 0
+
+        stub.requests.clear()
+        stub.revision += 1
+        diff, report = refresh_incremental(snapshot, scraper=make_scraper(stub, tmp_path), max_details_per_page=4)
+
+    assert not [r for r in stub.requests if r.startswith('/tournaments/')]
+    assert report['changed'] == 4
+    assert all(r['guarantee'] == s['guarantee'] for r, s in zip(diff['changed'], snapshot))
+
+
+def test_known_rows_skip_guarantee_extraction(tmp_path):
+    first_dir, cached_dir = tmp_path / "first", tmp_path / "cached"
+    first_dir.mkdir()
+    cached_dir.mkdir()
+    with StubPokerfans(total_pages=1, events_per_page=6) as stub:
+        first, _ = make_scraper(stub, first_dir).fetch_tournament_list()
+        known = {t['detail_url']: dict(t.to_dict(), guarantee=777) for t in first[:4]}
+        scraper = make_scraper(stub, tmp_path)
+        extracted = []
+        extract = scraper._extract_guarantee
+        scraper._extract_guarantee = lambda title: extracted.append(title) or extract(title)
+        carried, _ = scraper.fetch_tournament_list(known=known)
+        assert extracted == [t['title'] for t in first[4:]]
+
+        # 同じ本文を解析結果のキャッシュから読む（前回の行がなければ、省略した行はここで抽出する）
+        fresh = make_scraper(stub, cached_dir)
+        fresh.parsed_cache = scraper.parsed_cache
+        rows, _ = fresh.fetch_tournament_list()
+
+    assert [t['guarantee'] for t in carried] == [777] * 4 + [t['guarantee'] for t in first[4:]]
+    assert fresh.parsed_cache.stats()['hits'] == 1
+    assert [t.to_dict() for t in rows] == [t.to_dict() for t in first]
@@ -0,0 +1,69 @@
+import json
+import urllib.request
+
+from async_crawler import crawl_date
+from detail_cache import DetailCache
+from http_cache import ValidatorStore
+from http_session import create_session
+from metrics import Metrics, serve_metrics
+from rate_limiter import RateLimiter
+from scraper import PokerfansScraper
+from stub_server import StubPokerfans
+
+
+def crawl_with_metrics(tmp_path, metrics, **kwargs):
+    path = str(tmp_path / "cache.sqlite3")
+    with StubPokerfans(total_pages=2, events_per_page=8) as stub:
+        scraper = PokerfansScraper(target_date="2025/03/27", session=create_session(), base_url=stub.base_url,
+                                   rate_limiter=RateLimiter(rate=1000, burst=100, jitter=0),
+                                   detail_cache=DetailCache(path), validators=ValidatorStore(path), metrics=metrics)
+        return crawl_date(scraper=scraper, **kwargs)
+
+
+def test_records_stages_per_page_and_detail(tmp_path, capsys):
+    metrics = Metrics()
+    finished = []
+    metrics.add_hook(finished.append)
+    crawl_with_metrics(tmp_path, metrics, max_details_per_page=1)
+
+    kinds = sorted(record['kind'] for record in finished)
+    assert kinds == ['detail', 'detail', 'list', 'list']
+    for record in finished:
+        assert record['status'] == 200
+        for stage in ('ttfb', 'download'):
+            assert record[stage] >= 0
+    for record in finished:
+        # 詳細ページは本文が同じなら解析済みの結果を使うので、解析の段階がないこともある
+        if record['kind'] == 'list' or 'parse' in record:
+            assert record['parse'] >= 0 and record['guarantee'] >= 0
+    assert all('rows' in record for record in finished if record['kind'] == 'list')
+
+    summary = metrics.summary()
+    assert summary['list']['parse']['count'] == 2
+    assert 1 <= summary['detail']['guarantee']['count'] <= 2
+    # 最初のリクエストでは接続を確立する
+    assert sum(stages.get('connect', {}).get('count', 0) for stages in summary.values()) >= 1
+    # 行ごとの出力はしない
+    assert 'time_text' not in capsys.readouterr().out
+
+
+def test_prometheus_and_json_endpoints(tmp_path):
+    metrics = Metrics()
+    crawl_with_metrics(tmp_path, metrics)
+
+    text = metrics.to_prometheus()
+    assert 'pokerodds_stage_seconds_count{kind="list",stage="parse"} 2' in text
+    assert 'pokerodds_responses_total{kind="list",status="200"} 2' in text
+
+    server = serve_metrics(0, metrics)
+    try:
+        base = f"http://127.0.0.1:{server.server_port}"
+        with urllib.request.urlopen(base + "/metrics") as response:
+            assert response.read().decode("utf-8") == metrics.to_prometheus()
+        with urllib.request.urlopen(base + "/metrics.json") as response:
+            dumped = json.loads(response.read())
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert dumped['responses'] == {'list:200': 2}
+    assert len(dumped['recent']) == 2
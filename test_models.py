@@ -0,0 +1,54 @@
+import json
+import pickle
+from datetime import datetime
+
+from models import JST, Tournament, is_available
+
+
+def make(**kwargs):
+    data = dict(title='JOPT サテライト 10万保証', venue='東京都 新宿区 テストポーカー', start_time='19:00',
+                end_time='21:30', entry_fee=5000, current_entries=10, max_entries=40,
+                detail_url='https://pokerfans.jp/tournaments/1', guarantee=100000)
+    data.update(kwargs)
+    return Tournament(**data)
+
+
+def test_behaves_like_dict():
+    t = make()
+    plain = t.to_dict()
+    assert t == plain and plain == t
+    assert list(t) == list(plain)
+    assert t['title'] == plain['title'] and t.get('missing', 1) == 1
+    assert json.loads(json.dumps([t], default=dict)) == [plain]
+
+    t.update({'current_entries': 12})
+    assert t['current_entries'] == 12
+
+
+def test_derived_fields_are_computed_on_access():
+    t = make()
+    assert t['is_jopt'] is True and 'is_jopt' not in t
+    assert t['value_ratio'] == 100000 / 50000 * 100
+    t['current_entries'] = 0
+    assert t.get('value_ratio') is None
+
+    t['title'] = 'デイリー'
+    assert t['is_jopt'] is False
+
+    night = JST.localize(datetime(2025, 3, 27, 20, 0))
+    assert t.is_available(night) == is_available('19:00', '21:30', night) is True
+
+
+def test_extra_keys_and_pickle():
+    t = make()
+    t['value_ratio'] = 0.5  # main.py のように任意のキーを代入できる
+    assert t['value_ratio'] == 0.5 and len(t) == 10
+
+    copy = pickle.loads(pickle.dumps(t))
+    assert copy == t and copy['value_ratio'] == 0.5
+
+
+def test_venue_is_interned():
+    a = make(venue=''.join(['東京都 ', '新宿区 テストポーカー']))
+    b = Tournament.from_dict(make().to_dict())
+    assert a.venue is b.venue
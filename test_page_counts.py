@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+import pytest
+
+from async_crawler import AsyncCrawler
+from detail_cache import DetailCache
+from http_session import create_session
+from page_counts import PageCountStore, query_key
+from rate_limiter import RateLimiter
+from scraper import PokerfansScraper
+from stub_server import StubPokerfans
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PageCountStore(str(tmp_path / "cache.sqlite3"))
+
+
+@pytest.fixture
+def make_crawler(tmp_path, store):
+    def make(stub, **kwargs):
+        scraper = PokerfansScraper(target_date="2025/03/27", session=create_session(), base_url=stub.base_url,
+                                   rate_limiter=RateLimiter(rate=1000, burst=100, jitter=0),
+                                   detail_cache=DetailCache(str(tmp_path / "cache.sqlite3")))
+        return AsyncCrawler(scraper, speculative=True, page_counts=store, **kwargs)
+    return make
+
+
+def list_requests(stub):
+    return [r for r in stub.requests if not r.startswith('/tournaments/')]
+
+
+def test_prediction_uses_same_date_then_same_weekday(store):
+    query = query_key("https://example.com/tournaments", {'location': '東京都', 'page': 0, 'startDate': 'x'})
+    assert query == query_key("https://example.com/tournaments", {'startDate': 'y', 'location': '東京都'})
+    assert store.predict(query, "2025/03/27", default=4) == 4
+
+    store.record(query, "2025/03/20", 6)   # 同じ木曜日
+    store.record(query, "2025/03/13", 9)
+    store.record(query, "2025/03/26", 2)
+    assert store.predict(query, "2025/03/27") == 6
+    store.record(query, "2025/03/27", 5)
+    assert store.predict(query, "2025/03/27") == 5
+    assert store.predict(query + "&prize=1", "2025/03/27", default=100) == 30
+
+
+def test_extra_predicted_pages_are_dropped(make_crawler, store):
+    with StubPokerfans(total_pages=2, events_per_page=5) as stub:
+        crawler = make_crawler(stub)
+        query = query_key(stub.base_url, crawler.scraper.params)
+        store.record(query, "2025/03/27", 5)
+        tournaments = asyncio.run(crawler.crawl())
+
+    assert [int(t['detail_url'].rsplit('/', 1)[1]) for t in tournaments] == \
+        [page * 100 + i for page in range(2) for i in range(5)]
+    assert crawler.failed_pages == [] and crawler.total_pages == 2
+    assert crawler.wasted_pages == 3
+    assert store.predict(query, "2025/03/27") == 2
+
+
+def test_missing_tail_pages_are_fetched_after_page_0(make_crawler):
+    with StubPokerfans(total_pages=5, events_per_page=3) as stub:
+        crawler = make_crawler(stub)   # 記録がないので既定の3ページを予測
+        tournaments = asyncio.run(crawler.crawl())
+
+    assert len(tournaments) == 15 and crawler.wasted_pages == 0
+    assert len(list_requests(stub)) == 5
+
+
+def test_correct_prediction_takes_one_wave(make_crawler, store):
+    with StubPokerfans(total_pages=4, events_per_page=2, latency=0.3) as stub:
+        crawler = make_crawler(stub, concurrency=4)
+        store.record(query_key(stub.base_url, crawler.scraper.params), "2025/03/20", 4)
+        started = time.perf_counter()
+        asyncio.run(crawler.crawl())
+        elapsed = time.perf_counter() - started
+
+    # ページ0の応答を待たずに全ページを取得するので、往復1回分で終わる
+    assert elapsed < 0.3 * 2 * 0.8
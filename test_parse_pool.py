@@ -0,0 +1,125 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from async_crawler import AsyncCrawler
+from detail_cache import DetailCache
+from http_cache import ValidatorStore
+from http_session import create_session
+from metrics import Metrics
+from parse_pool import create_pool, discard_shared_pool, get_shared_parse_pool, parse_list_html
+from rate_limiter import RateLimiter
+from scraper import PokerfansScraper
+from stub_server import StubPokerfans
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = create_pool(2)
+    yield pool
+    pool.shutdown()
+
+
+def make_scraper(stub, path):
+    return PokerfansScraper(target_date="2025/03/27", session=create_session(), base_url=stub.base_url,
+                            rate_limiter=RateLimiter(rate=1000, burst=100, jitter=0),
+                            detail_cache=DetailCache(path), validators=ValidatorStore(path), metrics=Metrics())
+
+
+def crawl(scraper, **kwargs):
+    crawler = AsyncCrawler(scraper, concurrency=4, max_details_per_page=2, **kwargs)
+    return asyncio.run(crawler.crawl()), crawler
+
+
+def test_process_pool_matches_in_thread_parsing(tmp_path, pool):
+    with StubPokerfans(total_pages=3, events_per_page=5) as stub:
+        expected, _ = crawl(make_scraper(stub, str(tmp_path / "a.sqlite3")))
+        scraper = make_scraper(stub, str(tmp_path / "b.sqlite3"))
+        stub.requests.clear()
+        tournaments, crawler = crawl(scraper, parse_workers=2, pool=pool)
+        details = [r for r in stub.requests if r.startswith('/tournaments/')]
+
+    assert [t.to_dict() for t in tournaments] == [t.to_dict() for t in expected]
+    assert not crawler.failed_pages
+    # 詳細の解析結果もキャッシュに保存され、解析時間は呼び出し側のメトリクスに加算される
+    fetched = [t for t in tournaments if t['detail_url'].endswith(tuple(details))]
+    assert len(fetched) == 6
+    assert all(scraper.detail_cache.get(t['detail_url'])['guarantee'] == t['guarantee'] > 0 for t in fetched)
+    summary = scraper.metrics.summary()
+    assert summary['list']['parse']['count'] == 3 and summary['detail']['parse']['count'] >= 1
+
+
+def test_unchanged_pages_are_not_sent_to_pool(tmp_path, pool):
+    path = str(tmp_path / "cache.sqlite3")
+    with StubPokerfans(total_pages=2, events_per_page=4) as stub:
+        crawl(make_scraper(stub, path), parse_workers=2, pool=pool)
+        scraper = make_scraper(stub, path)
+        tournaments, _ = crawl(scraper, parse_workers=2, pool=pool)
+
+    assert len(tournaments) == 8
+    assert 'parse' not in scraper.metrics.summary().get('list', {})
+    stats = scraper.validators.stats()
+    assert stats['not_modified'] + stats['unchanged'] >= 2
+
+
+def test_small_queue_applies_backpressure_and_completes(tmp_path, pool):
+    with StubPokerfans(total_pages=6, events_per_page=3) as stub:
+        tournaments, crawler = crawl(make_scraper(stub, str(tmp_path / "cache.sqlite3")),
+                                     parse_workers=1, queue_size=1, pool=pool)
+
+    assert len(tournaments) == 18 and not crawler.failed_pages
+
+
+def test_parse_list_html_returns_picklable_rows():
+    with StubPokerfans(total_pages=1, events_per_page=3) as stub:
+        parsed, stages = parse_list_html(stub.list_html(0), stub.base_url)
+    assert len(parsed['tournaments']) == 3 and parsed['pagination']['total_pages'] == 1
+    assert set(stages) >= {'parse', 'rows'}
+
+
+def test_parse_failure_is_recorded_for_the_page(tmp_path):
+    with StubPokerfans(total_pages=3, events_per_page=4) as stub:
+        broken_html = stub.list_html(1)
+
+        class FailingPool(ThreadPoolExecutor):
+            def submit(self, fn, *args, **kwargs):
+                if args and args[0] == broken_html:
+                    raise BrokenProcessPool("worker died")
+                return super().submit(fn, *args, **kwargs)
+
+        with FailingPool(2) as failing:
+            tournaments, crawler = crawl(make_scraper(stub, str(tmp_path / "cache.sqlite3")),
+                                         parse_workers=2, pool=failing)
+
+    assert crawler.failed_pages == [1]
+    # 解析に失敗したページだけが抜け、残りのページは取得できる
+    assert sorted(int(t['detail_url'].rsplit('/', 1)[1]) // 100 for t in tournaments) == [0] * 4 + [2] * 4
+
+
+def test_broken_shared_pool_is_rebuilt(tmp_path):
+    broken = get_shared_parse_pool(1)
+    with pytest.raises(BrokenProcessPool):
+        broken.submit(os._exit, 1).result()
+    with StubPokerfans(total_pages=2, events_per_page=3) as stub:
+        _, first = crawl(make_scraper(stub, str(tmp_path / "a.sqlite3")), parse_workers=1)
+        tournaments, second = crawl(make_scraper(stub, str(tmp_path / "b.sqlite3")), parse_workers=1)
+    rebuilt = get_shared_parse_pool(1)
+    discard_shared_pool(rebuilt)
+
+    assert first.failed_pages == [0]
+    assert rebuilt is not broken
+    assert len(tournaments) == 6 and not second.failed_pages
+
+
+def test_shared_pools_of_other_sizes_stay_usable():
+    larger = get_shared_parse_pool(2)
+    smaller = get_shared_parse_pool(1)
+    try:
+        assert larger is not smaller and get_shared_parse_pool(2) is larger
+        assert larger.submit(pow, 2, 3).result() == 8
+    finally:
+        discard_shared_pool(larger)
+        discard_shared_pool(smaller)
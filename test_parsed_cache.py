@@ -0,0 +1,77 @@
+import json
+import zlib
+
+from detail_cache import DetailCache
+from http_cache import ValidatorStore
+from http_session import create_session
+from metrics import Metrics
+from parsed_cache import ParsedPageCache, decode_parsed, encode_parsed
+from rate_limiter import RateLimiter
+from scraper import PokerfansScraper
+from stub_server import StubPokerfans
+
+
+def make_scraper(stub, path, **kwargs):
+    return PokerfansScraper(target_date="2025/03/27", session=create_session(), base_url=stub.base_url,
+                            rate_limiter=RateLimiter(rate=1000, burst=100, jitter=0),
+                            detail_cache=DetailCache(path), validators=ValidatorStore(path), metrics=Metrics(),
+                            **kwargs)
+
+
+def test_encoding_is_compact_and_round_trips():
+    rows = [{'title': f'#{i} 10万保証', 'venue': '東京都 新宿区', 'start_time': '19:00', 'end_time': '20:30',
+             'entry_fee': 3000, 'current_entries': i, 'max_entries': 40,
+             'detail_url': f'https://pokerfans.jp/tournaments/{i}', 'guarantee': 100000} for i in range(50)]
+    parsed = {'tournaments': rows, 'pagination': {'current_page': 0, 'total_pages': 3}}
+    blob = encode_parsed(parsed)
+    assert decode_parsed(blob) == parsed
+    assert len(blob) < len(zlib.compress(json.dumps(parsed, ensure_ascii=False).encode('utf-8')))
+    assert decode_parsed(encode_parsed({'guarantee': 50000})) == {'guarantee': 50000}
+
+
+def test_least_recently_used_pages_are_evicted(tmp_path):
+    cache = ParsedPageCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.put("detail:1", "a", {'guarantee': 1})
+    cache.put("detail:1", "b", {'guarantee': 2})
+    assert cache.get("detail:1", "a") == {'guarantee': 1}
+    cache.put("detail:1", "c", {'guarantee': 3})
+
+    assert cache.get("detail:1", "b") is None
+    assert cache.get("detail:2", "a") is None   # 解析処理の版が違えば別のキー
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['entries']) == (1, 2, 1, 2)
+    assert stats['hit_rate'] == 0.333 and stats['bytes'] > 0
+
+
+def test_identical_body_under_another_date_skips_parsing(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    with StubPokerfans(total_pages=1, events_per_page=6) as stub:
+        scraper = make_scraper(stub, path)
+        first, _ = scraper.fetch_tournament_list()
+        # スタブの一覧ページは日付によらず同じ本文になる
+        other = scraper.for_date("2025/03/28")
+        second, _ = other.fetch_tournament_list()
+        third, _ = other.fetch_tournament_list()
+        osaka, _ = scraper.for_query(location="大阪府").fetch_tournament_list()
+
+    assert [t.to_dict() for t in second] == [t.to_dict() for t in first]
+    assert scraper.metrics.summary()['list']['parse']['count'] == 2   # 最初の1回と地域が違う1回
+    assert scraper.parsed_cache.stats()['hits'] == 2
+    assert scraper.validators.stats()['unchanged'] == 2
+    assert third == second and osaka == []
+
+
+def test_known_guarantees_are_not_stored_in_the_cache(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    with StubPokerfans(total_pages=1, events_per_page=6) as stub:
+        first, _ = make_scraper(stub, str(tmp_path / "first.sqlite3")).fetch_tournament_list()
+        row = first[0]
+        known = {row['detail_url']: {'title': row['title'], 'guarantee': 999}}
+        carried, _ = make_scraper(stub, path).fetch_tournament_list(known=known)
+        # 別の ValidatorStore（条件付きGETを使わない）で、同じ本文を解析結果のキャッシュから読む
+        fresh_scraper = make_scraper(stub, str(tmp_path / "fresh.sqlite3"), parsed_cache=ParsedPageCache(path))
+        fresh, _ = fresh_scraper.fetch_tournament_list()
+
+    assert carried[0]['guarantee'] == 999
+    assert fresh_scraper.parsed_cache.stats()['hits'] == 1
+    assert fresh[0]['guarantee'] == row['guarantee'] != 999
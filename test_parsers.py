@@ -0,0 +1,61 @@
+import pytest
+
+from parsers import SoupBackend, available_backends, get_backend
+from scraper import PokerfansScraper
+from stub_server import StubPokerfans, render_detail_page, render_event, render_list_page
+
+EDGE_EVENTS = [
+    # リングゲームは除外される
+    {'id': 1, 'title': 'コインリング 毎日開催', 'venue': '東京都 渋谷区 A', 'time_text': '12:00〜',
+     'fee_text': '¥1,000', 'entries_text': '3 / 10'},
+    # 東京都以外は除外される
+    {'id': 2, 'title': '大阪 10万保証', 'venue': '大阪府 大阪市 B', 'time_text': '19:00〜 〆21:00',
+     'fee_text': '参加費 ¥3,000', 'entries_text': '5 / 20'},
+    # 全角数字・定員なし・締切なし
+    {'id': 3, 'title': 'ウィークリー １０万円保証 & <特別>', 'venue': '東京都 港区 C', 'time_text': '20:30〜',
+     'fee_text': '(E) 5,000円', 'entries_text': '7 /'},
+    # エントリー数が読めない
+    {'id': 4, 'title': 'End time test', 'venue': '東京都 港区 D', 'time_text': '01:00〜 End02:30',
+     'fee_text': 'なし', 'entries_text': '- / -'},
+]
+
+
+def baseline():
+    """変更前と同じ、html.parser で文書全体を解析するスクレイパー"""
+    scraper = PokerfansScraper(parser='html.parser')
+    scraper.parser = SoupBackend('html.parser', strain=False)
+    return scraper
+
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_list_pages_match_full_parse(backend):
+    stub = StubPokerfans(total_pages=3, events_per_page=50)
+    scraper = PokerfansScraper(parser=backend)
+    for page in range(3):
+        html = stub.list_html(page)
+        assert scraper.parse_tournament_list(html) == baseline().parse_tournament_list(html)
+
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_edge_rows_match_full_parse(backend):
+    html = render_list_page(EDGE_EVENTS, page=1, total_pages=5)
+    tournaments, pagination = PokerfansScraper(parser=backend).parse_tournament_list(html)
+
+    assert (tournaments, pagination) == baseline().parse_tournament_list(html)
+    assert [t['title'] for t in tournaments] == ['ウィークリー １０万円保証 & <特別>', 'End time test']
+    assert pagination == {'current_page': 1, 'total_pages': 5}
+
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_detail_and_missing_pagination(backend):
+    scraper = PokerfansScraper(parser=backend)
+    assert scraper.parse_tournament_detail(render_detail_page('総額30万保証')) == {'guarantee': 300000}
+    assert scraper.parse_tournament_detail('<html><body></body></html>') == {'guarantee': 0}
+    assert scraper.parse_tournament_list(render_event(EDGE_EVENTS[2]))[1] == {'current_page': 0, 'total_pages': 1}
+
+
+def test_html_parser_is_always_available():
+    assert 'html.parser' in available_backends()
+    assert get_backend('html.parser').name == 'html.parser'
+    with pytest.raises(ValueError):
+        get_backend('nope')
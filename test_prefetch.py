@@ -0,0 +1,70 @@
+import time
+from datetime import datetime
+
+from models import JST
+from prefetch import PrefetchScheduler
+from result_store import ResultStore, SnapshotStore, make_snapshot
+
+
+def fake_store(calls, fail=False, persist=None):
+    def crawl(date_str, max_details_per_page=0, on_page=None):
+        calls.append(('crawl', date_str))
+        if fail:
+            raise RuntimeError("down")
+        return [{'title': date_str, 'detail_url': 'u/' + date_str}]
+
+    def refresh(rows, date_str, max_details_per_page=0):
+        calls.append(('refresh', date_str))
+        diff = {'added': [], 'removed': [], 'changed': [], 'unchanged': len(rows)}
+        return diff, {'added': 0, 'removed': 0, 'changed': 0, 'unchanged': len(rows), 'seconds': 0.0}
+
+    return ResultStore(crawl=crawl, refresh=refresh, persist=persist)
+
+
+def clock():
+    return JST.localize(datetime(2025, 3, 27, 18, 0))
+
+
+def test_nearer_dates_are_refreshed_more_often():
+    calls = []
+    scheduler = PrefetchScheduler(fake_store(calls), days=2, intervals=((0, 0.05), (366, 60)), clock=clock)
+
+    assert scheduler.run_once() == ["2025/03/27", "2025/03/28", "2025/03/29"]
+    assert all(kind == 'crawl' for kind, _ in calls)
+    assert scheduler.run_once() == []
+
+    time.sleep(0.06)
+    assert scheduler.run_once() == ["2025/03/27"]
+    assert calls[-1] == ('refresh', "2025/03/27")
+    assert 0 < scheduler.seconds_until_next() <= 0.05
+
+
+def test_failed_date_waits_before_retry():
+    calls = []
+    scheduler = PrefetchScheduler(fake_store(calls, fail=True), days=0, clock=clock)
+    assert scheduler.run_once() == [] and scheduler.failures == 1
+    assert scheduler.run_once() == [] and len(calls) == 1
+
+
+def test_worker_results_are_visible_to_other_process_store(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    worker = PrefetchScheduler(fake_store([], persist=SnapshotStore(path)), days=1, clock=clock)
+    worker.run_once()
+
+    reader = ResultStore(crawl=None, persist=SnapshotStore(path))
+    snapshot = reader.get("2025/03/28")
+    assert [t['title'] for t in snapshot.tournaments] == ["2025/03/28"]
+    assert snapshot.tournaments[0].frozen
+    # 新しい結果が保存されたら読み直す
+    reader.persist.save(make_snapshot("2025/03/28", [{'title': 'new', 'detail_url': 'u'}], 0.0))
+    assert reader.get("2025/03/28").tournaments[0]['title'] == 'new'
+
+
+def test_background_thread_starts_and_stops():
+    calls = []
+    scheduler = PrefetchScheduler(fake_store(calls), days=1, clock=clock).start()
+    deadline = time.time() + 2
+    while len(calls) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    scheduler.stop(timeout=2)
+    assert len(calls) == 2 and not scheduler._thread.is_alive()
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+
+from http_session import create_session
+from rate_limiter import RateLimiter, parse_retry_after
+from scraper import PokerfansScraper
+from stub_server import StubPokerfans
+
+
+def test_burst_then_steady_rate():
+    limiter = RateLimiter(rate=20, burst=3, jitter=0)
+    started = time.perf_counter()
+    for _ in range(3):
+        limiter.acquire()
+    burst_elapsed = time.perf_counter() - started
+    for _ in range(4):
+        limiter.acquire()
+    total_elapsed = time.perf_counter() - started
+
+    assert burst_elapsed < 0.05
+    # バースト後の4件は 1/20 秒間隔
+    assert 0.15 <= total_elapsed < 0.4
+    assert limiter.stats()['requests'] == 7
+
+
+def test_threads_share_the_bucket():
+    limiter = RateLimiter(rate=50, burst=1, jitter=0)
+    started = time.perf_counter()
+    threads = [threading.Thread(target=lambda: [limiter.acquire() for _ in range(5)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # 20件 / 50rps ≒ 0.38秒（最初の1件はバースト）
+    assert time.perf_counter() - started >= 0.35
+
+
+def test_async_acquire_shares_the_bucket():
+    limiter = RateLimiter(rate=50, burst=1, jitter=0)
+
+    async def run():
+        await asyncio.gather(*(limiter.acquire_async() for _ in range(11)))
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    assert time.perf_counter() - started >= 0.18
+    assert limiter.stats()['wait_seconds'] > 0
+
+
+def test_throttle_backs_off_and_recovers():
+    limiter = RateLimiter(rate=10, burst=1, jitter=0)
+    assert limiter.on_response(429, "0") == 0
+    assert limiter.current_rate == 5
+    limiter.on_response(200)
+    assert limiter.current_rate == 6.25
+    assert limiter.stats()['throttled'] == 1
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_scraper_retries_after_retry_after():
+    limiter = RateLimiter(rate=100, burst=10, jitter=0)
+    with StubPokerfans(total_pages=1, events_per_page=3) as stub:
+        stub.throttle(1, status=429, retry_after="1")
+        scraper = PokerfansScraper(session=create_session(), base_url=stub.base_url, rate_limiter=limiter)
+        started = time.perf_counter()
+        tournaments, _ = scraper.get_tournament_list()
+        elapsed = time.perf_counter() - started
+
+    assert len(tournaments) == 3
+    assert len(stub.requests) == 2
+    assert elapsed >= 1.0
+    assert limiter.stats()['throttled'] == 1
@@ -0,0 +1,97 @@
+import functools
+import threading
+import time
+
+import pytest
+
+from async_crawler import crawl_date
+from detail_cache import DetailCache
+from http_cache import ValidatorStore
+from http_session import create_session
+from incremental import refresh_incremental
+from rate_limiter import RateLimiter
+from result_store import ResultStore
+from scraper import PokerfansScraper
+from stub_server import StubPokerfans
+
+
+def slow_crawl(calls, seconds=0.2):
+    def crawl(date_str, max_details_per_page=0, on_page=None):
+        calls.append(date_str)
+        time.sleep(seconds)
+        return [{'title': f'{date_str} #{len(calls)}', 'detail_url': f'u{len(calls)}'}]
+    return crawl
+
+
+def test_concurrent_requests_share_one_crawl():
+    calls = []
+    store = ResultStore(crawl=slow_crawl(calls))
+    results = []
+
+    def visitor():
+        results.append(store.get_or_fetch("2025/03/27"))
+
+    threads = [threading.Thread(target=visitor) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == ["2025/03/27"]
+    assert all(r is results[0] for r in results)
+    assert store.stats()['coalesced'] == 9
+
+    started = time.perf_counter()
+    assert store.get_or_fetch("2025/03/27") is results[0]
+    assert time.perf_counter() - started < 0.01
+
+
+def test_snapshot_is_immutable_and_refetched_when_old():
+    calls = []
+    store = ResultStore(crawl=slow_crawl(calls, 0))
+    snapshot = store.get_or_fetch("2025/03/27")
+    with pytest.raises(TypeError):
+        snapshot.tournaments[0]['guarantee'] = 1
+
+    assert store.get_or_fetch("2025/03/27", max_details=2) is not snapshot
+    time.sleep(0.01)
+    newer = store.get_or_fetch("2025/03/27", max_age=0)
+    assert len(calls) == 3 and newer.fetched_at > snapshot.fetched_at
+
+
+def test_failed_crawl_is_raised_to_every_waiter():
+    def crawl(date_str, max_details_per_page=0, on_page=None):
+        time.sleep(0.1)
+        raise RuntimeError("down")
+
+    store = ResultStore(crawl=crawl)
+    errors = []
+
+    def visitor():
+        try:
+            store.get_or_fetch("2025/03/27")
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=visitor) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(errors) == 3 and store.get("2025/03/27") is None and not store.in_flight("2025/03/27")
+
+
+def test_refresh_shares_unchanged_rows(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    with StubPokerfans(total_pages=1, events_per_page=6) as stub:
+        scraper = PokerfansScraper(target_date="2025/03/27", session=create_session(), base_url=stub.base_url,
+                                   rate_limiter=RateLimiter(rate=1000, burst=100, jitter=0),
+                                   detail_cache=DetailCache(path), validators=ValidatorStore(path))
+        store = ResultStore(crawl=functools.partial(crawl_date, scraper=scraper),
+                            refresh=functools.partial(refresh_incremental, scraper=scraper))
+        first = store.get_or_fetch("2025/03/27")
+        second, report = store.refresh("2025/03/27")
+
+    assert report['changed'] == 0
+    assert all(a is b for a, b in zip(first.tournaments, second.tournaments))
+    assert store.get("2025/03/27") is second
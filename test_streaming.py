@@ -0,0 +1,55 @@
+import asyncio
+
+from detail_cache import DetailCache
+from http_cache import ValidatorStore
+from http_session import create_session
+from models import Tournament
+from rate_limiter import RateLimiter
+from scraper import PageEvent, PokerfansScraper
+from stub_server import StubPokerfans
+
+
+def make_scraper(stub, tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    return PokerfansScraper(target_date="2025/03/27", session=create_session(), base_url=stub.base_url,
+                            rate_limiter=RateLimiter(rate=1000, burst=100, jitter=0),
+                            detail_cache=DetailCache(path), validators=ValidatorStore(path))
+
+
+def test_iter_yields_rows_before_next_page_is_requested(tmp_path):
+    with StubPokerfans(total_pages=3, events_per_page=4) as stub:
+        items = make_scraper(stub, tmp_path).iter_tournaments()
+        first = next(items)
+        assert isinstance(first, Tournament)
+        assert len(stub.requests) == 1
+        rest = list(items)
+
+    events = [item for item in rest if isinstance(item, PageEvent)]
+    assert events == [PageEvent(0, 3, 4), PageEvent(1, 3, 4), PageEvent(2, 3, 4)]
+    assert sum(1 for item in rest if isinstance(item, Tournament)) == 11
+    assert len(stub.requests) == 3
+
+
+def test_for_date_shares_session_and_changes_query(tmp_path):
+    with StubPokerfans(total_pages=1, events_per_page=2) as stub:
+        scraper = make_scraper(stub, tmp_path)
+        other = scraper.for_date("2025/04/01")
+        list(other.iter_tournaments())
+        list(scraper.iter_tournaments("2025/04/02"))
+
+    assert other.session is scraper.session and scraper.params['startDate'] == "2025/03/27"
+    assert "startDate=2025%2F04%2F01" in stub.requests[0] and "startDate=2025%2F04%2F02" in stub.requests[1]
+
+
+def test_async_iter_returns_every_page(tmp_path):
+    async def collect(scraper):
+        return [item async for item in scraper.aiter_tournaments(concurrency=4)]
+
+    with StubPokerfans(total_pages=4, events_per_page=3) as stub:
+        items = asyncio.run(collect(make_scraper(stub, tmp_path)))
+
+    events = [item for item in items if isinstance(item, PageEvent)]
+    assert sorted(e.page for e in events) == [0, 1, 2, 3]
+    assert sum(1 for item in items if isinstance(item, Tournament)) == 12
+    # 各ページのイベントはそのページの行のあとに来る
+    assert isinstance(items[0], Tournament) and isinstance(items[-1], PageEvent)
@@ -0,0 +1,77 @@
+import itertools
+import random
+from datetime import datetime
+
+from models import JST, Tournament, is_available, value_ratio
+from tournament_index import TournamentIndex
+
+NOW = JST.localize(datetime(2025, 3, 27, 19, 15))
+
+
+def make_rows(count=300, seed=1):
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(count):
+        hour = rnd.choice([None, 1, 9, 12, 18, 19, 20, 23])
+        rows.append(Tournament(title=('JOPT ' if rnd.random() < 0.2 else '') + f'#{i}',
+                               venue=f'東京都 会場{rnd.randrange(6)}',
+                               start_time=None if hour is None else f'{hour:02d}:{rnd.choice([0, 30]):02d}',
+                               end_time=f'{rnd.choice([2, 20, 21, 23]):02d}:00',
+                               entry_fee=rnd.choice([0, 2000, 3000, 5000, 8000, 20000, 60000]),
+                               current_entries=rnd.randrange(0, 40), detail_url=str(i),
+                               guarantee=rnd.choice([0, 0, 30000, 50000, 120000, 500000])))
+    return rows
+
+
+def brute_force(rows, sort, jopt, min_guarantee, max_fee, venue, available_only):
+    def time_key(t):
+        return t['start_time'] or '99:99'
+
+    def value_key(t):
+        return value_ratio(t['guarantee'], t['entry_fee'], t['current_entries']) or 0
+
+    indices = list(range(len(rows)))
+    if sort == 'time':
+        indices.sort(key=lambda i: time_key(rows[i]))
+    else:
+        indices.sort(key=lambda i: value_key(rows[i]), reverse=True)
+    return [i for i in indices
+            if (jopt is None or rows[i]['is_jopt'] == jopt)
+            and rows[i]['guarantee'] >= min_guarantee
+            and (max_fee is None or rows[i]['entry_fee'] <= max_fee)
+            and (venue is None or rows[i]['venue'] == venue)
+            and (not available_only or is_available(rows[i]['start_time'], rows[i]['end_time'], NOW))]
+
+
+def test_select_matches_sort_and_filter():
+    rows = make_rows()
+    index = TournamentIndex(rows)
+    for sort, jopt, min_guarantee, max_fee, venue, available_only in itertools.product(
+            ('time', 'value'), (None, False, True), (0, 1, 50000, 60000), (None, 5000, 4000, 100000),
+            (None, '東京都 会場3'), (False, True)):
+        filters = dict(min_guarantee=min_guarantee, max_fee=max_fee, venue=venue, available_only=available_only)
+        expected = brute_force(rows, sort, jopt, **filters)
+        assert index.select(sort, jopt, now=NOW, **filters) == expected
+        assert index.select(sort, jopt, offset=3, limit=5, now=NOW, **filters) == expected[3:8]
+        assert index.count(sort, jopt, now=NOW, **filters) == len(expected)
+
+
+def test_single_partition_filters_need_no_row_checks():
+    rows = make_rows()
+    index = TournamentIndex(rows)
+    for filters in (dict(venue='東京都 会場3'), dict(max_fee=5000), dict(min_guarantee=50000),
+                    dict(available_only=True), dict(venue='東京都 会場3', max_fee=5000)):
+        order, checks = index._candidates('time', None, filters.get('min_guarantee', 0), filters.get('max_fee'),
+                                          filters.get('venue'), filters.get('available_only', False), NOW)
+        assert len(checks) == len(filters) - 1
+        assert len(order) >= index.count(now=NOW, **filters)
+
+
+def test_unknown_venue_and_bucket_counts():
+    rows = make_rows()
+    index = TournamentIndex(rows)
+    assert index.select(venue='大阪府') == []
+    counts = index.bucket_counts()
+    assert counts['guarantee'][0] == len(rows)
+    assert counts['fee'][0] == sum(1 for t in rows if t['entry_fee'] <= 3000)
+    assert sum(index.venue_counts) == len(rows)
@@ -0,0 +1,249 @@
+"""
+一覧表示のための並び順・絞り込みのインデックス
+
+スナップショットごとに1回だけ、開始時間順・回収率順の並び順を JOPT/通常 別に、
+さらに保証額の区分（○円以上）ごとに作っておく。並び順の切り替えや絞り込みのたびに
+全件を並べ替えず、作成済みの並び順を先頭から必要な件数だけ取り出す。
+
+同じ並び順を会場ごと・参加費の区分（○円以下）ごとにも作っておき、参加可能な行の並び順は
+1分ごとに作り直す。絞り込みのときは条件に合う並び順のうち最も短いものだけを見て、
+残りの条件は行ごとの番号（会場・参加費・保証額）で確かめる。
+"""
+import bisect
+import threading
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from batch import TournamentBatch, batch_for_snapshot
+from models import JST
+
+# 保証額の区分（この金額以上）
+GUARANTEE_BUCKETS = (0, 1, 30000, 50000, 100000, 300000, 1000000)
+# 参加費の区分（この金額以下）
+FEE_BUCKETS = (3000, 5000, 10000, 20000, 50000)
+# 並び順
+SORT_KEYS = ('time', 'value')
+# JOPT で分ける区分（None=すべて）
+GROUPS = (None, False, True)
+# スナップショットごとのインデックスを保持する数
+MAX_CACHED_INDEXES = 16
+
+_index_cache: "OrderedDict[tuple, TournamentIndex]" = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def guarantee_bucket(amount: int) -> int:
+    """amount 以上を満たす最も大きい区分の番号"""
+    return bisect.bisect_right(GUARANTEE_BUCKETS, amount) - 1
+
+
+def fee_bucket(amount: int) -> int:
+    """amount 以下に収まる最も小さい区分の番号（どの区分にも入らなければ len(FEE_BUCKETS)）"""
+    return bisect.bisect_left(FEE_BUCKETS, amount)
+
+
+class TournamentIndex:
+    """
+    1つのスナップショットに対する並び順と絞り込み用の区分
+    Args:
+        tournaments: トーナメントの一覧
+        batch: tournaments の列データ（省略時はここで作成）
+    """
+
+    def __init__(self, tournaments: Sequence, batch: TournamentBatch = None):
+        self.tournaments = tournaments
+        self.batch = batch if batch is not None else TournamentBatch(tournaments)
+        batch = self.batch
+        size = len(tournaments)
+
+        starts = batch.start_keys.tolist()
+        ratios = batch.ratios()
+        guarantees = batch.guarantee.tolist()
+        jopt = [bool(flag) for flag in batch.is_jopt]
+
+        # 開始時間順（開始時間がない行は最後）と回収率順（回収率なしは0扱い）
+        by_time = sorted(range(size), key=lambda i: starts[i] if starts[i] >= 0 else 9999)
+        by_value = sorted(range(size), key=lambda i: ratios[i] or 0, reverse=True)
+
+        self.guarantee_buckets = array('b', (guarantee_bucket(g) for g in guarantees))
+        self.fee_buckets = array('b', (fee_bucket(t.get('entry_fee', 0) or 0) for t in tournaments))
+        self.entry_fees = array('q', (t.get('entry_fee', 0) or 0 for t in tournaments))
+        self.guarantees = array('q', guarantees)
+        self.jopt = jopt
+
+        # 会場ごとの番号
+        self.venues: List[str] = []
+        venue_ids: Dict[str, int] = {}
+        venue_of = []
+        for t in tournaments:
+            venue = t.get('venue', '') or ''
+            if venue not in venue_ids:
+                venue_ids[venue] = len(self.venues)
+                self.venues.append(venue)
+            venue_of.append(venue_ids[venue])
+        self.venue_ids = venue_ids
+        self.venue_of = array('i', venue_of)
+        self.venue_counts = [0] * len(self.venues)
+        for venue_id in venue_of:
+            self.venue_counts[venue_id] += 1
+
+        # (並び順, JOPT区分, 保証額区分) → その条件を満たす行の並び
+        self.orders: Dict[Tuple[str, Optional[bool], int], array] = {}
+        buckets = self.guarantee_buckets
+        for sort_key, order in (('time', by_time), ('value', by_value)):
+            for group in GROUPS:
+                rows = order if group is None else [i for i in order if jopt[i] == group]
+                for bucket in range(len(GUARANTEE_BUCKETS)):
+                    if bucket:
+                        rows = [i for i in rows if buckets[i] >= bucket]
+                    self.orders[(sort_key, group, bucket)] = array('i', rows)
+
+        # (並び順, JOPT区分, 会場番号) → その会場の行の並び
+        self.venue_orders: Dict[Tuple[str, Optional[bool], int], array] = {}
+        # (並び順, JOPT区分, 参加費区分) → 参加費がその区分の金額以下の行の並び
+        self.fee_orders: Dict[Tuple[str, Optional[bool], int], array] = {}
+        fee_buckets = self.fee_buckets
+        for sort_key in SORT_KEYS:
+            for group in GROUPS:
+                rows = self.orders[(sort_key, group, 0)]
+                by_venue = [[] for _ in self.venues]
+                for i in rows:
+                    by_venue[venue_of[i]].append(i)
+                for venue_id, venue_rows in enumerate(by_venue):
+                    self.venue_orders[(sort_key, group, venue_id)] = array('i', venue_rows)
+                for bucket in range(len(FEE_BUCKETS)):
+                    self.fee_orders[(sort_key, group, bucket)] = array('i', (i for i in rows if fee_buckets[i] <= bucket))
+
+        self._available_lock = threading.Lock()
+        self._available_minute = None
+        self._available: Sequence[bool] = ()
+        # (並び順, JOPT区分) → 参加可能な行の並び（判定した分の間だけ使う）
+        self._available_orders: Dict[Tuple[str, Optional[bool]], array] = {}
+
+    def __len__(self) -> int:
+        return len(self.tournaments)
+
+    def _available_state(self, now: datetime = None) -> Tuple[Sequence[bool], Dict]:
+        if now is None:
+            now = datetime.now(JST)
+        minute = (now.hour, now.minute)
+        with self._available_lock:
+            if minute != self._available_minute:
+                self._available = [bool(flag) for flag in self.batch.availability(now)]
+                self._available_orders = {}
+                self._available_minute = minute
+            return self._available, self._available_orders
+
+    def availability(self, now: datetime = None) -> Sequence[bool]:
+        """全行の参加可否（同じ分の間は前回の判定結果を使う）"""
+        return self._available_state(now)[0]
+
+    def available_order(self, sort: str = 'time', jopt: Optional[bool] = None, now: datetime = None) -> array:
+        """参加可能な行の並び（同じ分の間は作成済みの並びを使う）"""
+        available, orders = self._available_state(now)
+        order = orders.get((sort, jopt))
+        if order is None:
+            order = orders[(sort, jopt)] = array('i', (i for i in self.orders[(sort, jopt, 0)] if available[i]))
+        return order
+
+    def ratio(self, index: int) -> Optional[float]:
+        return self.batch.ratio(index)
+
+    def _candidates(self, sort: str, jopt: Optional[bool], min_guarantee: int, max_fee: Optional[int],
+                    venue: Optional[str], available_only: bool,
+                    now: datetime) -> Tuple[array, List[Callable[[int], bool]]]:
+        """
+        条件に合う行をすべて含む作成済みの並びのうち最も短いものと、その並びの行で確かめる残りの条件
+        """
+        guarantees, fees, venue_of = self.guarantees, self.entry_fees, self.venue_of
+        bucket = guarantee_bucket(min_guarantee) if min_guarantee > 0 else 0
+        # (条件を満たす行をすべて含む並び（なければNone）, 並びだけで条件を満たすか, 行ごとの判定)
+        partitions = [(self.orders[(sort, jopt, bucket)],
+                       min_guarantee <= 0 or GUARANTEE_BUCKETS[bucket] == min_guarantee,
+                       None if min_guarantee <= 0 else (lambda i: guarantees[i] >= min_guarantee))]
+        if max_fee is not None:
+            fee_index = fee_bucket(max_fee)
+            fee_order = self.fee_orders[(sort, jopt, fee_index)] if fee_index < len(FEE_BUCKETS) else None
+            partitions.append((fee_order, fee_order is not None and FEE_BUCKETS[fee_index] == max_fee,
+                               lambda i: fees[i] <= max_fee))
+        if venue is not None:
+            venue_id = self.venue_ids.get(venue)
+            if venue_id is None:
+                return array('i'), []
+            partitions.append((self.venue_orders[(sort, jopt, venue_id)], True, lambda i: venue_of[i] == venue_id))
+        if available_only:
+            available = self.availability(now)
+            partitions.append((self.available_order(sort, jopt, now), True, lambda i: available[i]))
+
+        chosen = min((partition for partition in partitions if partition[0] is not None),
+                     key=lambda partition: len(partition[0]))
+        checks = []
+        for partition in partitions:
+            _, exact, check = partition
+            if check is not None and not (partition is chosen and exact):
+                checks.append(check)
+        return chosen[0], checks
+
+    def select(self, sort: str = 'time', jopt: Optional[bool] = None, min_guarantee: int = 0,
+               max_fee: Optional[int] = None, venue: Optional[str] = None, available_only: bool = False,
+               offset: int = 0, limit: Optional[int] = None, now: datetime = None) -> List[int]:
+        """
+        条件に合う行番号を並び順に返す
+        条件が1つだけで、保証額・参加費が区分の境目なら作成済みの並びの切り出しだけで済む。
+        それ以外は条件に合う並びのうち最も短いものを先頭から見て、offset + limit 件そろった時点で止める。
+        Args:
+            sort: 'time'（開始時間順）/ 'value'（回収率順）
+            jopt: True=JOPTのみ / False=通常のみ / None=すべて
+            min_guarantee: 保証額の下限
+            max_fee: 参加費の上限
+            venue: 会場（完全一致）
+            available_only: 参加可能な行のみ
+            offset: 先頭から飛ばす件数
+            limit: 最大件数（Noneの場合はすべて）
+        """
+        order, checks = self._candidates(sort, jopt, min_guarantee, max_fee, venue, available_only, now)
+        end = None if limit is None else offset + limit
+        if not checks:
+            return order[offset:end].tolist()
+
+        selected = []
+        for i in order:
+            if all(check(i) for check in checks):
+                selected.append(i)
+                if end is not None and len(selected) >= end:
+                    break
+        return selected[offset:]
+
+    def count(self, sort: str = 'time', jopt: Optional[bool] = None, min_guarantee: int = 0,
+              max_fee: Optional[int] = None, venue: Optional[str] = None, available_only: bool = False,
+              now: datetime = None) -> int:
+        """条件に合う件数（select と同じ条件。最も短い並びの長さか、その並びの中で条件に合う行の数）"""
+        order, checks = self._candidates(sort, jopt, min_guarantee, max_fee, venue, available_only, now)
+        if not checks:
+            return len(order)
+        return sum(1 for i in order if all(check(i) for check in checks))
+
+    def bucket_counts(self, jopt: Optional[bool] = None) -> Dict[str, List[int]]:
+        """保証額の区分（以上）・参加費の区分（以下）ごとの件数（絞り込みの選択肢の表示用）"""
+        return {
+            'guarantee': [len(self.orders[('time', jopt, b)]) for b in range(len(GUARANTEE_BUCKETS))],
+            'fee': [len(self.fee_orders[('time', jopt, b)]) for b in range(len(FEE_BUCKETS))],
+        }
+
+
+def index_for_snapshot(snapshot) -> TournamentIndex:
+    """スナップショットごとに1回だけインデックスを作成して再利用する"""
+    key = (snapshot.date, snapshot.fetched_at, len(snapshot.tournaments))
+    with _index_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            return index
+    index = TournamentIndex(snapshot.tournaments, batch_for_snapshot(snapshot))
+    with _index_lock:
+        _index_cache[key] = index
+        while len(_index_cache) > MAX_CACHED_INDEXES:
+            _index_cache.popitem(last=False)
+    return index